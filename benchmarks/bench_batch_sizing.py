@@ -0,0 +1,71 @@
+import time
+import warnings
+
+import numpy as np
+
+from src.batch_drone import BatchDrone
+from src.configuration import configuration
+from src.drone import Drone
+from src.esc import ESC
+from src.motor import Motor
+from src.propeller import Propeller
+from src.shelf_drone import ShelfPropeller, ShelfMotor, ShelfESC
+
+
+def catalog_designs(n, seed=0):
+    # Random motor x propeller x ESC combinations from the bundled catalogs
+    ShelfPropeller.read_prop()
+    ShelfMotor.read_motor()
+    ShelfESC.read_esc()
+    propellers = [ShelfPropeller(name) for name in ShelfPropeller.propellers]
+    motors = [ShelfMotor(name) for name in ShelfMotor.motors]
+    escs = [ShelfESC(name) for name in ShelfESC.ESCs]
+
+    rng = np.random.default_rng(seed)
+    return [
+        (propellers[i], motors[j], escs[k])
+        for i, j, k in zip(
+            rng.integers(len(propellers), size=n),
+            rng.integers(len(motors), size=n),
+            rng.integers(len(escs), size=n),
+        )
+    ]
+
+
+def per_object(designs, solver=None):
+    start = time.perf_counter()
+    for propeller, motor, esc in designs:
+        Drone(propeller=propeller, motor=motor, esc=esc, solver=solver, cache=False)
+    return len(designs) / (time.perf_counter() - start)
+
+
+def batch(designs, repeat=5, solver=None):
+    def column(components, attribute):
+        return np.array([getattr(c, attribute) for c in components])
+
+    propellers, motors, escs = zip(*designs)
+    propeller = Propeller(*(column(propellers, a) for a in ("Dp", "Hp", "Bp", "mass")))
+    propeller.Ct, propeller.Cm = column(propellers, "Ct"), column(propellers, "Cm")
+    motor = Motor(*(column(motors, a) for a in ("Kv0", "Um0", "Im0", "Rm", "Immax", "mass")))
+    esc = ESC(*(column(escs, a) for a in ("Iemax", "Iecont", "mass")))
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        BatchDrone(propeller, motor, esc, configuration["mission"], solver=solver)
+        timings.append(time.perf_counter() - start)
+    return len(designs) / min(timings)
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore", RuntimeWarning)
+    # Every design is sized, repeats would be served by the sizing cache
+    Drone.cache = None
+
+    scalar_rate = per_object(catalog_designs(2000))
+    print(f"Drone:      {scalar_rate:12.0f} designs/s")
+
+    for solver in ("fixed-point", "secant", "aitken"):
+        for n in (1000, 10000, 100000):
+            rate = batch(catalog_designs(n), solver=solver)
+            print(f"BatchDrone: {rate:12.0f} designs/s  (n = {n:6d}, {solver:>11}, {rate / scalar_rate:6.1f}x)")
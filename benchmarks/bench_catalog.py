@@ -0,0 +1,61 @@
+import json
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from src.catalog import catalog
+from src.propeller import Propeller
+from src.motor import Motor
+from src.shelf_drone import ShelfPropeller, ShelfMotor
+
+
+def legacy_propeller(prop_name):
+    # ShelfPropeller before the catalog registry, json and test data are read on every call
+    with open("../datasets/propeller.json", "r") as file:
+        propellers = json.load(file)
+
+    propeller = Propeller(*propellers[prop_name])
+    propeller.name = prop_name
+    try:
+        data = pd.read_csv(f"../experimental_data/{prop_name}.csv")
+        data["Rotation speed (rpm)"] = data["Rotation speed (rpm)"].replace(0, np.nan).dropna()
+        N = data["Rotation speed (rpm)"]
+        T = data["Thrust (kgf)"] * 9.80665
+        M = data["Torque (N⋅m)"]
+        propeller.Ct = (T / (propeller.rho * (N / 60) ** 2 * propeller.Dp**4)).mean()
+        propeller.Cm = (M / (propeller.rho * (N / 60) ** 2 * propeller.Dp**5)).mean()
+    except FileNotFoundError:
+        pass
+    return propeller
+
+
+def legacy_motor(motor_name):
+    with open("../datasets/motor.json", "r") as file:
+        motors = json.load(file)
+
+    motor = Motor(*motors[motor_name])
+    motor.name = motor_name
+    return motor
+
+
+if __name__ == "__main__":
+    propellers = list(catalog.table("propeller"))
+    motors = list(catalog.table("motor"))
+
+    def timed(function, names, number=5):
+        return timeit.timeit(lambda: [function(name) for name in names], number=number) / number / len(names)
+
+    for label, names, legacy, shelf in (
+        ("propeller", propellers, legacy_propeller, ShelfPropeller),
+        ("motor", motors, legacy_motor, ShelfMotor),
+    ):
+        old = timed(legacy, names)
+        new = timed(shelf, names)
+        shared = timed(shelf.shared, names)
+        print(f"{label:<10} legacy {old * 1e6:9.1f} us | registry {new * 1e6:7.1f} us ({old / new:6.0f}x) "
+              f"| shared {shared * 1e6:5.1f} us ({old / shared:6.0f}x)")
+
+    legacy = [legacy_propeller(name) for name in propellers]
+    error = max(abs(a.Ct - b.Ct) / a.Ct for a, b in zip(legacy, map(ShelfPropeller, propellers)))
+    print(f"largest relative difference in Ct: {error:.1e}, files parsed: {catalog.loads}")
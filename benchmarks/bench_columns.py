@@ -0,0 +1,49 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.batch_drone import BatchDrone
+from src.catalog import Catalog, read_json
+from src.synthetic import write_catalogs
+
+
+def timed(function, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+if __name__ == "__main__":
+    n = 50000
+    with tempfile.TemporaryDirectory() as directory:
+        write_catalogs(directory, n)
+
+        elapsed, table = timed(lambda: read_json(os.path.join(directory, "motor.json")), 3)
+        print(f"json motor catalog, {n} parts: parse {elapsed * 1e3:.1f} ms")
+
+        source = Catalog(directory)
+
+        start = time.perf_counter()
+        paths = [source.convert(kind) for kind in ("motor", "propeller", "esc")]
+        print(f"convert to npy: {time.perf_counter() - start:.2f} s, "
+              f"{sum(os.path.getsize(path) for path in paths) / 2**20:.1f} MiB")
+
+        elapsed, motors = timed(lambda: Catalog(directory).columns("motor"))
+        print(f"open memory mapped motor columns: {elapsed * 1e3:.2f} ms ({type(motors).__name__})")
+
+        columns = Catalog(directory)
+        names = columns.columns("motor")["name"][::997]
+        columns.find("motor", names)
+        elapsed, rows = timed(lambda: columns.find("motor", names))
+        print(f"find {len(names)} names: {elapsed * 1e3:.2f} ms")
+
+        propellers, motors, escs = (columns.columns(kind) for kind in ("propeller", "motor", "esc"))
+        elapsed, batch = timed(lambda: BatchDrone.from_columns(propellers, motors, escs), 3)
+        print(f"BatchDrone over {n} rows: {elapsed * 1e3:.1f} ms, "
+              f"{np.count_nonzero(batch.converged)} converged, "
+              f"shares memory with the file: {np.shares_memory(batch.motor.Kv0, motors)}")
@@ -0,0 +1,33 @@
+import os
+import time
+
+from src.drone import Drone
+from src.drone_combinator import DroneCombinator
+
+
+def run(workers, chunksize, prune=True):
+    start = time.perf_counter()
+    combinator = DroneCombinator(workers=workers, chunksize=chunksize, prune=prune)
+    return time.perf_counter() - start, combinator
+
+
+if __name__ == "__main__":
+    # Every run sizes all drones, the sizing cache would serve repeats in this process
+    Drone.cache = None
+
+    # The first run loads the catalogs and builds the components, time the runs after it
+    run(1, 256)
+    serial, reference = run(1, 256)
+    n = len(reference.motors) * len(reference.propellers) * len(reference.escs)
+    print(f"{n} combinations, {len(reference.drones)} sized drones")
+    print(f"workers  1: {serial:.2f} s, {reference.n_sized} sized, pruned {reference.pruned}")
+
+    unpruned, full = run(1, 256, prune=False)
+    print(f"no pruning: {unpruned:.2f} s, {full.n_sized} sized, {len(full.drones)} drones")
+
+    for workers in sorted({2, os.cpu_count() or 1} - {1}):
+        for chunksize in (64, 256):
+            elapsed, combinator = run(workers, chunksize)
+            same = [d.mass for d in combinator.drones] == [d.mass for d in reference.drones]
+            print(f"workers {workers:2d} chunksize {chunksize:4d}: {elapsed:.2f} s "
+                  f"({serial / elapsed:.1f}x), same order: {same}")
@@ -0,0 +1,55 @@
+import timeit
+
+import numpy as np
+
+from src.power import FuelCell
+
+
+def get_current_voltage_bisection(fuelcell, power):
+    # FuelCell.get_current_voltage before the closed-form inverse
+    diff = 0.1
+
+    left_I = 0
+    right_I = fuelcell.Imax
+
+    mid_I = (left_I + right_I) / 2
+    mid_V = fuelcell.get_voltage(mid_I)
+
+    mid_power = mid_I * mid_V
+
+    while mid_I < fuelcell.Imax and abs(mid_power - power) > diff:
+
+        if mid_power > power:
+            right_I = mid_I
+        elif mid_power < power:
+            left_I = mid_I
+
+        mid_I = (left_I + right_I) / 2
+        mid_V = fuelcell.get_voltage(mid_I)
+
+        mid_power = mid_I * mid_V
+
+    return mid_I, mid_V
+
+
+if __name__ == "__main__":
+    fuelcell = FuelCell()
+    powers = np.linspace(0, 2400, 10000)
+
+    n = 3
+    bisection = timeit.timeit(
+        lambda: [get_current_voltage_bisection(fuelcell, p) for p in powers], number=n
+    ) / n
+    scalar = timeit.timeit(
+        lambda: [fuelcell.get_current_voltage(p) for p in powers], number=n
+    ) / n
+    vectorized = timeit.timeit(lambda: fuelcell.get_current_voltage(powers), number=100) / 100
+
+    print(f"Bisection:   {bisection * 1e3:9.3f} ms for {len(powers)} powers")
+    print(f"Closed form: {scalar * 1e3:9.3f} ms ({bisection / scalar:.1f}x)")
+    print(f"Vectorized:  {vectorized * 1e3:9.3f} ms ({bisection / vectorized:.1f}x)")
+
+    I_ref, V_ref = np.array([get_current_voltage_bisection(fuelcell, p) for p in powers]).T
+    I, V = fuelcell.get_current_voltage(powers)
+    print(f"Power error, bisection:   {np.max(np.abs(I_ref * V_ref - powers)):.2e} W")
+    print(f"Power error, closed form: {np.max(np.abs(I * V - powers)):.2e} W")
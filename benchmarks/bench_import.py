@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+modules = (
+    "src.drone",
+    "src.batch_drone",
+    "src.shelf_drone",
+    "src.drone_combinator",
+    "src.sensitivity_analysis",
+    "src.speed_range",
+    "src.routing",
+)
+heavy = ("matplotlib", "pandas", "sklearn", "scipy", "prettytable")
+
+script = """
+import sys, time
+t = time.perf_counter()
+import {module}
+t = time.perf_counter() - t
+print(t, *[name for name in {heavy} if name in sys.modules])
+"""
+
+
+def cold_import(module, repeat=10):
+    # Every import runs in a fresh interpreter, as a newly started worker would
+    env = dict(os.environ, PYTHONPATH=root)
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", script.format(module=module, heavy=heavy)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        times.append(float(out[0]))
+        loaded = out[1:]
+    return np.array(times), loaded
+
+
+if __name__ == "__main__":
+    numpy_only, _ = cold_import("numpy")
+    print(f"{'numpy':<26} {np.median(numpy_only) * 1e3:8.1f} ms")
+
+    for module in modules:
+        times, loaded = cold_import(module)
+        print(f"{module:<26} {np.median(times) * 1e3:8.1f} ms "
+              f"(min {times.min() * 1e3:.1f} ms) heavy: {', '.join(loaded) or '-'}")
@@ -0,0 +1,158 @@
+import heapq
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.anytime_router import AnytimeRouter
+from src.route_bounds import lower_bounds
+from src.routing import DroneRoute
+from src.shelf_drone import ShelfESC, ShelfMotor, ShelfPropeller
+from src.synthetic import write_windfarm
+from src.windfarm import WindFarm
+
+
+def find_route_scan(self, X, rand=False, n=2, return_dist=False):
+    # DroneRoute.find_route before the KD-tree, a full scan and np.delete after every hop
+    # Calculate distances from origin
+    distances = np.linalg.norm(X, axis=1)
+
+    if np.max(distances) > self.max_dist:
+        print(len(np.where(distances > self.max_dist)[0]), 'of the turbines is/are unreachable')
+        X = np.delete(X, np.where(distances > self.max_dist), axis=0)
+        distances = np.delete(distances, np.where(distances > self.max_dist))
+
+    visited = []
+    left = X.copy()
+    distancesleft = distances.copy()
+    route = []
+
+    # Define the dynamic cluster size threshold
+    while len(left) > 0:
+        E = 0
+        t = 0
+        dist = 0
+        start = (0, 0)
+        return_back = False
+        closestindex = np.argmin(distancesleft)
+        trip = [start]
+        dest_dist = distancesleft[closestindex]
+        distancesleft = np.delete(distancesleft, closestindex)
+        while not return_back:
+            dest = left[closestindex]
+            left = np.delete(left, closestindex, axis=0)
+            E += dest_dist * self.E_cr
+            t += dest_dist / self.speed / 3600
+            dist += dest_dist
+            visited.append(dest)
+            trip.append(dest.tolist())
+            start = dest
+            E += self.E_ins
+            t += self.inspection_time
+            if len(left) == 0:
+                E += np.linalg.norm(dest) * self.E_cr
+                t += np.linalg.norm(dest) / self.speed / 3600
+                dist += np.linalg.norm(dest)
+                break
+            new_dist = np.linalg.norm(left - start, axis=1)
+            if rand and len(new_dist) > n-1:
+                closest = heapq.nsmallest(n, new_dist)[np.random.randint(0, n)]
+                closestindex = np.where(new_dist == closest)[0][0]
+            else:
+                closestindex = np.argmin(new_dist)
+            pot_E = E + new_dist[closestindex] * self.E_cr + np.linalg.norm(left[closestindex]) * self.E_cr + self.E_ins
+            if pot_E > self.E_tot:
+                E += np.linalg.norm(dest) * self.E_cr
+                t += np.linalg.norm(dest) / self.speed / 3600
+                dist += np.linalg.norm(dest)
+                return_back = True
+            else:
+                dest_dist = new_dist[closestindex]
+                distancesleft = np.delete(distancesleft, closestindex)
+        if E > self.E_tot:
+            print('Range exceeds maximum', E, self.E_tot)
+        trip.append((0, 0))
+        if return_dist:
+            route.append((trip, E / 34000, t, dist))
+        else:
+            route.append((trip, E / 34000, t))
+    return route
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def compare(drone, X, label, seeds=3):
+    # Same routes from the full scan and the KD-tree, greedy and randomized with the same seed
+    route, kdtree = timed(drone.find_route, X)
+    scan = None
+    if len(X) <= 10000:
+        reference, scan = timed(find_route_scan, drone, X)
+        assert route == reference
+        for seed in range(seeds):
+            np.random.seed(seed)
+            randomized = drone.find_route(X, rand=True, n=3)
+            np.random.seed(seed)
+            assert randomized == find_route_scan(drone, X, rand=True, n=3)
+    scan_time = f"{scan:8.3f} s" if scan is not None else "       -  "
+    print(f"{label:<24} {len(X):6d} turbines, {len(route):5d} trips: scan {scan_time} | KD-tree {kdtree:7.3f} s")
+
+
+if __name__ == "__main__":
+    drone = DroneRoute(
+        propeller=ShelfPropeller("T-Motor NS 26x85"),
+        motor=ShelfMotor("T-Motor Antigravity MN6007II KV160"),
+        esc=ShelfESC("T-Motor FLAME 60A"),
+        tank_mass=1.65,
+    )
+    hornsea = WindFarm().coordinates.astype(float)
+    compare(drone, hornsea, "Hornsea")
+
+    # Multi-start search, the same seed gives the same best route on any number of workers
+    restarts = 400
+    for workers in sorted({1, os.cpu_count() or 1}):
+        (route, properties), elapsed = timed(drone.find_best_route, hornsea, restarts, seed=0, workers=workers)
+        print(f"find_best_route {restarts} restarts, {workers} workers: {elapsed:.2f} s, "
+              f"{properties['trips']} trips, {properties['kg H2']:.4f} kg H2")
+
+    # Local search from the greedy route and from the best restart, against the OR-Tools solution
+    with open("../datasets/vrp_solution.json", "r") as f:
+        vrp = json.load(f)
+    over = sum(mh2 * 34000 > drone.E_tot for _, mh2, _ in vrp[0])
+    print(f"OR-Tools {vrp[1]['trips']} trips, {vrp[1]['kg H2']:.4f} kg H2, {over} trips over E_tot")
+    for label, start in (("greedy", drone.find_route(hornsea)), ("best restart", route)):
+        improved, elapsed = timed(drone.improve_route, start)
+        before, after = drone.properties(start), drone.properties(improved)
+        print(f"local search from {label}: {before['trips']} trips, {before['kg H2']:.4f} kg H2 -> "
+              f"{after['trips']} trips, {after['kg H2']:.4f} kg H2 in {elapsed:.3f} s")
+
+    # Anytime search, best route within the budget or at the lower bound of the trips
+    bounds, elapsed = timed(lower_bounds, drone, hornsea)
+    print(f"lower bounds {bounds['trips']} trips, {bounds['kg H2']:.4f} kg H2 in {elapsed * 1e3:.1f} ms")
+    for budget in (0.2, 1.0, 5.0):
+        route, metrics = AnytimeRouter(drone, hornsea, seed=0).solve(budget=budget, stop_at_bound=True)
+        print(f"anytime {budget:.1f} s budget: {metrics['trips']} trips, {metrics['kg H2']:.4f} kg H2 from "
+              f"{metrics['stage']} after {metrics['restarts']} restarts, returned at {metrics['elapsed']:.3f} s "
+              f"({metrics['stop']}, hydrogen gap {metrics['gap']['kg H2']:.1%})")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for n, arrangement in ((1000, "staggered"), (10000, "grid"), (10000, "clustered"), (50000, "grid")):
+            path = os.path.join(directory, f"windfarm_{n}.csv")
+            write_windfarm(path, n, arrangement, spacing=300, jitter=20)
+            X = WindFarm(file=path).coordinates.astype(float)
+            compare(drone, X, f"synthetic {arrangement}", seeds=1 if n > 1000 else 3)
+            if n <= 1000:
+                (route, properties), elapsed = timed(drone.find_best_route, X, 200, seed=0, stop_at_bound=True)
+                print(f"  find_best_route stopped after {properties['restarts']} of 200 restarts in {elapsed:.2f} s, "
+                      f"gap {properties['gap']['trips']} trips, {properties['gap']['kg H2']:.1%} hydrogen")
+            if n <= 10000:
+                start = drone.find_route(X)
+                improved, elapsed = timed(drone.improve_route, start)
+                before, after = drone.properties(start), drone.properties(improved)
+                print(f"  local search {before['trips']} -> {after['trips']} trips, "
+                      f"{before['kg H2']:.3f} -> {after['kg H2']:.3f} kg H2 in {elapsed:.2f} s")
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import time
+
+from src.catalog import Catalog
+from src.drone import Drone
+from src.drone_combinator import DroneCombinator
+from src.routing import DroneRoute
+from src.shelf_drone import ShelfESC, ShelfMotor, ShelfPropeller
+from src.synthetic import arrangements, write_catalogs, write_windfarm
+from src.windfarm import WindFarm
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    Drone.cache = None
+
+    with tempfile.TemporaryDirectory() as directory:
+        for n in (10, 20, 40):
+            catalogs = os.path.join(directory, f"catalog_{n}")
+            write_catalogs(catalogs, n)
+            registry = Catalog(catalogs, catalogs)
+            elapsed, combinator = timed(lambda: DroneCombinator(workers=1, registry=registry))
+            print(f"combinator {n:3d} parts per kind, {n ** 3:6d} combinations: {elapsed:6.2f} s, "
+                  f"{combinator.n_sized} sized, {len(combinator.drones)} drones")
+
+        # Wind farm csv, read and routing over the generated layouts, the turbines 300 m apart stay
+        # within the range of the drone up to 10000 turbines. The multi-start search runs 20
+        # restarts.
+        drone = DroneRoute(
+            propeller=ShelfPropeller("T-Motor NS 26x85"),
+            motor=ShelfMotor("T-Motor Antigravity MN6007II KV160"),
+            esc=ShelfESC("T-Motor FLAME 60A"),
+            tank_mass=1.65,
+        )
+        for arrangement in arrangements:
+            for n in (100, 1000, 10000, 100000):
+                path = os.path.join(directory, f"{arrangement}_{n}.csv")
+                write = timed(lambda: write_windfarm(path, n, arrangement, spacing=300))[0]
+                read, farm = timed(lambda: WindFarm(file=path))
+                X = farm.coordinates.astype(float)
+                route_time, route = timed(lambda: drone.find_route(X))
+                line = (f"{arrangement:<9} {n:6d} turbines: write {write:5.2f} s, WindFarm {read:5.2f} s, "
+                        f"find_route {route_time:6.2f} s ({len(route)} trips)")
+                if n <= 10000:
+                    best = timed(lambda: drone.find_best_route(X, 20, seed=0))[0]
+                    line += f", find_best_route {best:6.2f} s"
+                print(line)
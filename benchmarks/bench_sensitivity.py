@@ -0,0 +1,44 @@
+import timeit
+from copy import deepcopy
+
+from src.drone import Drone
+from src.sensitivity_analysis import SensitivityAnalysis, fixed
+from src.shelf_drone import ShelfPropeller, ShelfMotor, ShelfESC
+
+
+def legacy(analysis):
+    # The analysis before the batched engine, a deep copied config and a Drone per point
+    drone = analysis.initial_drone
+    drones = []
+    for typ in analysis.types:
+        for parameter in drone.config[typ]:
+            if parameter in fixed:
+                continue
+            for delta in analysis.range:
+                config = deepcopy(drone.config)
+                config[typ][parameter] *= 1 + delta / 100
+                drones.append(Drone(config))
+    return drones
+
+
+if __name__ == "__main__":
+    drone = Drone(
+        propeller=ShelfPropeller("T-Motor NS 24x72"),
+        motor=ShelfMotor("T-Motor Antigravity MN6007II KV320"),
+        esc=ShelfESC("T-Motor FLAME 80A"),
+    )
+    Drone.cache = None
+
+    def batched():
+        analysis = SensitivityAnalysis(drone)
+        analysis.perform_analysis()
+        return analysis
+
+    analysis = batched()
+    old = min(timeit.repeat(lambda: legacy(analysis), number=1, repeat=5))
+    new = min(timeit.repeat(batched, number=1, repeat=5))
+    print(f"{len(analysis.results)} rows over {len(analysis.parameters)} parameters")
+    print(f"Drone per point {old * 1e3:.2f} ms | batched {new * 1e3:.2f} ms ({old / new:.0f}x)")
+
+    slopes = min(timeit.repeat(lambda: SensitivityAnalysis(drone).slopes(), number=1, repeat=5))
+    print(f"local slopes from the Jacobian {slopes * 1e3:.2f} ms ({old / slopes:.0f}x)")
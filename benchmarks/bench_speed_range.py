@@ -0,0 +1,48 @@
+import timeit
+
+import numpy as np
+
+from src.shelf_drone import ShelfESC, ShelfMotor, ShelfPropeller
+from src.speed_range import SpeedRange
+
+
+def optimal_range_parameters_grid(drone, cd):
+    # SpeedRange.optimal_range_parameters before the bounded optimizer, scalar range on a 0.1 deg grid
+    x = np.arange(0, drone.max_pitch(), 0.1)
+    range = np.array([drone.range(angle, cd) for angle in x])
+    angle = x[np.argmax(range)]
+    return np.max(range), drone.speed(angle, cd), angle
+
+
+if __name__ == "__main__":
+    drone = SpeedRange(
+        propeller=ShelfPropeller("T-Motor NS 26x85"),
+        motor=ShelfMotor("T-Motor Antigravity MN6007II KV160"),
+        esc=ShelfESC("T-Motor FLAME 60A"),
+        tank_mass=1.65,
+        mh2=0.12,
+    )
+
+    n = 50
+    for name, function in (
+        ("scalar grid", lambda: optimal_range_parameters_grid(drone, 0.8)),
+        ("vectorized grid", lambda: drone.optimal_range_parameters(0.8, step=0.1)),
+        ("bounded Brent", lambda: drone.optimal_range_parameters(0.8)),
+    ):
+        time = min(timeit.repeat(function, number=n, repeat=3)) / n
+        range, speed, angle = function()
+        print(f"{name:<16} {time * 1e3:7.3f} ms  range {range / 1000:.4f} km, {speed:.3f} m/s at {angle:.3f} deg")
+
+    # Full envelope, scalar range against one performance_grid call
+    pitch = np.arange(0, drone.max_pitch(), 0.1)
+    masses = np.linspace(8, 14, 13)
+    mh2 = np.linspace(0.06, 0.18, 13)
+    points = len(pitch) * len(drone.Cd_array) * len(masses) * len(mh2)
+    start = timeit.default_timer()
+    for cd in drone.Cd_array:
+        for angle in pitch:
+            drone.range(angle, cd)
+    scalar = (timeit.default_timer() - start) / len(drone.Cd_array) / len(pitch)
+    grid = min(timeit.repeat(lambda: drone.performance_grid(pitch, mass=masses, mh2=mh2), number=1, repeat=3))
+    print(f"envelope of {points} points: scalar range {scalar * 1e6:.1f} us/point, "
+          f"performance_grid {grid / points * 1e9:.1f} ns/point ({scalar * points / grid:.0f}x)")
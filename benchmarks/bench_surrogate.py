@@ -0,0 +1,42 @@
+import os
+import tempfile
+import time
+import timeit
+from copy import deepcopy
+
+import numpy as np
+
+from src.configuration import configuration
+from src.drone import Drone
+from src.surrogate import Surrogate
+
+if __name__ == "__main__":
+    Drone.cache = None
+
+    start = time.perf_counter()
+    surrogate = Surrogate().fit()
+    print(f"fit {len(surrogate.gather)} terms from 4096 sizings: {time.perf_counter() - start:.2f} s")
+    for output, error in surrogate.errors.items():
+        print(f"  {output:<8} relative error rms {error['rms']:.1e} max {error['max']:.1e}")
+
+    x = surrogate.lower + 0.4 * (surrogate.upper - surrogate.lower)
+    config = deepcopy(configuration)
+    for (typ, parameter), value in zip(surrogate.parameters, x):
+        config[typ][parameter] = value
+
+    number = 2000
+    exact = timeit.timeit(lambda: Drone(deepcopy(config)), number=number) / number
+    predicted = timeit.timeit(lambda: surrogate(x), number=number) / number
+    row = timeit.timeit(lambda: surrogate(x[None]), number=number) / number
+    print(f"one query: Drone {exact * 1e6:.1f} us | surrogate {predicted * 1e6:.1f} us ({exact / predicted:.1f}x), "
+          f"{row * 1e6:.1f} us as a batch of one row")
+
+    rows = np.tile(x, (100000, 1))
+    batch = min(timeit.repeat(lambda: surrogate.predict(rows), number=1, repeat=3)) / len(rows)
+    print(f"batched: {batch * 1e6:.2f} us per query")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "surrogate.npz")
+        surrogate.save(path)
+        load = min(timeit.repeat(lambda: Surrogate.load(path), number=1, repeat=5))
+        print(f"load from npz: {load * 1e3:.2f} ms")
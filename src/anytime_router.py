@@ -0,0 +1,118 @@
+import math
+import threading
+import time
+
+import numpy as np
+
+from src.route_bounds import gap, lower_bounds, meets
+
+
+class AnytimeRouter:
+    # Best route so far of a DroneRoute over a farm, improving until the wall clock budget runs out,
+    # the target is met, the cancel event is set (from any thread) or all restarts have run.
+    # The greedy route comes first, then its local search, then randomized restarts of
+    # find_route, each improved by local search, on streams of SeedSequence(seed) as in
+    # find_best_route. The callback gets every new best route with its properties, elapsed
+    # seconds, restarts and the stage that found it. With stop_at_bound the search also stops at a
+    # route with the fewest possible trips and hydrogen within h2_gap of its lower bound, and the
+    # metrics get the gap to the bounds. solve_vrp runs the OR-Tools search of a VRPSolver behind
+    # the same budget, target, callback and cancel interface.
+    def __init__(self, drone, X, no_of_neighbors=2, neighbours=10, seed=None):
+        self.drone = drone
+        self.X = X
+        self.no_of_neighbors = no_of_neighbors
+        self.neighbours = neighbours
+        self.seed = np.random.SeedSequence(seed)
+
+        self.route = None
+        self.metrics = None
+        self.bounds = None
+
+    def met(self, target):
+        # target like DroneRoute.properties, trips and optionally kg H2
+        if target is None or self.metrics is None:
+            return False
+        if self.metrics['trips'] != target['trips']:
+            return self.metrics['trips'] < target['trips']
+        return self.metrics['kg H2'] <= target.get('kg H2', np.inf)
+
+    def offer(self, route, stage, restarts, callback):
+        properties = self.drone.properties(route)
+        if self.route is not None and not self.drone.better(properties, self.metrics):
+            return
+        self.route = route
+        self.metrics = dict(properties, elapsed=time.perf_counter() - self.start, restarts=restarts, stage=stage)
+        if self.bounds is not None:
+            self.metrics['gap'] = gap(properties, self.bounds)
+        if callback is not None:
+            callback(self.route, self.metrics)
+
+    def reason(self, target, cancel, deadline, stop_at_bound, h2_gap, restarts=0, max_restarts=None):
+        # Why the search stops now, None to go on
+        if stop_at_bound and meets(self.metrics, self.bounds, h2_gap):
+            return "bound"
+        if self.met(target):
+            return "target"
+        if cancel is not None and cancel.is_set():
+            return "cancelled"
+        if deadline is not None and time.perf_counter() >= deadline:
+            return "budget"
+        if max_restarts is not None and restarts >= max_restarts:
+            return "restarts"
+        return None
+
+    def solve(self, budget=None, target=None, callback=None, cancel=None, max_restarts=None, stop_at_bound=False,
+              h2_gap=np.inf):
+        # budget in seconds, None runs until the target, the cancel event or max_restarts
+        if budget is None and target is None and cancel is None and max_restarts is None:
+            raise ValueError("No stopping criterion, give a budget, target, cancel event or max_restarts")
+        self.start = time.perf_counter()
+        if stop_at_bound and self.bounds is None:
+            self.bounds = lower_bounds(self.drone, self.X)
+        deadline = None if budget is None else self.start + budget
+
+        def remaining():
+            return None if deadline is None else max(deadline - time.perf_counter(), 0)
+
+        def reason():
+            return self.reason(target, cancel, deadline, stop_at_bound, h2_gap, restarts, max_restarts)
+
+        restarts = 0
+        greedy = self.drone.find_route(self.X)
+        self.offer(greedy, "greedy", restarts, callback)
+        if reason() is None:
+            self.offer(self.drone.improve_route(greedy, self.neighbours, remaining(), cancel=cancel), "local search",
+                       restarts, callback)
+
+        while reason() is None:
+            rng = np.random.default_rng(self.seed.spawn(1)[0])
+            route = self.drone.find_route(self.X, rand=True, n=self.no_of_neighbors, rng=rng)
+            route = self.drone.improve_route(route, self.neighbours, remaining(), cancel=cancel)
+            restarts += 1
+            self.offer(route, "restart", restarts, callback)
+
+        self.metrics.update(elapsed=time.perf_counter() - self.start, restarts=restarts, stop=reason())
+        return self.route, self.metrics
+
+    def solve_vrp(self, solver, budget, target=None, callback=None, cancel=None, stop_at_bound=False, h2_gap=np.inf):
+        # OR-Tools search of a VRPSolver for the same farm, every solution it finds is offered as
+        # stage "or-tools". The search is told to finish at the first solution after the budget
+        # runs out, the target or bound is met or cancel is set. OR-Tools takes whole seconds, so
+        # the budget is rounded up for its own time limit. The metrics are None without a solution.
+        self.start = time.perf_counter()
+        if stop_at_bound and self.bounds is None:
+            self.bounds = lower_bounds(self.drone, self.X)
+        deadline = self.start + budget
+        finish = threading.Event()
+
+        def on_solution(route, properties):
+            self.offer(route, "or-tools", 0, callback)
+            if self.reason(target, cancel, deadline, stop_at_bound, h2_gap) is not None:
+                finish.set()
+
+        solver.run_model(max_runtime=max(math.ceil(budget), 1), callback=on_solution, cancel=finish)
+
+        if self.metrics is not None:
+            stop = self.reason(target, cancel, deadline, stop_at_bound, h2_gap) or "search"
+            self.metrics.update(elapsed=time.perf_counter() - self.start, restarts=0, stop=stop)
+        return self.route, self.metrics
@@ -0,0 +1,217 @@
+import numpy as np
+
+from src.components import g, mass_components, power_components
+from src.propeller import Propeller
+from src.motor import Motor
+from src.power import HydrogenTank
+from src.esc import ESC
+from src.solver import get_solver
+from src.catalog import fields
+
+
+class BatchDrone:
+    def __init__(
+        self,
+        propeller: Propeller,
+        motor: Motor,
+        esc: ESC,
+        mission: dict,
+        tank_mass=None,
+        mh2=None,
+        max_iter: int = 1000,
+        solver=None,
+    ) -> None:
+        # Components hold one array entry per design, mission values may be scalars
+        self.propeller = propeller
+        self.motor = motor
+        self.esc = esc
+
+        self.size = np.broadcast(
+            propeller.Dp, propeller.Ct, motor.Kv0, esc.mass, *mission.values()
+        ).size
+        self.T, self.Nm, self.TW_R = (
+            np.broadcast_to(np.asarray(value, dtype=float), self.size)
+            for value in mission.values()
+        )
+
+        self.mass = self.compute_weight(max_iter=max_iter, tank_mass=tank_mass, mh2=mh2, solver=solver)
+
+    @classmethod
+    def from_configs(cls, configs, **kwargs):
+        columns = {
+            typ: {parameter: np.array([config[typ][parameter] for config in configs], dtype=float)
+                  for parameter in configs[0][typ]}
+            for typ in configs[0]
+        }
+
+        return cls(
+            Propeller(*columns["propeller"].values()),
+            Motor(*columns["motor"].values()),
+            ESC(*columns["esc"].values()),
+            columns["mission"],
+            **kwargs
+        )
+
+    @classmethod
+    def from_components(cls, propellers, motors, escs, mission=None, **kwargs):
+        if mission is None:
+            from src.configuration import configuration
+            mission = configuration["mission"]
+
+        def column(components, attribute):
+            return np.array([getattr(c, attribute) for c in components], dtype=float)
+
+        propeller = Propeller(*(column(propellers, a) for a in ("Dp", "Hp", "Bp", "mass")))
+        # Shelf propellers carry coefficients corrected from experimental data
+        propeller.Ct = column(propellers, "Ct")
+        propeller.Cm = column(propellers, "Cm")
+
+        motor = Motor(*(column(motors, a) for a in ("Kv0", "Um0", "Im0", "Rm", "Immax", "mass")))
+        esc = ESC(*(column(escs, a) for a in ("Iemax", "Iecont", "mass")))
+
+        return cls(propeller, motor, esc, mission, **kwargs)
+
+    @staticmethod
+    def components(propellers, motors, escs):
+        # Components over structured catalog columns, the fields are used as views without copies
+        propeller = Propeller(*(propellers[field] for field in fields["propeller"][:4]))
+        propeller.Ct = propellers["Ct"]
+        propeller.Cm = propellers["Cm"]
+        motor = Motor(*(motors[field] for field in fields["motor"]))
+        esc = ESC(*(escs[field] for field in fields["esc"]))
+        return propeller, motor, esc
+
+    @classmethod
+    def from_columns(cls, propellers, motors, escs, mission=None, **kwargs):
+        if mission is None:
+            from src.configuration import configuration
+            mission = configuration["mission"]
+
+        return cls(*cls.components(propellers, motors, escs), mission, **kwargs)
+
+    def coefficients(self, co_eff=0.9):
+        # The propeller and motor models are linear in thrust, torque and rpm once
+        # the rpm is written as sqrt(thrust), so they are sampled once per design
+        # and the sizing loop only evaluates the resulting affine expressions.
+        T_unit, M_unit = self.propeller.forces(60.0)
+        V0, I0 = self.motor.VandI(0.0, 0.0)
+        V_M, I_M = self.motor.VandI(1.0, 0.0)
+        V_N, I_N = self.motor.VandI(0.0, 1.0)
+
+        coefficients = {
+            "thrust": np.broadcast_to(g / self.Nm / co_eff, self.size),
+            "rpm": self.propeller.required_rpm(1.0),
+            "torque": M_unit / T_unit,
+            "V0": V0, "V_M": V_M - V0, "V_N": V_N - V0,
+            "I0": I0, "I_M": I_M - I0, "I_N": I_N - I0,
+        }
+        return {key: np.broadcast_to(value, self.size) for key, value in coefficients.items()}
+
+    @staticmethod
+    def current_power(m_tot, coefficients, TW=1.0):
+        T_req_m = m_tot * coefficients["thrust"] * TW
+        N = coefficients["rpm"] * np.sqrt(T_req_m)
+        M = coefficients["torque"] * T_req_m
+        V = coefficients["V0"] + coefficients["V_M"] * M + coefficients["V_N"] * N
+        I = coefficients["I0"] + coefficients["I_M"] * M + coefficients["I_N"] * N
+        return N, I, V * I
+
+    def compute_weight(
+        self, max_iter: int = 1000, tw_f=1.2, co_eff=0.9, tank_mass=None, mh2=None, solver=None, tol=0.001
+    ) -> np.ndarray:
+        # Non-converging designs are reported as nan, where Drone.compute_weight returns None
+        n = self.size
+        m_fixed = np.broadcast_to(
+            mass_components + (self.propeller.mass + self.motor.mass + self.esc.mass) * self.Nm, n
+        )
+        coefficients = self.coefficients(co_eff)
+        if tank_mass is not None:
+            tank_mass = np.broadcast_to(np.asarray(tank_mass, dtype=float), n)
+
+        if mh2 is not None:
+            mh2 = np.broadcast_to(np.asarray(mh2, dtype=float), n)
+            m_out = m_fixed + mh2 + tank_mass
+            m_eval = m_out
+            self.convergence = None
+            self.iterations = np.zeros(n, dtype=int)
+        else:
+            solver = get_solver(solver, tol=tol, max_iter=max_iter)
+            m_out, self.convergence = self._iterate(coefficients, m_fixed, tw_f, tank_mass, solver)
+            m_eval = np.where(self.convergence.converged, self.convergence.point, np.nan)
+            self.iterations = self.convergence.iterations
+
+        # Operating point of the last evaluation, as Drone keeps it after its loop
+        with np.errstate(invalid="ignore"):
+            self.N, I, P = self.current_power(m_eval, coefficients)
+        self.P_tot = P * self.Nm * tw_f + power_components
+        if mh2 is not None:
+            self.mh2 = mh2.copy()
+        else:
+            self.mh2 = HydrogenTank(self.P_tot * self.T).mh2
+
+        self.converged = np.isfinite(m_out)
+        self.I_ratio = self.check_for_max(m_out, coefficients)
+
+        return m_out
+
+    def _iterate(self, coefficients, m_fixed, tw_f, tank_mass, solver):
+        n = self.size
+
+        # Per design, the power at mass m is (I0 + a_I m + b_I sqrt(m)) (V0 + a_V m + b_V sqrt(m))
+        thrust = coefficients["thrust"]
+        root = coefficients["rpm"] * np.sqrt(thrust)
+        columns = {
+            "I0": coefficients["I0"],
+            "a_I": coefficients["I_M"] * coefficients["torque"] * thrust,
+            "b_I": coefficients["I_N"] * root,
+            "V0": coefficients["V0"],
+            "a_V": coefficients["V_M"] * coefficients["torque"] * thrust,
+            "b_V": coefficients["V_N"] * root,
+            "E": self.Nm * tw_f * self.T,
+            "E0": power_components * self.T,
+            "m_fixed": m_fixed,
+        }
+        if tank_mass is not None:
+            columns["tank_mass"] = tank_mass
+        columns = {key: np.broadcast_to(value, n) for key, value in columns.items()}
+
+        columns = {key: np.ascontiguousarray(value) for key, value in columns.items()}
+        return solver.solve_batch(self.mass_update(columns), columns["m_fixed"])
+
+    @staticmethod
+    def mass_update(columns):
+        cache = {"active": None, "current": columns}
+
+        def update(m_tot, active):
+            # Columns are only gathered again when the solver compacts its working set
+            if active is not cache["active"]:
+                cache["active"] = active
+                if len(active) < len(columns["m_fixed"]):
+                    cache["current"] = {key: value[active] for key, value in columns.items()}
+            current = cache["current"]
+
+            root_m = np.sqrt(m_tot)
+            I = current["a_I"] * m_tot
+            I += current["I0"]
+            I += current["b_I"] * root_m
+            V = current["a_V"] * m_tot
+            V += current["V0"]
+            V += current["b_V"] * root_m
+            V *= I
+            V *= current["E"]
+            V += current["E0"]
+            hyd = HydrogenTank(V, tank_mass=current.get("tank_mass"))
+            m_new = hyd.tot_mass()
+            m_new += current["m_fixed"]
+            return m_new
+
+        return update
+
+    def check_for_max(self, m_tot, coefficients):
+        with np.errstate(invalid="ignore"):
+            I = self.current_power(m_tot, coefficients, TW=self.TW_R)[1]
+
+        return I / self.motor.Immax
+
+    def __len__(self):
+        return self.size
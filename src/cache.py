@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import struct
+from collections import OrderedDict
+
+
+class SizingCache:
+    # Content addressed store of sizing results. Entries live in an in-memory LRU and,
+    # when a directory is given, as one json file per key on disk. The disk tier is
+    # shared between processes and trimmed to max_bytes, least recently used first.
+    def __init__(self, maxsize: int = 10000, directory=None, max_bytes: int = 64 * 2**20):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        self.memory = OrderedDict()
+        self.disk_bytes = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(config: dict, **parameters) -> str:
+        # Parameter names and values hash separately, numbers by their float value so that
+        # 160, 160.0 and np.float64(160) give the same key. Config sections are read in
+        # order, as Drone passes their values positionally to the components.
+        layout = [f"{typ}.{name}" for typ, section in config.items() for name in section]
+        numbers = [float(value) for section in config.values() for value in section.values()]
+        for name, value in parameters.items():
+            if value is None or isinstance(value, (str, list, tuple)):
+                layout.append(f"{name}={value!r}")
+            else:
+                layout.append(name)
+                numbers.append(float(value))
+
+        digest = hashlib.sha256(" ".join(layout).encode())
+        digest.update(struct.pack(f"{len(numbers)}d", *numbers))
+        return digest.hexdigest()
+
+    def get(self, key):
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return self.memory[key]
+
+        if self.directory is not None:
+            value = self.read(key)
+            if value is not None:
+                self.remember(key, value)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def put(self, key, value: dict):
+        self.remember(key, value)
+        if self.directory is not None:
+            self.write(key, value)
+
+    def remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def read(self, key):
+        path = self.path(key)
+        try:
+            with open(path, "r") as file:
+                value = json.load(file)
+            os.utime(path)  # The modification time orders the disk tier for eviction
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return value
+
+    def write(self, key, value):
+        path = self.path(key)
+        # Written under a process specific name and renamed, readers never see partial files
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(value, file)
+        os.replace(temporary, path)
+
+        if self.disk_bytes is None:
+            self.disk_bytes = sum(size for _, _, size in self.files())
+        else:
+            self.disk_bytes += os.path.getsize(path)
+
+        if self.disk_bytes > self.max_bytes:
+            self.evict()
+
+    def files(self):
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, entry.path, stat.st_size))
+        return files
+
+    def evict(self):
+        # Other processes write to the same directory, so the size is taken again here
+        files = sorted(self.files())
+        self.disk_bytes = sum(size for _, _, size in files)
+        for _, path, size in files:
+            if self.disk_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.disk_bytes -= size
+
+    def clear(self, disk=False):
+        self.memory.clear()
+        self.hits = self.disk_hits = self.misses = 0
+        if disk and self.directory is not None:
+            for _, path, _ in self.files():
+                os.remove(path)
+            self.disk_bytes = 0
+
+    def __len__(self):
+        return len(self.memory)
+
+    def __contains__(self, key):
+        return key in self.memory or (self.directory is not None and os.path.exists(self.path(key)))
+
+    def __repr__(self):
+        return (f"SizingCache | {len(self)} entries | {self.hits} hits ({self.disk_hits} from disk) | "
+                f"{self.misses} misses")
+
+    def __str__(self):
+        return self.__repr__()
+
+
+sizing_cache = SizingCache()
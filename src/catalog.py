@@ -0,0 +1,169 @@
+import json
+import os
+from functools import partial
+
+import numpy as np
+
+from src.propeller import Propeller
+from src.motor import Motor
+from src.esc import ESC
+
+# Columns of the structured catalogs, the json lists hold the leading ones in this order
+fields = {
+    "motor": ("Kv0", "Um0", "Im0", "Rm", "Immax", "mass"),
+    "propeller": ("Dp", "Hp", "Bp", "mass", "Ct", "Cm"),
+    "esc": ("Iemax", "Iecont", "mass"),
+}
+classes = {"motor": Motor, "esc": ESC}
+
+
+def read_json(path):
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def to_columns(kind, table, fit=None):
+    # Structured array with a name field, propellers carry Ct and Cm corrected by the test data
+    width = max((len(name) for name in table), default=1)
+    columns = np.zeros(len(table), dtype=[("name", f"U{width}")] + [(field, "f8") for field in fields[kind]])
+    columns["name"] = list(table)
+
+    values = np.array(list(table.values()), dtype=float).reshape(len(table), -1)
+    for i in range(values.shape[1]):
+        columns[fields[kind][i]] = values[:, i]
+
+    if kind == "propeller":
+        propeller = Propeller(columns["Dp"], columns["Hp"], columns["Bp"], columns["mass"])
+        columns["Ct"] = propeller.Ct
+        columns["Cm"] = propeller.Cm
+        for i, name in enumerate(table):
+            coefficients = fit(name) if fit is not None else None
+            if coefficients is not None:
+                columns["Ct"][i] = coefficients[0] / (propeller.rho * columns["Dp"][i] ** 4)
+                columns["Cm"][i] = coefficients[1] / (propeller.rho * columns["Dp"][i] ** 5)
+
+    return columns
+
+
+def build(kind, record):
+    # Component instance from one row of the columns
+    name, *values = record.item()
+    if kind == "propeller":
+        component = Propeller(*values[:4])
+        component.Ct, component.Cm = values[4:]
+    else:
+        component = classes[kind](*values)
+    component.name = name
+    return component
+
+
+def fit_propeller(path):
+    # Thrust and torque over (N / 60)^2 from test data, the propeller divides by rho Dp^4 or Dp^5
+    # for Ct and Cm. Propellers without a test file keep their model coefficients.
+    if not os.path.exists(path):
+        return None
+
+    import pandas as pd
+
+    data = pd.read_csv(path)
+
+    n2 = (data["Rotation speed (rpm)"].replace(0, np.nan) / 60) ** 2
+    T = data["Thrust (kgf)"] * 9.80665
+    M = data["Torque (N⋅m)"]
+    return (T / n2).mean(), (M / n2).mean()
+
+
+class Catalog:
+    # Process wide registry of the component catalogs. Every file is parsed once and parsed again
+    # only when its modification time changes, shared() reuses instances built from the same data.
+    def __init__(self, directory="../datasets", experimental="../experimental_data"):
+        self.directory = directory
+        self.experimental = experimental
+
+        self.files = {}
+        self.instances = {}
+        self.indices = {}
+        self.loads = 0  # Number of files parsed
+
+    @staticmethod
+    def stamp(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def load(self, path, reader, tag=None):
+        path = os.path.abspath(path)
+        stamp = self.stamp(path)
+
+        entry = self.files.get((path, tag))
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, reader(path))
+            self.files[(path, tag)] = entry
+            self.loads += 1
+
+        return entry[1]
+
+    def table(self, kind: str) -> dict:
+        return self.load(os.path.join(self.directory, f"{kind}.json"), read_json)
+
+    def columns(self, kind: str) -> np.ndarray:
+        # Memory mapped from {kind}.npy, the json catalog is converted in memory when there is
+        # no converted file or the json is newer
+        path = os.path.join(self.directory, f"{kind}.npy")
+        source = os.path.join(self.directory, f"{kind}.json")
+        stamp = self.stamp(path)
+        if stamp is not None and stamp >= (self.stamp(source) or 0):
+            return self.load(path, partial(np.load, mmap_mode="r"))
+
+        return self.load(source, lambda json_path: to_columns(kind, read_json(json_path), self.fit), tag="columns")
+
+    def find(self, kind: str, names):
+        # Row numbers of the names through a sorted index, without a dict of all names
+        columns = self.columns(kind)
+        entry = self.indices.get(kind)
+        if entry is None or entry[0] is not columns:
+            entry = (columns, np.argsort(columns["name"], kind="stable"))
+            self.indices[kind] = entry
+        order = entry[1]
+
+        names = np.asarray(names)
+        position = np.searchsorted(columns["name"], names, sorter=order)
+        rows = order[np.minimum(position, len(order) - 1)]
+        if np.any(columns["name"][rows] != names):
+            raise ValueError(f"{kind.capitalize()} does not exist in database")
+        return rows
+
+    def convert(self, kind: str, path=None) -> str:
+        # Writes the json catalog as {kind}.npy next to it, opened memory mapped by columns()
+        if path is None:
+            path = os.path.join(self.directory, f"{kind}.npy")
+        np.save(path, to_columns(kind, self.table(kind), self.fit))
+        return path
+
+    def fit(self, name: str):
+        return self.load(os.path.join(self.experimental, f"{name}.csv"), fit_propeller)
+
+    def shared(self, cls, name: str):
+        # An instance stays valid while the catalog data it was built from is the same object
+        sources = cls.sources(name)
+
+        entry = self.instances.get((cls, name))
+        if entry is None or any(old is not new for old, new in zip(entry[0], sources)):
+            entry = (sources, cls(name))
+            self.instances[(cls, name)] = entry
+
+        return entry[1]
+
+    def clear(self):
+        self.files.clear()
+        self.instances.clear()
+        self.indices.clear()
+
+
+catalog = Catalog()
+
+
+if __name__ == "__main__":
+    for kind in fields:
+        print(catalog.convert(kind))
@@ -0,0 +1,192 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.components import g, mass_components, power_components
+from src.drone import Drone
+from src.esc import ESC
+from src.motor import Motor
+from src.power import HydrogenTank
+from src.propeller import Propeller
+
+outputs = ("mass", "endurance", "P_tot", "mh2", "I_ratio")
+
+
+def lift(x):
+    return x if isinstance(x, Dual) else Dual(x, 0.0)
+
+
+class Dual:
+    # Forward mode derivatives, value + gradient . dx. Works through the component formulas as
+    # they are written, numpy's sqrt and arctan2 included.
+    def __init__(self, value, gradient):
+        self.value = float(value)
+        self.gradient = gradient
+
+    @classmethod
+    def variables(cls, values):
+        # One dual per value, each with its own unit gradient
+        return [cls(value, gradient) for value, gradient in zip(values, np.eye(len(values)))]
+
+    def __add__(self, other):
+        other = lift(other)
+        return Dual(self.value + other.value, self.gradient + other.gradient)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = lift(other)
+        return Dual(self.value - other.value, self.gradient - other.gradient)
+
+    def __rsub__(self, other):
+        return lift(other) - self
+
+    def __mul__(self, other):
+        other = lift(other)
+        return Dual(self.value * other.value, self.gradient * other.value + other.gradient * self.value)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = lift(other)
+        return Dual(
+            self.value / other.value,
+            (self.gradient * other.value - other.gradient * self.value) / other.value**2,
+        )
+
+    def __rtruediv__(self, other):
+        return lift(other) / self
+
+    def __pow__(self, power):
+        if isinstance(power, Dual):
+            return np.exp(np.log(self) * power)
+        return Dual(self.value**power, power * self.value ** (power - 1) * self.gradient)
+
+    def __rpow__(self, base):
+        return np.exp(np.log(base) * self)
+
+    def __neg__(self):
+        return Dual(-self.value, -self.gradient)
+
+    def __pos__(self):
+        return self
+
+    def sqrt(self):
+        root = np.sqrt(self.value)
+        return Dual(root, self.gradient / (2 * root))
+
+    def exp(self):
+        value = np.exp(self.value)
+        return Dual(value, value * self.gradient)
+
+    def log(self):
+        return Dual(np.log(self.value), self.gradient / self.value)
+
+    def arctan2(self, x):
+        y, x = self, lift(x)
+        return Dual(
+            np.arctan2(y.value, x.value),
+            (x.value * y.gradient - y.value * x.gradient) / (x.value**2 + y.value**2),
+        )
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        # numpy scalars on the left and np.sqrt or np.arctan2 end up here
+        rule = ufuncs.get(ufunc)
+        if method != "__call__" or kwargs or rule is None:
+            return NotImplemented
+        return rule(*(lift(x) for x in inputs))
+
+    def __repr__(self):
+        return f"Dual({self.value}, {self.gradient})"
+
+
+ufuncs = {
+    np.add: Dual.__add__,
+    np.subtract: Dual.__sub__,
+    np.multiply: Dual.__mul__,
+    np.true_divide: Dual.__truediv__,
+    np.power: Dual.__pow__,
+    np.negative: Dual.__neg__,
+    np.sqrt: Dual.sqrt,
+    np.exp: Dual.exp,
+    np.log: Dual.log,
+    np.arctan2: Dual.arctan2,
+}
+
+
+def operating_point(drone, values, m_tot, co_eff=0.9, tw_f=1.2):
+    # The drone with its config values replaced, at total mass m_tot, as compute_weight
+    # evaluates it in one step of its loop. Catalog propellers keep their fitted thrust and
+    # torque over (N / 60)^2, so their Ct and Cm only scale with the diameter.
+    config = drone.config
+    sections = {}
+    for typ in config:
+        sections[typ] = [values[(typ, parameter)] for parameter in config[typ]]
+
+    propeller = Propeller(*sections["propeller"])
+    model = Propeller(*config["propeller"].values())
+    if (model.Ct, model.Cm) != (drone.propeller.Ct, drone.propeller.Cm):
+        scale = drone.propeller.Dp / propeller.Dp
+        propeller.Ct = drone.propeller.Ct * scale**4
+        propeller.Cm = drone.propeller.Cm * scale**5
+
+    point = SimpleNamespace(
+        propeller=propeller, motor=Motor(*sections["motor"]), esc=ESC(*sections["esc"]), mass=m_tot,
+    )
+    point.T, point.Nm, point.TW_R = sections["mission"]
+
+    T_req_m = m_tot * g / point.Nm / co_eff
+    point.N = propeller.required_rpm(T_req_m)
+    M = propeller.forces(point.N)[1]
+    V, I = point.motor.VandI(M, point.N)
+    point.P_tot = V * I * point.Nm * tw_f + power_components
+    point.hyd = HydrogenTank(point.P_tot * point.T, tank_mass=drone.hyd.tm)
+    point.m_new = (
+        mass_components
+        + (point.propeller.mass + point.motor.mass + point.esc.mass) * point.Nm
+        + point.hyd.tot_mass()
+    )
+    return point
+
+
+def jacobian(drone, parameters=None, co_eff=0.9, tw_f=1.2, newton=3):
+    # Derivatives of mass, endurance (as Drone.compute_endurance(1)), P_tot, mh2 and I_ratio
+    # after every (type, parameter) of the config, one row per parameter. The converged mass m
+    # is the fixed point of the mass update G(m, p), so dm/dp = G_p / (1 - G_m). A few Newton
+    # steps on the fixed point first remove the tolerance of the sizing loop.
+    if not drone.mass:
+        raise ValueError("Drone did not converge")
+    config = drone.config
+    if parameters is None:
+        parameters = [(typ, parameter) for typ in config for parameter in config[typ]]
+
+    values = {(typ, parameter): float(value) for typ in config for parameter, value in config[typ].items()}
+    m = float(drone.mass)
+    for _ in range(newton):
+        point = operating_point(drone, values, Dual(m, 1.0), co_eff, tw_f)
+        m -= (point.m_new.value - m) / (point.m_new.gradient - 1)
+
+    # Slot 0 of the gradients is the mass, the others the parameters
+    m_tot, *variables = Dual.variables([m] + [values[parameter] for parameter in parameters])
+    values.update(zip(parameters, variables))
+    point = operating_point(drone, values, m_tot, co_eff, tw_f)
+
+    G = point.m_new.gradient
+    dm = G[1:] / (1 - G[0])
+    results = {
+        "mass": m_tot,
+        "endurance": Drone.compute_endurance(point, 1, co_eff=co_eff, tw_f=tw_f),
+        "P_tot": point.P_tot,
+        "mh2": lift(point.hyd.mh2),
+        "I_ratio": Drone.check_for_max(point, m_tot, co_eff),
+    }
+
+    rows = np.zeros(len(parameters), dtype=[("type", "U16"), ("parameter", "U16"), ("value", "f8")]
+                    + [(output, "f8") for output in outputs])
+    rows["type"] = [typ for typ, _ in parameters]
+    rows["parameter"] = [parameter for _, parameter in parameters]
+    rows["value"] = [variable.value for variable in variables]
+    for output, result in results.items():
+        gradient = np.broadcast_to(result.gradient, len(parameters) + 1)
+        rows[output] = gradient[1:] + gradient[0] * dm
+    return rows
@@ -1,25 +1,32 @@
 from typing import Optional
 
 import numpy as np
-import pandas as pd
-from sklearn.metrics import mean_squared_error
-import matplotlib as mpl
 
 from src.components import I_components, g, mass_components, power_components
-from src.components import c1, c2, c3, c4, c5
+from src.components import c3
 from src.propeller import Propeller
 from src.motor import Motor
 from src.power import HydrogenTank, FuelCell
 from src.esc import ESC
 from src.configuration import configuration
+from src.solver import ConvergenceResult, get_solver
+from src.cache import sizing_cache
+from src.plotting import pyplot
 
-import matplotlib.pyplot as plt
 
+def rmse(actual, model):
+    return np.sqrt(np.mean((np.asarray(actual) - np.asarray(model)) ** 2))
 
-mpl.rcParams['axes.prop_cycle'] = mpl.cycler(color=[c1, c2, c3, c4, c5])
+
+curve_fields = (
+    "N", "T", "M", "P", "V", "I", "eta", "throttle",
+    "V_esc", "I_esc", "V_fc", "I_fc", "P_fc",
+)
 
 
 class Drone:
+    cache = sizing_cache
+
     def __init__(
         self,
         config: Optional[dict] = None,
@@ -27,7 +34,10 @@ class Drone:
         motor: Optional[Motor] = None,
         esc: Optional[ESC] = None,
         tank_mass: Optional[float] = None,
-        mh2: Optional[float] = None
+        mh2: Optional[float] = None,
+        solver=None,
+        cache=True,
+        sizing: Optional[dict] = None,
     ) -> None:
         if not config:
             config = configuration.copy()
@@ -58,24 +68,75 @@ class Drone:
         self.fuelcell = FuelCell()
 
         self._config = config
-        self.mass = self.compute_weight(tank_mass=tank_mass, mh2=mh2)
+        if sizing is not None:
+            # Stored result of an earlier sizing, see Drone.sizing
+            self.mass = self.restore_sizing(sizing)
+        else:
+            self.mass = self.cached_weight(cache, tank_mass=tank_mass, mh2=mh2, solver=solver)
+
+    def cached_weight(self, cache=True, tank_mass=None, mh2=None, solver=None) -> Optional[float]:
+        # cache=True uses Drone.cache, None or False always sizes the drone
+        if cache is True:
+            cache = self.cache
+        if cache is None or cache is False:
+            return self.compute_weight(tank_mass=tank_mass, mh2=mh2, solver=solver)
+
+        solver = get_solver(solver)
+        # Shelf propellers correct Ct and Cm from experimental data, so they are part of the key
+        key = cache.key(
+            self._config,
+            Ct=self.propeller.Ct,
+            Cm=self.propeller.Cm,
+            tank_mass=tank_mass,
+            mh2=mh2,
+            solver=[solver.name, solver.tol, solver.max_iter],
+        )
+
+        sizing = cache.get(key)
+        if sizing is not None:
+            return self.restore_sizing(sizing)
+
+        mass = self.compute_weight(tank_mass=tank_mass, mh2=mh2, solver=solver)
+        cache.put(key, self.sizing(mass))
+        return mass
+
+    def sizing(self, mass) -> dict:
+        convergence = self.convergence
+        if convergence is not None:
+            convergence = [convergence.solver, convergence.iterations, convergence.residual,
+                           convergence.reason, convergence.point]
+
+        return {
+            "mass": mass,
+            "N": self.N,
+            "P_tot": self.P_tot,
+            "mh2": self.hyd.mh2,
+            "tank_mass": self.hyd.tm,
+            "I_ratio": None if mass is None else self.I_ratio,
+            "convergence": convergence,
+        }
+
+    def restore_sizing(self, sizing: dict) -> Optional[float]:
+        self.N = sizing["N"]
+        self.P_tot = sizing["P_tot"]
+        self.hyd = HydrogenTank(self.P_tot * self.T, tank_mass=sizing["tank_mass"], mh2=sizing["mh2"])
+        if sizing["I_ratio"] is not None:
+            self.I_ratio = sizing["I_ratio"]
+
+        self.convergence = None
+        if sizing["convergence"] is not None:
+            self.convergence = ConvergenceResult(*sizing["convergence"])
+
+        return sizing["mass"]
 
     def compute_weight(
-        self, max_iter: int = 1000, tw_f=1.2, co_eff=0.9, tank_mass=None, mh2=None
+        self, max_iter: int = 1000, tw_f=1.2, co_eff=0.9, tank_mass=None, mh2=None, solver=None, tol=0.001
     ) -> Optional[float]:
         m_prop = self.propeller.mass * self.Nm  # Mass of the propellers
         m_motor = self.motor.mass * self.Nm  # Mass of the motors
         m_esc = self.esc.mass * self.Nm
         if mh2 is None:
-            m_tot = (
-                mass_components
-                + m_prop
-                + m_motor
-                + m_esc
-            )
-            diff = 10000
-            i = 0
-            while diff > 0.001:
+            def mass_update(m_tot):
                 T_req = m_tot * g
                 T_req_m = T_req / self.Nm / co_eff
                 self.N = self.propeller.required_rpm(T_req_m)
@@ -86,18 +147,24 @@ class Drone:
                 E_tot = self.P_tot * self.T
                 self.hyd = HydrogenTank(E_tot, tank_mass=tank_mass)
                 m_hyd = self.hyd.tot_mass()
-                m_new = (
+                return (
                     mass_components
                     + m_prop
                     + m_motor
                     + m_esc
                     + m_hyd
                 )
-                diff = abs(m_new - m_tot)
-                m_tot = m_new
-                i += 1
-                if i == max_iter:
-                    return None
+
+            m_tot = (
+                mass_components
+                + m_prop
+                + m_motor
+                + m_esc
+            )
+            solver = get_solver(solver, tol=tol, max_iter=max_iter)
+            m_tot, self.convergence = solver.solve(mass_update, m_tot)
+            if m_tot is None:
+                return None
         else:
             m_tot = (
                     mass_components
@@ -116,6 +183,7 @@ class Drone:
             self.P_tot = P * self.Nm * tw_f + power_components
             E_tot = self.P_tot * self.T
             self.hyd = HydrogenTank(E_tot, tank_mass=tank_mass, mh2=mh2)
+            self.convergence = None
 
         self.I_ratio = self.check_for_max(m_tot, co_eff)
 
@@ -130,13 +198,15 @@ class Drone:
 
         return I / self.motor.Immax
 
-    def compute_endurance(self, av_t, co_eff=0.9, tw_f=1.2, mh2=0.12, Ppay=None, Ptot=False):
+    def compute_endurance(self, av_t, co_eff=0.9, tw_f=1.2, mh2=0.12, Ppay=None, Ptot=False, mass=None):
+        if mass is None:
+            mass = self.mass
         if mh2 is None:
             E = self.hyd.mh2 * self.hyd.U
-            T_req_m = self.mass * g / self.Nm / co_eff * av_t
+            T_req_m = mass * g / self.Nm / co_eff * av_t
         else:
             E = mh2 * self.hyd.U
-            T_req_m = (self.mass - self.hyd.mh2 + mh2) * g / self.Nm / co_eff * av_t
+            T_req_m = (mass - self.hyd.mh2 + mh2) * g / self.Nm / co_eff * av_t
         N = self.propeller.required_rpm(T_req_m)
         M = self.propeller.forces(N)[1]
         V, I = self.motor.VandI(M, N)
@@ -151,6 +221,7 @@ class Drone:
             return E / P_tot
 
     def plot_endurance_TW(self):
+        plt = pyplot()
         avt_arr = np.arange(1, 2.05, 0.05)
         end_arr = []
         for avt in avt_arr:
@@ -175,6 +246,7 @@ class Drone:
         verts=None,
         vertlabels=None,
     ):
+        plt = pyplot(cycle=None)
         plt.grid(which="minor", linewidth=0.2)
         plt.grid(which="major", linewidth=1)
         plt.minorticks_on()
@@ -206,67 +278,59 @@ class Drone:
         plt.ylabel(ylabel)
         plt.plot(x, y, alpha=1.0, label=label)
 
-    def plot_PT(self):
-        T_motor = []
-        P_motor = []
-        V_motor = []
-        I_motor = []
-        M_motor = []
-        eta_motor = []
-
-        throttle = []
-        V_esc = []
-        I_esc = []
-
-        V_fc = []
-        I_fc = []
-        P_fc = []
-
-
-        N_arr = range(0, 100000, 10)
-        found = False
+    def operating_curve(self, N=None):
+        # Propeller -> motor -> ESC -> fuel cell chain of one motor over an RPM grid
+        if N is None:
+            N = np.arange(0, 100000, 10)
+        N = np.asarray(N, dtype=float)
 
-        for N in N_arr:
-            T, M = self.propeller.forces(N)
-            V, I = self.motor.VandI(M, N)
-            P = I * V
-            if self.motor.Immax < I and found is False:
-                T3 = T
-                N3 = N
-                # print(T3*self.Nm/self.mass/g)
-                found = True
-            T_motor.append(T)
-            P_motor.append(P)
-            I_motor.append(I)
-            V_motor.append(V)
-            M_motor.append(M)
-
-            eta_motor.append(M * N * 2 * np.pi / 60 / P)
-
-            P_tot = self.Nm * P + power_components
-
-            I_f, V_f = self.fuelcell.get_current_voltage(P_tot)
-
-            I_fc.append(I_f)
-            V_fc.append(V_f)
-
-            P_fc.append(I_f * V_f)
-
-            throt = self.esc.throttle(V, I, V_f)
-            throttle.append(throt)
-
-            I_e = self.esc.inputI(V, I, V_f)
-            V_e = self.esc.inputV(V_f, I_f, 0.1)
+        T, M = self.propeller.forces(N)
+        V, I = self.motor.VandI(M, N)
+        P = V * I
 
-            I_esc.append(I_e)
-            V_esc.append(V_e)
+        V_fc = self.fuelcell.get_current_voltage(self.Nm * P)[1]
+        I_esc = self.esc.inputI(V, I, V_fc)
+        I_fc = I_esc * self.Nm + I_components
+
+        curve = np.empty(len(N), dtype=[(field, float) for field in curve_fields])
+        curve["N"] = N
+        curve["T"] = T
+        curve["M"] = M
+        curve["P"] = P
+        curve["V"] = V
+        curve["I"] = I
+        curve["eta"] = M * N * 2 * np.pi / 60 / P
+        curve["throttle"] = self.esc.throttle(V, I, V_fc)
+        curve["V_esc"] = self.esc.inputV(V_fc, I_fc, 0.1)
+        curve["I_esc"] = I_esc
+        curve["V_fc"] = V_fc
+        curve["I_fc"] = I_fc
+        curve["P_fc"] = V_fc * I_fc
+
+        return curve
 
+    def plot_PT(self):
+        curve = self.operating_curve(np.arange(0, 100000, 10))
+        N_arr = curve["N"]
+        T_motor = curve["T"]
+        P_motor = curve["P"]
+        V_motor = curve["V"]
+        I_motor = curve["I"]
+        M_motor = curve["M"]
+        eta_motor = curve["eta"]
+
+        # First point above the maximum motor current
+        above = I_motor > self.motor.Immax
+        if not above.any():
+            raise ValueError("The motor current stays below Immax over the RPM sweep")
+        T3, N3 = curve[["T", "N"]][np.argmax(above)]
 
         T1 = self.mass * g / self.Nm
         T2 = self.mass * 2 * g / self.Nm
         N1 = self.propeller.required_rpm(T1)
         N2 = self.propeller.required_rpm(T2)
 
+        plt = pyplot()
         fig = plt.figure(figsize=[12, 6])
         # fig.suptitle("Performance plots for each engine", fontsize=20)
 
@@ -371,53 +435,29 @@ class Drone:
         plt.show()
 
     def plot_ESC_FC(self):
-        throttle = []
-        V_esc = []
-        I_esc = []
-
-        V_fc = []
-        I_fc = []
-        P_fc = []
-
-        N_arr = range(0, 10000, 10)
-        found = False
-
+        curve = self.operating_curve(np.arange(0, 10000, 10))
+        N_arr = curve["N"]
+        throttle = curve["throttle"]
+        V_esc = curve["V_esc"]
+        I_esc = curve["I_esc"]
+        V_fc = curve["V_fc"]
+        I_fc = curve["I_fc"]
+        P_fc = curve["P_fc"]
+
+        # First point above the maximum fuel cell power
         P_max = self.fuelcell.Imax * self.fuelcell.get_voltage(self.fuelcell.Imax)
-
-        for N in N_arr:
-            T, M = self.propeller.forces(N)
-            V, I = self.motor.VandI(M, N)
-            P = I * V
-
-            V_f = self.fuelcell.get_current_voltage(self.Nm * P)[1]
-
-            throt = self.esc.throttle(V, I, V_f)
-            throttle.append(throt)
-
-            I_e = self.esc.inputI(V, I, V_f)
-            I_f = I_e * self.Nm + I_components
-            V_e = self.esc.inputV(V_f, I_f, 0.1)
-
-            I_esc.append(I_e)
-            V_esc.append(V_e)
-
-            V_fc.append(V_f)
-            I_fc.append(I_f)
-
-            P_f = V_f * I_f
-            P_fc.append(P_f)
-
-            if P_f > P_max and found is False:
-                T3 = T
-                N3 = N
-                print(T3 * self.Nm / self.mass / g)
-                found = True
+        above = P_fc > P_max
+        if not above.any():
+            raise ValueError("The fuel cell power stays below its maximum over the RPM sweep")
+        T3, N3 = curve[["T", "N"]][np.argmax(above)]
+        print(T3 * self.Nm / self.mass / g)
 
         T1 = self.mass * g / self.Nm
         T2 = self.mass * 2 * g / self.Nm
         N1 = self.propeller.required_rpm(T1)
         N2 = self.propeller.required_rpm(T2)
 
+        plt = pyplot()
         fig = plt.figure(figsize=[10, 6])
 
         ax9 = fig.add_subplot(2, 3, 1)
@@ -498,6 +538,8 @@ class Drone:
 
 
     def validation(self):
+        import pandas as pd
+
         try:
             data = pd.read_csv(f'../experimental_data/{self.propeller.name}.csv')
         except FileNotFoundError:
@@ -522,6 +564,7 @@ class Drone:
             M_model.append(Mi)
             eta_model.append(etai)
 
+        plt = pyplot()
         fig = plt.figure(figsize=[8, 6])
 
         ax1 = fig.add_subplot(2, 2, 1)
@@ -562,10 +605,10 @@ class Drone:
         plt.xlim(left=0)
         plt.ylim(bottom=0)
 
-        T_err = mean_squared_error(T, T_model, squared=False)
-        M_err = mean_squared_error(M, M_model, squared=False)
-        P_err = mean_squared_error(P, P_model, squared=False)
-        eta_err = mean_squared_error(eta, eta_model, squared=False)
+        T_err = rmse(T, T_model)
+        M_err = rmse(M, M_model)
+        P_err = rmse(P, P_model)
+        eta_err = rmse(eta, eta_model)
 
         T_mean = np.mean(T_model)
         M_mean = np.mean(M_model)
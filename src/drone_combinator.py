@@ -1,45 +1,322 @@
-import json
-from prettytable import PrettyTable
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from itertools import chain
+
+import numpy as np
+
+from src.batch_drone import BatchDrone
+from src.catalog import Catalog, build, catalog
+from src.components import g, mass_components, power_components
+from src.configuration import configuration
 from src.drone import Drone
-from src.shelf_drone import ShelfPropeller, ShelfMotor, ShelfESC
+from src.power import HydrogenTank
+from src.result_store import ResultStore, component_hashes
+from src.selection import KeepAll, TopK, ParetoFront
+from src.solver import get_solver
+
+kinds = ("motor", "propeller", "esc")
+
+# Limit columns of each component, propellers have none
+ratings = {
+    "motor": ("Immax",),
+    "propeller": (),
+    "esc": ("Iemax", "Iecont"),
+}
+
+# Sizer of the worker process, set once by init_worker
+sizer = None
+
+
+def init_worker(directory, experimental, prune=False):
+    # Forked workers reuse the catalog columns of the parent, others open the catalog again
+    global sizer
+    registry = catalog
+    if (directory, experimental) != (catalog.directory, catalog.experimental):
+        registry = Catalog(directory, experimental)
+    sizer = CombinationSizer(tuple(registry.columns(kind) for kind in kinds), prune)
+
+
+def size_combinations(indices, selection=KeepAll, spill=False, store=False):
+    return sizer(indices, selection, spill, store)
+
+
+def operating_point(propeller, motor, m_tot, Nm, co_eff=0.9):
+    # Motor voltage and current in the sizing loop of Drone.compute_weight, arrays or scalars
+    N = propeller.required_rpm(m_tot * g / Nm / co_eff)
+    M = propeller.forces(N)[1]
+    return motor.VandI(M, N)
+
+
+def feasible(drone):
+    # Hover current within the rating of the motor
+    I = operating_point(drone.propeller, drone.motor, drone.mass, drone.Nm)[1]
+    return I <= drone.motor.Immax
+
+
+def spill_record(index, drone):
+    return (
+        index, drone.propeller.name, drone.motor.name, drone.esc.name,
+        drone.mass, drone.compute_endurance(1), drone.I_ratio, drone.hyd.mh2,
+    )
+
+
+def undominated(columns, ratings):
+    # A component is dominated by another that is no heavier, has no lower limit in any of
+    # the ratings and is strictly better in one of these. Components without ratings are kept.
+    keep = np.ones(len(columns), dtype=bool)
+    if not ratings:
+        return keep
+
+    scores = list(zip((-columns["mass"]).tolist(), *(columns[rating].tolist() for rating in ratings)))
+    # Lightest first, a component can then only be dominated by one already on the front
+    front = []
+    for i in sorted(range(len(columns)), key=lambda i: tuple(-score for score in scores[i])):
+        if any(all(a >= b for a, b in zip(kept, scores[i])) and kept != scores[i] for kept in front):
+            keep[i] = False
+        else:
+            front.append(scores[i])
+
+    return keep
+
+
+class CombinationSizer:
+    # Sizes combinations of catalog rows, components are built once per row. Without prune,
+    # drones above the motor current rating are kept as well.
+    def __init__(self, columns, prune=False):
+        self.columns = columns
+        self.prune = prune
+        self.built = {}
+
+    def component(self, kind, row):
+        key = (kind, row)
+        if key not in self.built:
+            self.built[key] = build(kind, self.columns[kinds.index(kind)][row])
+        return self.built[key]
+
+    def __call__(self, indices, selection=KeepAll, spill=False, store=False, stored=None):
+        # Combination index = (motor * n_propellers + propeller) * n_escs + esc. Feasible drones
+        # are offered to a selection of the chunk, the ones it gives up are only kept as spill records.
+        # Combinations with a stored (status, sizing) are not sized again, with store the outcome
+        # of the others is returned for the result store.
+        shape = tuple(len(columns) for columns in self.columns)
+        selection = selection()
+        records = []
+        outcomes = []
+        pruned = {"not converged": 0, "current": 0}
+        dropped = tuple(pruned) if self.prune else ("not converged",)
+
+        for n, (index, motor, propeller, esc) in enumerate(zip(indices.tolist(), *np.unravel_index(indices, shape))):
+            status, sizing = stored[n] if stored is not None else (None, None)
+            if status in dropped:
+                pruned[status] += 1
+                continue
+
+            drone = Drone(
+                propeller=self.component("propeller", int(propeller)),
+                motor=self.component("motor", int(motor)),
+                esc=self.component("esc", int(esc)),
+                sizing=sizing,
+            )
+
+            if status is None:
+                if not drone.mass:
+                    status = "not converged"
+                elif not feasible(drone):
+                    status = "current"
+                else:
+                    status = "feasible"
+                if store:
+                    outcomes.append((index, status, drone.sizing(drone.mass) if drone.mass else None))
+
+            if status in dropped:
+                pruned[status] += 1
+            else:
+                evicted = selection.offer(index, drone)
+                if spill:
+                    records += [spill_record(*candidate) for candidate in evicted]
+
+        return selection.entries(), records, outcomes, pruned
 
 
 class DroneCombinator:
     motors = None
     propellers = None
+    escs = None
 
-    def __init__(self):
+    def __init__(
+        self,
+        workers: int = 1,
+        chunksize: int = 256,
+        prune: bool = False,
+        top_k: int = None,
+        pareto: bool = False,
+        spill: str = None,
+        store=None,
+        registry: Catalog = catalog,
+    ):
         self.drones = []
+        # Sized in this process by default, workers=None uses every CPU
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.prune = prune
+        self.registry = registry
+
+        # Streaming modes keep only the top_k lightest drones or the Pareto front, over mass,
+        # endurance, current ratio and hydrogen mass. The others can be written to a spill csv.
+        if top_k is not None and pareto:
+            raise ValueError("Choose either top_k or pareto")
+        self.selection = KeepAll
+        if top_k is not None:
+            self.selection = partial(TopK, top_k)
+        elif pareto:
+            self.selection = ParetoFront
+        self.spill = spill
+        self.n_spilled = 0
+
+        # Results of earlier runs in a ResultStore or the path of its sqlite file, only combinations
+        # with a new or changed component are sized again
+        if isinstance(store, str):
+            store = ResultStore(store, ResultStore.key(configuration, get_solver()))
+        self.store = store
+        self.hashes = None
+        self.n_stored = 0
+
+        # Number of combinations removed by each stage, the ones left over were sized or restored
+        self.pruned = {"dominated": 0, "bound": 0, "not converged": 0, "current": 0}
+        self.dominated = []
+        self.n_sized = 0
 
         self.read_motor_prop()
         self.create_drones()
         self.sort_drones()
 
     def read_motor_prop(self):
-        with open("../datasets/motor.json", "r") as file:
-            self.motors = json.load(file)
-
-        with open("../datasets/propeller.json", "r") as file:
-            self.propellers = json.load(file)
+        # Structured catalog columns, memory mapped when the catalogs were converted
+        self.motors = self.registry.columns("motor")
+        self.propellers = self.registry.columns("propeller")
+        self.escs = self.registry.columns("esc")
 
     def create_drones(self):
-        for motor_name in self.motors:
-            for prop_name in self.propellers:
-                motor = ShelfMotor(motor_name)
-                propeller = ShelfPropeller(prop_name)
-                esc = ShelfESC("T-Motor FLAME 60A")
-                drone = Drone(propeller=propeller, motor=motor, esc=esc)
+        space = (self.motors, self.propellers, self.escs)
+        n = len(self.motors) * len(self.propellers) * len(self.escs)
+
+        keep = [np.ones(len(columns), dtype=bool) for columns in space]
+        if self.prune:
+            keep = [undominated(columns, ratings[kind]) for kind, columns in zip(kinds, space)]
+            for columns, kept in zip(space, keep):
+                self.dominated += columns["name"][~kept].tolist()
+
+            indices = np.flatnonzero(keep[0][:, None, None] & keep[1][None, :, None] & keep[2][None, None, :])
+            self.pruned["dominated"] = n - len(indices)
+
+            indices = indices[self.bound(space, indices)]
+            self.pruned["bound"] = n - self.pruned["dominated"] - len(indices)
+        else:
+            indices = np.arange(n)
+
+        sizer = CombinationSizer(space, self.prune)
+        spill = self.spill is not None
+        store = self.store is not None
+        chunks = [indices[start:start + self.chunksize] for start in range(0, len(indices), self.chunksize)]
+
+        # Per chunk the combinations to size and the results restored from the store
+        if store:
+            self.register(space, keep)
+            parts = (self.lookup(sizer, chunk, spill) for chunk in chunks)
+        else:
+            self.n_sized = len(indices)
+            parts = ((chunk, []) for chunk in chunks)
+
+        # Chunks come back in submission order, so the result does not depend on the workers
+        if self.workers == 1 or len(chunks) <= 1:
+            self.merge(chain.from_iterable(
+                restored + [sizer(new, self.selection, spill, store)] for new, restored in parts
+            ))
+        else:
+            initargs = (self.registry.directory, self.registry.experimental, self.prune)
+            with ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=initargs) as executor:
+                sizing = partial(size_combinations, selection=self.selection, spill=spill, store=store)
+                pending = [(restored, executor.submit(sizing, new)) for new, restored in parts]
+                self.merge(chain.from_iterable(restored + [future.result()] for restored, future in pending))
+
+    def register(self, space, keep):
+        # Component hashes of the catalogs, marked current in the store when they are not dominated
+        self.hashes = [component_hashes(kind, columns) for kind, columns in zip(kinds, space)]
+        for kind, columns, hashes, kept in zip(kinds, space, self.hashes, keep):
+            self.store.set_components(kind, hashes, columns["name"], kept)
 
-                if drone.mass:
-                    self.drones.append(drone)
+    def lookup(self, sizer, chunk, spill):
+        # Splits a chunk into the combinations to size and the sizer result of the stored ones,
+        # only the stored results of this chunk are read
+        stored = self.store.lookup([self.combination(index) for index in chunk.tolist()])
+        new = np.array([result is None for result in stored], dtype=bool)
+        self.n_stored += int(np.count_nonzero(~new))
+        self.n_sized += int(np.count_nonzero(new))
+
+        restored = sizer(chunk[~new], self.selection, spill, stored=[result for result in stored if result is not None])
+        return chunk[new], [restored]
+
+    def combination(self, index):
+        motor, propeller, esc = np.unravel_index(index, tuple(len(hashes) for hashes in self.hashes))
+        return self.hashes[0][motor], self.hashes[1][propeller], self.hashes[2][esc]
+
+    def merge(self, results):
+        # Chunk selections are offered to the overall one as they arrive, the result of a selection
+        # over all chunks is the same as over all candidates
+        selection = self.selection()
+        with open(self.spill, "w", newline="") if self.spill else nullcontext() as file:
+            writer = csv.writer(file) if file else None
+            if writer:
+                writer.writerow(("index", "propeller", "motor", "esc", "mass", "endurance", "I_ratio", "mh2"))
+
+            for entries, records, outcomes, pruned in results:
+                for index, drone in entries:
+                    evicted = selection.offer(index, drone)
+                    if writer:
+                        records += [spill_record(*candidate) for candidate in evicted]
+                if writer:
+                    writer.writerows(records)
+                self.n_spilled += len(records)
+
+                for stage, count in pruned.items():
+                    self.pruned[stage] += count
+
+                if outcomes:
+                    self.store.add((*self.combination(index), status, sizing) for index, status, sizing in outcomes)
+
+        self.drones = selection.drones()
+
+    @staticmethod
+    def bound(space, indices, co_eff=0.9, tw_f=1.2):
+        # One mass update from the fixed component mass, the first step of the sizing loop. The
+        # update increases with the mass and the sizing returns an update of an iterate at least
+        # as heavy, so the sized mass is never below this bound. If the hover current is above
+        # the motor rating at the bound, it is above it for the sized drone as well.
+        motors, propellers, escs = space
+        i_motor, i_propeller, i_esc = np.unravel_index(indices, tuple(len(columns) for columns in space))
+        propeller, motor, esc = BatchDrone.components(propellers[i_propeller], motors[i_motor], escs[i_esc])
+
+        T, Nm = configuration["mission"]["T"], configuration["mission"]["Nm"]
+        m_fixed = mass_components + (propeller.mass + motor.mass + esc.mass) * Nm
+        with np.errstate(over="ignore", invalid="ignore"):
+            V, I = operating_point(propeller, motor, m_fixed, Nm, co_eff)
+            m_bound = m_fixed + HydrogenTank((V * I * Nm * tw_f + power_components) * T).tot_mass()
+            I = operating_point(propeller, motor, m_bound, Nm, co_eff)[1]
+        return ~(I > motor.Immax)
 
     def sort_drones(self):
+        # Stable, equal masses keep the combination order
         self.drones.sort(key=lambda drone: drone.mass)
 
         return self.drones
 
     def print_drones(self, count: int = 5, upper_limit: float = 12):
-        table = PrettyTable(("i", "Propeller", "Motor", "Mass", "RPM", "Current Ratio", 'Mass of Hydrogen'))
+        from prettytable import PrettyTable
+
+        table = PrettyTable(("i", "Propeller", "Motor", "ESC", "Mass", "RPM", "Current Ratio", 'Mass of Hydrogen'))
 
         for idx, drone in enumerate(self.drones[:count]):
             if drone.mass > upper_limit:
@@ -50,6 +327,7 @@ class DroneCombinator:
                     idx + 1,
                     drone.propeller,
                     drone.motor,
+                    drone.esc,
                     f"{drone.mass:.2f} kg",
                     f"{drone.N:.2f} rpm",
                     f"{drone.I_ratio:.2f}",
@@ -63,12 +341,28 @@ class DroneCombinator:
     def __getitem__(self, item):
         return self.drones[item]
 
-    def get_csv(self):
-        with open("../datasets/combinator.csv", 'w') as f:
-            f.write(self.table.get_csv_string())
+    def get_csv(self, path: str = "../datasets/combinator.csv"):
+        # All drones lightest first, streamed from the result store when there is one
+        if self.store is not None:
+            statuses = ("feasible",) if self.prune else ("feasible", "current")
+            rows = (
+                (propeller, motor, esc, mass, sizing["N"], sizing["I_ratio"], sizing["mh2"])
+                for propeller, motor, esc, mass, sizing in self.store.feasible(statuses)
+            )
+        else:
+            rows = (
+                (drone.propeller.name, drone.motor.name, drone.esc.name, drone.mass, drone.N, drone.I_ratio,
+                 drone.hyd.mh2)
+                for drone in self.drones
+            )
+
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(("Propeller", "Motor", "ESC", "Mass", "RPM", "Current Ratio", "Mass of Hydrogen"))
+            writer.writerows(rows)
 
 
 if __name__ == "__main__":
-    combinations = DroneCombinator()
+    combinations = DroneCombinator(store="../datasets/combinator.sqlite")
     combinations.print_drones(count=10, upper_limit=15)
     combinations.get_csv()
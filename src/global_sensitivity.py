@@ -0,0 +1,174 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+from scipy.stats import qmc
+
+from src.sensitivity_analysis import fixed, size_factors
+
+morris_dtype = [
+    ("type", "U16"), ("parameter", "U16"), ("mu_star", "f8"), ("mu_star_ci", "f8"), ("mu", "f8"), ("sigma", "f8"),
+]
+sobol_dtype = [("type", "U16"), ("parameter", "U16"), ("S1", "f8"), ("S1_ci", "f8"), ("ST", "f8"), ("ST_ci", "f8")]
+
+
+def size_masses(config, parameters, factors):
+    # Masses of the designs in the rows of the factors, nan where the sizing does not converge
+    return size_factors(config, parameters, factors).mass
+
+
+def sobol_indices(fA, fB, fAB):
+    # First order (Saltelli 2010) and total (Jansen) indices from the outputs of the sample
+    # matrices A and B and of A with column i from B, one column of fAB per parameter
+    V = np.var(np.concatenate([fA, fB]))
+    S1 = np.mean(fB[:, None] * (fAB - fA[:, None]), axis=0) / V
+    ST = 0.5 * np.mean((fA[:, None] - fAB) ** 2, axis=0) / V
+    return S1, ST
+
+
+def bootstrap(statistic, n, rng, resamples=100, confidence=0.95):
+    # Half width of the percentile confidence interval of a statistic over n rows
+    values = np.array([statistic(rng.integers(n, size=n)) for _ in range(resamples)])
+    lower, upper = np.nanquantile(values, [(1 - confidence) / 2, (1 + confidence) / 2], axis=0)
+    return (upper - lower) / 2
+
+
+class GlobalSensitivity:
+    # Morris elementary effects and Sobol indices of the sized mass over the config parameters,
+    # each varied by +-spread percent of its value in the drone. Samples come from scrambled Sobol
+    # sequences and are doubled until the confidence intervals are narrower than tol or the
+    # sample limit is reached. Batches are sized as BatchDrone, over a process pool for workers > 1.
+    def __init__(self, drone, parameters=None, spread=25, workers=1, chunksize=8192, seed=0):
+        self.config = drone.config
+        self.initial_mass = drone.mass
+        if parameters is None:
+            parameters = [(typ, parameter) for typ, section in self.config.items() for parameter in section]
+        self.parameters = [(typ, parameter) for typ, parameter in parameters if parameter not in fixed]
+
+        self.spread = spread
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.rng = np.random.default_rng(seed)
+
+        self.n_evaluations = 0
+        self.converged = None
+        self.executor = None
+
+    def factors(self, unit):
+        # Unit hypercube to parameter multipliers
+        return 1 + self.spread / 100 * (2 * unit - 1)
+
+    def evaluate(self, unit):
+        # Relative mass change in percent for every row of unit hypercube points
+        factors = self.factors(np.asarray(unit))
+        chunks = [factors[start:start + self.chunksize] for start in range(0, len(factors), self.chunksize)]
+        if self.executor is None:
+            masses = [size_masses(self.config, self.parameters, chunk) for chunk in chunks]
+        else:
+            n = len(chunks)
+            masses = list(self.executor.map(size_masses, [self.config] * n, [self.parameters] * n, chunks))
+
+        self.n_evaluations += len(factors)
+        return (np.concatenate(masses) - self.initial_mass) / self.initial_mass * 100
+
+    def pool(self):
+        if self.workers == 1:
+            return nullcontext()
+        return ProcessPoolExecutor(self.workers)
+
+    def rows(self, dtype):
+        rows = np.zeros(len(self.parameters), dtype=dtype)
+        rows["type"] = [typ for typ, _ in self.parameters]
+        rows["parameter"] = [parameter for _, parameter in self.parameters]
+        return rows
+
+    def morris(self, trajectories=32, max_trajectories=2048, levels=4, tol=0.05, resamples=100):
+        # Effects are the mass change in percent over the full parameter range, trajectories step
+        # every parameter once by delta in random order and direction. The confidence interval of
+        # mu* is compared with tol times the largest mu*.
+        k = len(self.parameters)
+        delta = levels / (2 * (levels - 1))
+        engine = qmc.Sobol(k, seed=self.rng)
+        effects = np.zeros((0, k))
+
+        with self.pool() as self.executor:
+            n = trajectories
+            while True:
+                start = np.floor(engine.random(n) * levels / 2) / (levels - 1)
+                order = self.rng.permuted(np.tile(np.arange(k), (n, 1)), axis=1)
+                sign = self.rng.choice([-1.0, 1.0], size=(n, k))
+
+                # Parameters stepping down start one step higher
+                points = np.repeat((start + delta * (sign < 0))[:, None, :], k + 1, axis=1)
+                for step in range(k):
+                    changed = order[:, step]
+                    points[np.arange(n), step + 1:, changed] += sign[np.arange(n), changed, None] * delta
+                y = self.evaluate(points.reshape(-1, k)).reshape(n, k + 1)
+
+                batch = np.empty((n, k))
+                batch[np.arange(n)[:, None], order] = np.diff(y, axis=1) * sign[np.arange(n)[:, None], order] / delta
+                effects = np.vstack([effects, batch])
+
+                mu_star = np.nanmean(np.abs(effects), axis=0)
+                ci = bootstrap(lambda rows: np.nanmean(np.abs(effects[rows]), axis=0), len(effects), self.rng,
+                               resamples)
+                self.converged = bool(np.all(ci <= tol * np.max(mu_star)))
+                if self.converged or len(effects) >= max_trajectories:
+                    break
+                n = min(len(effects), max_trajectories - len(effects))
+        self.executor = None
+
+        rows = self.rows(morris_dtype)
+        rows["mu_star"] = mu_star
+        rows["mu_star_ci"] = ci
+        rows["mu"] = np.nanmean(effects, axis=0)
+        rows["sigma"] = np.nanstd(effects, axis=0)
+        return rows
+
+    def sobol(self, samples=512, max_samples=2**14, tol=0.05, resamples=100):
+        # Saltelli sampling with N (k + 2) sizings for N base samples, N is a power of two and
+        # doubles until the confidence intervals of all indices are narrower than tol
+        k = len(self.parameters)
+        engine = qmc.Sobol(2 * k, seed=self.rng)
+        outputs = np.zeros((0, k + 2))
+
+        with self.pool() as self.executor:
+            base = engine.random_base2(int(np.log2(samples)))
+            drawn = len(base)
+            while True:
+                A, B = base[:, :k], base[:, k:]
+                AB = np.repeat(A[:, None, :], k, axis=1)
+                AB[:, np.arange(k), np.arange(k)] = B
+                y = self.evaluate(np.vstack([A, B, AB.reshape(-1, k)]))
+
+                n = len(base)
+                batch = np.column_stack([y[:n], y[n:2 * n], y[2 * n:].reshape(n, k)])
+                outputs = np.vstack([outputs, batch[np.all(np.isfinite(batch), axis=1)]])
+
+                def indices(rows):
+                    return np.concatenate(sobol_indices(outputs[rows, 0], outputs[rows, 1], outputs[rows, 2:]))
+
+                S1, ST = np.split(indices(slice(None)), 2)
+                S1_ci, ST_ci = np.split(bootstrap(indices, len(outputs), self.rng, resamples), 2)
+                self.converged = bool(np.all(np.concatenate([S1_ci, ST_ci]) <= tol))
+                if self.converged or 2 * drawn > max_samples:
+                    break
+                # The sequence continues with as many points again, keeping its balance
+                base = engine.random(drawn)
+                drawn += len(base)
+        self.executor = None
+
+        rows = self.rows(sobol_dtype)
+        rows["S1"], rows["S1_ci"], rows["ST"], rows["ST_ci"] = S1, S1_ci, ST, ST_ci
+        return rows
+
+
+if __name__ == "__main__":
+    from src.drone import Drone
+
+    analysis = GlobalSensitivity(Drone())
+    for rows in (analysis.morris(), analysis.sobol()):
+        print(f"{analysis.n_evaluations} sizings, converged: {analysis.converged}")
+        for row in rows:
+            print(*(f"{value:9.4f}" if isinstance(value, float) else f"{value:<8}" for value in row.tolist()))
@@ -0,0 +1,263 @@
+import math
+import time
+from collections import Counter, deque
+
+import numpy as np
+
+
+class LocalSearch:
+    # Improves routes of DroneRoute.find_route, fewer trips first and then less hydrogen. Trips are
+    # lists of turbine numbers, 0 is the OSS. Every trip caches its length and the distance to each
+    # of its turbines, so a move is evaluated in O(1) from the lengths of the trips it changes; the
+    # energy of a trip is length * E_cr + turbines * E_ins and stays within E_tot.
+    # Moves between a turbine and its nearest turbines:
+    #   2-opt      reverses part of a trip
+    #   relocate   moves a turbine to another trip
+    #   swap       exchanges two turbines of different trips
+    #   cross      exchanges the tails of two trips, or joins their heads and their tails
+    # Trips whose turbines all fit in other trips are merged away.
+    def __init__(self, drone, neighbours=10, eps=1e-7):
+        self.E_cr = drone.E_cr
+        self.E_ins = drone.E_ins
+        self.E_tot = drone.E_tot
+        self.speed = drone.speed
+        self.inspection_time = drone.inspection_time
+        self.n_neighbours = neighbours
+        self.eps = eps
+        self.moves = Counter()
+        self.changed = []
+        self.deadline = None
+        self.cancel = None
+
+    def load(self, route):
+        self.points = [(0.0, 0.0)]
+        self.trips = []
+        for trip in route:
+            stops = [tuple(map(float, point)) for point in trip[0][1:-1]]
+            self.trips.append(list(range(len(self.points), len(self.points) + len(stops))))
+            self.points.extend(stops)
+
+        n = len(self.points) - 1
+        k = min(self.n_neighbours + 1, n)
+        if k > 1:
+            from scipy.spatial import cKDTree
+
+            tree = cKDTree(np.array(self.points[1:]))
+            self.neighbours = [[]] + [[v + 1 for v in row[1:]] for row in tree.query(self.points[1:], k=k)[1].tolist()]
+        else:
+            self.neighbours = [[] for _ in range(n + 1)]
+        self.reverse = [[] for _ in range(n + 1)]
+        for u, neighbours in enumerate(self.neighbours):
+            for v in neighbours:
+                self.reverse[v].append(u)
+
+        self.trip_of = [0] * (n + 1)
+        self.position = [0] * (n + 1)
+        self.prefix = [None] * len(self.trips)
+        self.length = [0.0] * len(self.trips)
+        for r in range(len(self.trips)):
+            self.refresh(r)
+
+    def d(self, a, b):
+        return math.dist(self.points[a], self.points[b])
+
+    def refresh(self, r):
+        # Positions, distance from the OSS to every turbine along the trip and trip length
+        trip = self.trips[r]
+        prefix = []
+        distance, previous = 0.0, 0
+        for i, node in enumerate(trip):
+            self.trip_of[node] = r
+            self.position[node] = i
+            distance += self.d(previous, node)
+            prefix.append(distance)
+            previous = node
+        self.prefix[r] = prefix
+        self.length[r] = distance + self.d(previous, 0)
+
+    def node(self, r, i):
+        # Turbine at position i of trip r, the OSS before and after the trip
+        return self.trips[r][i] if 0 <= i < len(self.trips[r]) else 0
+
+    def tail(self, r, i):
+        # Distance from position i of trip r to the OSS along the trip
+        return self.length[r] - self.prefix[r][i] if i < len(self.trips[r]) else 0.0
+
+    def feasible(self, length, count):
+        return length * self.E_cr + count * self.E_ins <= self.E_tot
+
+    def energy(self, r):
+        return self.length[r] * self.E_cr + len(self.trips[r]) * self.E_ins
+
+    def improves(self, delta, emptied=False):
+        return emptied or delta < -self.eps
+
+    def apply(self, move, changes):
+        # changes: {trip: new turbine list}, empty trips are dropped at the end
+        for r, trip in changes.items():
+            self.trips[r] = trip
+            self.refresh(r)
+        self.changed = list(changes)
+        self.moves[move] += 1
+        return True
+
+    def two_opt(self, u, v):
+        r = self.trip_of[u]
+        i, j = sorted((self.position[u], self.position[v]))
+        trip = self.trips[r]
+        a, b, c = self.node(r, i - 1), trip[i], trip[j]
+        d = self.node(r, j + 1)
+        # Reversing i + 1..j joins b, c and reversing i..j - 1 joins b, c as well, from either side
+        options = []
+        if j > i + 1:
+            options.append((self.d(b, c) + self.d(trip[i + 1], d) - self.d(b, trip[i + 1]) - self.d(c, d), i + 1, j))
+            options.append((self.d(a, trip[j - 1]) + self.d(b, c) - self.d(a, b) - self.d(trip[j - 1], c), i, j - 1))
+        for delta, start, end in options:
+            if self.improves(delta):
+                return self.apply("2-opt", {r: trip[:start] + trip[start:end + 1][::-1] + trip[end + 1:]})
+        return False
+
+    def relocate(self, u, v):
+        r, s = self.trip_of[u], self.trip_of[v]
+        i, j = self.position[u], self.position[v]
+        pu, nu = self.node(r, i - 1), self.node(r, i + 1)
+        removed = self.d(pu, nu) - self.d(pu, u) - self.d(u, nu)
+        for position, (before, after) in ((j + 1, (v, self.node(s, j + 1))), (j, (self.node(s, j - 1), v))):
+            added = self.d(before, u) + self.d(u, after) - self.d(before, after)
+            length = self.length[s] + added
+            if self.feasible(length, len(self.trips[s]) + 1) and self.improves(removed + added, len(self.trips[r]) == 1):
+                trip = self.trips[s]
+                return self.apply("relocate", {r: self.trips[r][:i] + self.trips[r][i + 1:],
+                                               s: trip[:position] + [u] + trip[position:]})
+        return False
+
+    def swap(self, u, v):
+        r, s = self.trip_of[u], self.trip_of[v]
+        i, j = self.position[u], self.position[v]
+        pu, nu = self.node(r, i - 1), self.node(r, i + 1)
+        pv, nv = self.node(s, j - 1), self.node(s, j + 1)
+        delta_r = self.d(pu, v) + self.d(v, nu) - self.d(pu, u) - self.d(u, nu)
+        delta_s = self.d(pv, u) + self.d(u, nv) - self.d(pv, v) - self.d(v, nv)
+        if (self.improves(delta_r + delta_s) and self.feasible(self.length[r] + delta_r, len(self.trips[r]))
+                and self.feasible(self.length[s] + delta_s, len(self.trips[s]))):
+            trip_r, trip_s = list(self.trips[r]), list(self.trips[s])
+            trip_r[i], trip_s[j] = v, u
+            return self.apply("swap", {r: trip_r, s: trip_s})
+        return False
+
+    def cross(self, u, v):
+        r, s = self.trip_of[u], self.trip_of[v]
+        i, j = self.position[u], self.position[v]
+        trip_r, trip_s = self.trips[r], self.trips[s]
+        nu, nv = self.node(r, i + 1), self.node(s, j + 1)
+        before = self.length[r] + self.length[s]
+
+        # Tails exchanged: u continues with the tail of s, v with the tail of r
+        length_r = self.prefix[r][i] + self.d(u, nv) + self.tail(s, j + 1)
+        length_s = self.prefix[s][j] + self.d(v, nu) + self.tail(r, i + 1)
+        count_r, count_s = i + 1 + len(trip_s) - j - 1, j + 1 + len(trip_r) - i - 1
+        if (self.improves(length_r + length_s - before) and self.feasible(length_r, count_r)
+                and self.feasible(length_s, count_s)):
+            return self.apply("cross", {r: trip_r[:i + 1] + trip_s[j + 1:], s: trip_s[:j + 1] + trip_r[i + 1:]})
+
+        # Heads joined through u, v and tails joined, the second trip is empty when both tails are
+        length_r = self.prefix[r][i] + self.d(u, v) + self.prefix[s][j]
+        tail_r, tail_s = trip_r[i + 1:][::-1], trip_s[j + 1:]
+        length_s = self.tail(r, i + 1) + self.d(self.node(r, i + 1), nv) + self.tail(s, j + 1) if tail_r or tail_s else 0.0
+        count_r, count_s = i + j + 2, len(tail_r) + len(tail_s)
+        if (self.improves(length_r + length_s - before, count_s == 0) and self.feasible(length_r, count_r)
+                and self.feasible(length_s, count_s)):
+            return self.apply("cross", {r: trip_r[:i + 1] + trip_s[:j + 1][::-1], s: tail_r + tail_s})
+        return False
+
+    def search(self):
+        # First improvement from the turbines in the queue until none improves. A move queues the
+        # turbines of the trips it changed and the turbines that have them as neighbours.
+        queue = deque(range(1, len(self.points)))
+        queued = [False] + [True] * (len(self.points) - 1)
+        while queue:
+            if self.expired():
+                return
+            u = queue.popleft()
+            queued[u] = False
+            for v in self.neighbours[u]:
+                if self.trip_of[u] == self.trip_of[v]:
+                    moved = self.two_opt(u, v)
+                else:
+                    moved = self.relocate(u, v) or self.swap(u, v) or self.cross(u, v)
+                if moved:
+                    for r in self.changed:
+                        for w in self.trips[r]:
+                            for x in [w] + self.reverse[w]:
+                                if not queued[x]:
+                                    queued[x] = True
+                                    queue.append(x)
+                    if not queued[u]:
+                        queued[u] = True
+                        queue.append(u)
+                    break
+
+    def expired(self):
+        return (self.deadline is not None and time.perf_counter() > self.deadline) or \
+            (self.cancel is not None and self.cancel.is_set())
+
+    def eliminate(self, r):
+        # Inserts the turbines of trip r next to their neighbours in other trips, all or none
+        saved = {r: self.trips[r]}
+        for u in list(self.trips[r]):
+            best = None
+            for v in self.neighbours[u]:
+                s = self.trip_of[v]
+                if s == r:
+                    continue
+                j = self.position[v]
+                for position, (before, after) in ((j + 1, (v, self.node(s, j + 1))), (j, (self.node(s, j - 1), v))):
+                    added = self.d(before, u) + self.d(u, after) - self.d(before, after)
+                    if self.feasible(self.length[s] + added, len(self.trips[s]) + 1) and (best is None or added < best[0]):
+                        best = (added, s, position)
+            if best is None:
+                for s, trip in saved.items():
+                    self.trips[s] = trip
+                    self.refresh(s)
+                return False
+            _, s, position = best
+            saved.setdefault(s, self.trips[s])
+            self.trips[r] = [node for node in self.trips[r] if node != u]
+            self.trips[s] = self.trips[s][:position] + [u] + self.trips[s][position:]
+            self.refresh(r)
+            self.refresh(s)
+        self.moves["merge"] += 1
+        return True
+
+    def merge_trips(self):
+        # Trips with the least energy first
+        merged = False
+        for r in sorted(range(len(self.trips)), key=self.energy):
+            if self.expired():
+                break
+            if self.trips[r] and self.eliminate(r):
+                merged = True
+        return merged
+
+    def improve(self, route, time_limit=None, return_dist=False, cancel=None):
+        # Stops with the best trips so far after time_limit seconds or once the cancel event is set
+        self.deadline = None if time_limit is None else time.perf_counter() + time_limit
+        self.cancel = cancel
+        self.load(route)
+        while not self.expired():
+            self.search()
+            if not self.merge_trips():
+                break
+        return self.route(return_dist)
+
+    def route(self, return_dist=False):
+        # Trips in the format of DroneRoute.find_route
+        route = []
+        for r, trip in enumerate(self.trips):
+            if not trip:
+                continue
+            E = self.energy(r)
+            t = self.length[r] / self.speed / 3600 + len(trip) * self.inspection_time
+            stops = [(0, 0)] + [list(self.points[node]) for node in trip] + [(0, 0)]
+            route.append((stops, E / 34000, t, self.length[r]) if return_dist else (stops, E / 34000, t))
+        return route
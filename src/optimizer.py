@@ -0,0 +1,244 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.optimize import OptimizeResult, minimize
+from scipy.stats import qmc
+
+from src.catalog import build, catalog
+from src.configuration import configuration
+from src.drone import Drone
+from src.power import HydrogenTank
+from src.sensitivity_analysis import size_factors
+
+# Design variables, (type, parameter) in the config or the hydrogen of a fixed tank
+variables = {
+    "Dp": ("propeller", "Dp"),
+    "Hp": ("propeller", "Hp"),
+    "Kv0": ("motor", "Kv0"),
+    "Rm": ("motor", "Rm"),
+    "mh2": ("hydrogen", "mh2"),
+    "tank_mass": ("hydrogen", "tank_mass"),
+}
+objectives = ("mass", "endurance")
+
+
+# Component masses scale with powers of the design parameters, exponents fitted to the catalog
+mass_models = {"propeller": (("Dp", "Hp"), "m_prop"), "motor": (("Kv0", "Rm"), "m_motor")}
+
+
+def mass_exponents(kind, registry=catalog):
+    columns = registry.columns(kind)
+    logs = np.column_stack([np.log(columns[parameter]) for parameter in mass_models[kind][0]] + [np.ones(len(columns))])
+    return np.linalg.lstsq(logs, np.log(columns["mass"]), rcond=None)[0][:-1]
+
+
+def minimum_tank_mass(mh2):
+    # Tank mass model of HydrogenTank for an unspecified tank
+    return HydrogenTank(0, mh2=mh2).tank_mass()
+
+
+class DesignOptimizer:
+    # Continuous design of a custom propeller and motor with a fixed hydrogen tank. Drones are
+    # evaluated as BatchDrone with the given mh2 and tank mass, the endurance is the hover time
+    # on that hydrogen. Propeller and motor masses scale from the drone with Dp, Hp and Kv0, Rm
+    # as in the catalogs.
+    # Constraints: I_ratio <= 1, which holds the T/W ratio of the mission within the motor
+    # rating, the endurance covers the mission time and the tank is at least as heavy as the
+    # tank model for its hydrogen. A scrambled Sobol sample is screened first,
+    # the best points start SLSQP runs, over a process pool for workers > 1.
+    def __init__(
+        self,
+        drone: Drone = None,
+        names=tuple(variables),
+        objective="mass",
+        bounds=None,
+        max_mass=None,
+        workers=1,
+        seed=0,
+    ):
+        if objective not in objectives:
+            raise ValueError(f"Unknown objective: {objective}")
+        if drone is None:
+            drone = Drone(configuration.copy())
+
+        self.config = drone.config
+        self.mission_time = self.config["mission"]["T"]
+        self.hydrogen = {"mh2": float(drone.hyd.mh2), "tank_mass": float(drone.hyd.tank_mass())}
+        self.names = list(names)
+        self.objective = objective
+        self.max_mass = max_mass
+        self.workers = workers or os.cpu_count() or 1
+        self.rng = np.random.default_rng(seed)
+
+        self.exponents = {kind: mass_exponents(kind) for kind in mass_models}
+
+        self.bounds = self.default_bounds()
+        self.bounds.update(bounds or {})
+        self.lower = np.array([self.bounds[name][0] for name in self.names], dtype=float)
+        self.upper = np.array([self.bounds[name][1] for name in self.names], dtype=float)
+
+    @staticmethod
+    def default_bounds():
+        # Propeller and motor parameters within the range of the catalogs
+        bounds = {}
+        for name, (kind, parameter) in variables.items():
+            if kind in ("propeller", "motor"):
+                column = catalog.columns(kind)[parameter]
+                bounds[name] = (float(column.min()), float(column.max()))
+        bounds["mh2"] = (0.01, 1.0)
+        bounds["tank_mass"] = (0.5, 10.0)
+        return bounds
+
+    def design(self, unit):
+        return self.lower + np.asarray(unit) * (self.upper - self.lower)
+
+    def evaluate(self, x) -> dict:
+        # Mass, endurance [h], I_ratio and constraint margins (>= 0 is feasible) for every row
+        x = np.atleast_2d(x)
+        values = dict(zip(self.names, x.T))
+        parameters = [variables[name] for name in self.names if variables[name][0] != "hydrogen"]
+        columns = [values[parameter] for _, parameter in parameters]
+        for kind, (drivers, mass) in mass_models.items():
+            scale = 1.0
+            for driver, exponent in zip(drivers, self.exponents[kind]):
+                if driver in values:
+                    scale = scale * (values[driver] / self.config[kind][driver]) ** exponent
+            if np.ndim(scale):
+                parameters.append((kind, mass))
+                columns.append(self.config[kind][mass] * scale)
+
+        base = np.array([self.config[typ][parameter] for typ, parameter in parameters])
+        factors = np.column_stack(columns) / base if parameters else np.ones((len(x), 0))
+        mh2 = values.get("mh2", np.full(len(x), self.hydrogen["mh2"]))
+        tank_mass = values.get("tank_mass", np.full(len(x), self.hydrogen["tank_mass"]))
+
+        batch = size_factors(self.config, parameters, factors, tank_mass=tank_mass, mh2=mh2)
+        endurance = mh2 * HydrogenTank(0).U / batch.P_tot
+
+        margins = [1 - batch.I_ratio, endurance / self.mission_time - 1, tank_mass - minimum_tank_mass(mh2)]
+        if self.max_mass is not None:
+            margins.append(1 - batch.mass / self.max_mass)
+        return {
+            "mass": batch.mass,
+            "endurance": endurance,
+            "I_ratio": batch.I_ratio,
+            "margins": np.nan_to_num(np.column_stack(margins), nan=-np.inf),
+        }
+
+    def cost(self, result):
+        return result["mass"] if self.objective == "mass" else -result["endurance"]
+
+    def screen(self, samples=1024):
+        # Sobol points in the unit box, feasible ones first, then by their objective
+        unit = qmc.Sobol(len(self.names), seed=self.rng).random_base2(int(np.log2(samples)))
+        result = self.evaluate(self.design(unit))
+        violation = np.sum(np.minimum(result["margins"], 0), axis=1)
+        order = np.lexsort((self.cost(result), -violation))
+        return unit[order]
+
+    def local(self, unit, step=np.sqrt(np.finfo(float).eps)):
+        # SLSQP in the unit box from one start point. Every point is sized once, together with its
+        # forward difference stencil in one BatchDrone batch, for the objective, the constraints
+        # and their jacobians. Steps go backwards at the upper bound.
+        cache = {}
+
+        def stencil(u):
+            key = u.tobytes()
+            if key not in cache:
+                h = np.where(u + step > 1, -step, step)
+                result = self.evaluate(self.design(np.vstack([u, u + np.diag(h)])))
+                cost = self.cost(result)
+                margins = np.maximum(result["margins"], -1e6)
+                cache.clear()
+                cache[key] = (
+                    float(cost[0]),
+                    (cost[1:] - cost[0]) / h,
+                    margins[0],
+                    (margins[1:] - margins[0]).T / h,
+                )
+            return cache[key]
+
+        solution = minimize(
+            lambda u: stencil(u)[0], unit, method="SLSQP", jac=lambda u: stencil(u)[1],
+            bounds=[(0, 1)] * len(unit),
+            constraints={"type": "ineq", "fun": lambda u: stencil(u)[2], "jac": lambda u: stencil(u)[3]},
+            options={"ftol": 1e-10, "maxiter": 200},
+        )
+        return solution.x, bool(np.all(stencil(solution.x)[2] >= -1e-6)), solution.nit
+
+    def optimize(self, starts=8, samples=1024) -> OptimizeResult:
+        points = self.screen(samples)[:starts]
+        if self.workers == 1 or starts == 1:
+            runs = [self.local(point) for point in points]
+        else:
+            with ProcessPoolExecutor(self.workers) as executor:
+                runs = list(executor.map(self.local, points))
+
+        designs = self.design(np.array([unit for unit, _, _ in runs]))
+        feasible = np.array([ok for _, ok, _ in runs])
+        result = self.evaluate(designs)
+        cost = np.where(feasible, self.cost(result), np.inf)
+        best = int(np.argmin(cost))
+
+        return OptimizeResult(
+            x=dict(zip(self.names, designs[best].tolist())),
+            fun=float(self.cost(result)[best]),
+            success=bool(feasible[best]),
+            mass=float(result["mass"][best]),
+            endurance=float(result["endurance"][best]),
+            I_ratio=float(result["I_ratio"][best]),
+            nit=sum(nit for _, _, nit in runs),
+            starts=designs,
+            feasible=feasible,
+        )
+
+    def snap(self, x: dict, neighbours=3, registry=catalog, esc=None):
+        # Catalog drones built from the propellers and motors closest to the design in log
+        # space, sized with the hydrogen and tank of the design, best objective first. Without
+        # an esc every motor gets the lightest catalog ESC whose continuous current covers its
+        # Immax. Designs without feasible parts are left out.
+        hydrogen = {name: x.get(name, self.hydrogen[name]) for name in ("mh2", "tank_mass")}
+        escs = registry.columns("esc")
+        candidates = {}
+        for kind in ("propeller", "motor"):
+            names = [name for name in self.names if variables[name][0] == kind]
+            columns = registry.columns(kind)
+            if not names:
+                candidates[kind] = np.arange(len(columns))
+                continue
+            distance = sum(np.log(columns[name] / x[name]) ** 2 for name in names)
+            candidates[kind] = np.argsort(distance)[:neighbours]
+
+        drones = []
+        for motor in candidates["motor"]:
+            motor = build("motor", registry.columns("motor")[motor])
+            if esc is not None:
+                motor_esc = esc
+            else:
+                covering = np.flatnonzero(escs["Iecont"] >= motor.Immax)
+                if not len(covering):
+                    continue
+                motor_esc = build("esc", escs[covering[np.argmin(escs["mass"][covering])]])
+
+            for propeller in candidates["propeller"]:
+                drone = Drone(
+                    propeller=build("propeller", registry.columns("propeller")[propeller]),
+                    motor=motor,
+                    esc=motor_esc,
+                    **hydrogen,
+                )
+                if drone.mass and drone.I_ratio <= 1:
+                    drones.append(drone)
+
+        if self.objective == "mass":
+            return sorted(drones, key=lambda drone: drone.mass)
+        return sorted(drones, key=lambda drone: -drone.compute_endurance(1, mh2=None))
+
+
+if __name__ == "__main__":
+    optimizer = DesignOptimizer()
+    result = optimizer.optimize()
+    print(result.x, f"{result.mass:.3f} kg, {result.endurance:.2f} h, I_ratio {result.I_ratio:.2f}")
+    for drone in optimizer.snap(result.x)[:3]:
+        print(drone.propeller, drone.motor, f"{drone.mass:.3f} kg")
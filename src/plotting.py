@@ -0,0 +1,13 @@
+from src.components import c1, c2, c3, c4, c5
+
+palette = dict(color=[c1, c2, c3, c4, c5])
+
+
+def pyplot(cycle=palette):
+    # matplotlib is only imported once something is plotted, the models stay headless
+    import matplotlib as mpl
+    import matplotlib.pyplot as plt
+
+    if cycle is not None:
+        mpl.rcParams['axes.prop_cycle'] = mpl.cycler(**cycle)
+    return plt
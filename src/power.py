@@ -1,6 +1,6 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from src.components import *
+from src.plotting import pyplot
 
 
 class HydrogenTank:
@@ -23,57 +23,74 @@ class HydrogenTank:
 
 
 class FuelCell:
+    # Polarization curve: two linear pieces V = V0 - R * I, joined at I_knee
+    left = (53, 1.4151)
+    right = (46.4505, 0.17934)
+    I_knee = 5.3
+
     def __init__(self):
         self.Imax = 75
 
     def get_voltage(self, I):
         def left_linear(x):
-            return 53 - 1.4151 * x
+            return self.left[0] - self.left[1] * x
 
         def right_linear(x):
-            return 46.4505 - 0.17934 * x
+            return self.right[0] - self.right[1] * x
+
+        if np.ndim(I) > 0:
+            I = np.asarray(I, dtype=float)
+            if np.any(I > self.Imax):
+                raise ValueError(f"Current larger than maximum: {I[I > self.Imax]}")
+            elif not np.all(I >= 0):
+                raise ValueError(f"Cannot get voltage from current: {I[~(I >= 0)]}")
+            return np.where(I <= self.I_knee, left_linear(I), right_linear(I))
 
         if I > self.Imax:
             raise ValueError(f"Current larger than maximum: {I}")
-        elif 0 <= I <= 5.3:
+        elif 0 <= I <= self.I_knee:
             return left_linear(I)
-        elif 5.3 < I <= self.Imax:
+        elif self.I_knee < I <= self.Imax:
             return right_linear(I)
         else:
             raise ValueError(f"Cannot get voltage from current: {I}")
 
     def get_current_voltage(self, power):
-
-        diff = 0.1
-
-        left_I = 0
-        right_I = self.Imax
-
-        mid_I = (left_I + right_I) / 2
-        mid_V = self.get_voltage(mid_I)
-
-        mid_power = mid_I * mid_V
-
-        while mid_I < self.Imax and abs(mid_power - power) > diff:
-
-            if mid_power > power:
-                right_I = mid_I
-            elif mid_power < power:
-                left_I = mid_I
-
-            mid_I = (left_I + right_I) / 2
-            mid_V = self.get_voltage(mid_I)
-
-            mid_power = mid_I * mid_V
-
-        return mid_I, mid_V
+        # P = I * (V0 - R * I) is quadratic on each piece, the lower root is the
+        # operating point. Powers above the maximum saturate at Imax.
+        def current(V0, R):
+            return (V0 - np.sqrt(V0**2 - 4 * R * power)) / (2 * R)
+
+        P_knee = self.I_knee * self.get_voltage(self.I_knee)
+        P_max = self.Imax * self.get_voltage(self.Imax)
+
+        if np.ndim(power) == 0:
+            power = float(power)
+            if power >= P_max:
+                I = self.Imax
+            elif power <= P_knee:
+                I = current(*self.left)
+            else:
+                I = max(current(*self.right), self.I_knee)
+            return I, self.get_voltage(I)
+
+        power = np.asarray(power, dtype=float)
+        with np.errstate(invalid="ignore"):
+            I = np.where(
+                power <= P_knee,
+                current(*self.left),
+                np.maximum(current(*self.right), self.I_knee)
+            )
+        I = np.where(power >= P_max, self.Imax, I)
+
+        return I, self.get_voltage(I)
 
     def plot(self):
         I = np.arange(0, self.Imax, 0.1)
-        get_voltage = np.vectorize(lambda x: self.get_voltage(x))
-        V = get_voltage(I)
+        V = self.get_voltage(I)
         P = I * V
 
+        plt = pyplot()
         fig, ax1 = plt.subplots(figsize=(6, 3))
 
         plt.grid(which="minor", axis="both", linewidth=0.2)
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import sqlite3
+import struct
+
+from src.cache import SizingCache
+
+
+def component_hashes(kind: str, columns) -> list:
+    # One hash per catalog row over its name and parameters, a changed part gets a new hash
+    names = columns.dtype.names[1:]
+    hashes = []
+    for record in columns:
+        digest = hashlib.sha256(f"{kind}.{record['name']}".encode())
+        digest.update(struct.pack(f"{len(names)}d", *(float(record[name]) for name in names)))
+        hashes.append(digest.hexdigest())
+    return hashes
+
+
+class ResultStore:
+    # Sqlite file of combinator results keyed by the hashes of the motor, propeller and ESC.
+    # Results hold for one mission and solver, the context, and are dropped when it changes.
+    # Components are marked current when a run uses them, csv exports only read current ones.
+    def __init__(self, path: str, context: str = ""):
+        self.path = path
+        self.context = context
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS components (
+                hash TEXT PRIMARY KEY, kind TEXT, name TEXT, current INTEGER DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                motor TEXT, propeller TEXT, esc TEXT, status TEXT, mass REAL, sizing TEXT,
+                PRIMARY KEY (motor, propeller, esc)
+            );
+            CREATE INDEX IF NOT EXISTS results_mass ON results (status, mass);
+            """
+        )
+
+        with self.connection:
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'context'").fetchone()
+            if row is None or row[0] != context:
+                self.connection.execute("DELETE FROM results")
+                self.connection.execute("REPLACE INTO meta VALUES ('context', ?)", (context,))
+
+    @staticmethod
+    def key(config: dict, solver) -> str:
+        return SizingCache.key({"mission": config["mission"]}, solver=[solver.name, solver.tol, solver.max_iter])
+
+    def set_components(self, kind: str, hashes, names, current):
+        # Registers the rows of a catalog, only the current ones take part in exports
+        with self.connection:
+            self.connection.execute("UPDATE components SET current = 0 WHERE kind = ?", (kind,))
+            self.connection.executemany(
+                "REPLACE INTO components VALUES (?, ?, ?, ?)",
+                ((hash, kind, str(name), int(flag)) for hash, name, flag in zip(hashes, names, current)),
+            )
+
+    def lookup(self, keys) -> list:
+        # (status, sizing) of each (motor, propeller, esc) key, None where nothing is stored. The
+        # keys go through a temporary table, so only the stored rows of these keys are read.
+        with self.connection:
+            self.connection.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS wanted (position INTEGER PRIMARY KEY, motor TEXT, propeller TEXT, esc TEXT)"
+            )
+            self.connection.execute("DELETE FROM wanted")
+            self.connection.executemany(
+                "INSERT INTO wanted VALUES (?, ?, ?, ?)", ((position, *key) for position, key in enumerate(keys))
+            )
+
+        found = [None] * len(keys)
+        for position, status, sizing in self.connection.execute(
+            """
+            SELECT w.position, r.status, r.sizing FROM wanted w
+            JOIN results r ON r.motor = w.motor AND r.propeller = w.propeller AND r.esc = w.esc
+            """
+        ):
+            found[position] = (status, None if sizing is None else json.loads(sizing))
+        return found
+
+    def add(self, results):
+        # Iterable of (motor, propeller, esc, status, sizing), sizing only for converged drones
+        with self.connection:
+            self.connection.executemany(
+                "REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (motor, propeller, esc, status, None if sizing is None else sizing["mass"],
+                     None if sizing is None else json.dumps(sizing, default=float))
+                    for motor, propeller, esc, status, sizing in results
+                ),
+            )
+
+    def feasible(self, statuses=("feasible",)):
+        # Current combinations with one of the statuses, lightest first, read one row at a time
+        query = f"""
+            SELECT p.name, m.name, e.name, r.mass, r.sizing FROM results r
+            JOIN components m ON m.hash = r.motor AND m.current
+            JOIN components p ON p.hash = r.propeller AND p.current
+            JOIN components e ON e.hash = r.esc AND e.current
+            WHERE r.status IN ({", ".join("?" * len(statuses))}) ORDER BY r.mass
+        """
+        for propeller, motor, esc, mass, sizing in self.connection.execute(query, tuple(statuses)):
+            yield propeller, motor, esc, mass, json.loads(sizing)
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def __repr__(self):
+        return f"ResultStore | {self.path} | {len(self)} results"
@@ -0,0 +1,73 @@
+import numpy as np
+
+
+def reachable(drone, X):
+    # Turbines find_route keeps
+    return X[np.linalg.norm(X, axis=1) <= drone.max_dist]
+
+
+def trip_capacity(drone, r):
+    # Most turbines a trip can inspect when its farthest turbine is r from the OSS, as the trip
+    # flies at least 2 r: 2 r E_cr + k E_ins <= E_tot
+    return np.floor((drone.E_tot - 2 * np.asarray(r) * drone.E_cr) / drone.E_ins + 1e-9).astype(int)
+
+
+def leaders(drone, r):
+    # Distances of the farthest turbine of each trip when every trip takes as many of the farthest
+    # turbines left as its capacity allows. Any set of trips has at least as many trips, and its
+    # j-th farthest trip reaches at least as far as leader j.
+    r = np.sort(r)[::-1]
+    capacity = trip_capacity(drone, r)
+    result = []
+    i = 0
+    while i < len(r):
+        result.append(r[i])
+        i += max(int(capacity[i]), 1)
+    return np.array(result)
+
+
+def spanning_tree_length(points):
+    # The trips together connect the OSS with every turbine, so they fly at least the minimum
+    # spanning tree. The tree only uses edges of the Delaunay triangulation.
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import minimum_spanning_tree
+    from scipy.spatial import Delaunay, QhullError
+    from scipy.spatial.distance import pdist, squareform
+
+    if len(points) < 2:
+        return 0.0
+    try:
+        neighbours = Delaunay(points).vertex_neighbor_vertices
+        rows = np.repeat(np.arange(len(points)), np.diff(neighbours[0]))
+        columns = neighbours[1]
+        graph = coo_matrix((np.linalg.norm(points[rows] - points[columns], axis=1), (rows, columns)),
+                           shape=(len(points), len(points)))
+    except (QhullError, ValueError):
+        # Fewer than three points or all of them on a line
+        graph = squareform(pdist(points))
+    return float(minimum_spanning_tree(graph).sum())
+
+
+def lower_bounds(drone, X) -> dict:
+    # Fewest trips and least hydrogen [kg] any route of the drone over the reachable turbines needs
+    X = reachable(drone, np.asarray(X, dtype=float))
+    r = np.linalg.norm(X, axis=1)
+    if not len(X):
+        return {'trips': 0, 'kg H2': 0.0}
+    out = leaders(drone, r)
+    distance = max(spanning_tree_length(np.vstack([np.zeros((1, 2)), X])), 2 * np.sum(out))
+    return {'trips': len(out), 'kg H2': float((distance * drone.E_cr + len(X) * drone.E_ins) / 34000)}
+
+
+def gap(properties, bounds) -> dict:
+    # Trips above the bound and hydrogen above the bound relative to the route
+    return {
+        'trips': properties['trips'] - bounds['trips'],
+        'kg H2': float((properties['kg H2'] - bounds['kg H2']) / properties['kg H2']) if properties['kg H2'] else 0.0,
+    }
+
+
+def meets(properties, bounds, h2_gap=np.inf):
+    # Route with the fewest possible trips, and hydrogen within h2_gap of its bound
+    route_gap = gap(properties, bounds)
+    return route_gap['trips'] <= 0 and route_gap['kg H2'] <= h2_gap
@@ -1,12 +1,78 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
 import numpy as np
-import matplotlib.pyplot as plt
+from src.local_search import LocalSearch
+from src.route_bounds import gap, lower_bounds, meets
 from src.shelf_drone import ShelfMotor, ShelfPropeller, ShelfESC
 from src.speed_range import SpeedRange
 from src.windfarm import WindFarm
 from collections import Counter, defaultdict
-import heapq
 import json
-from components import *
+from src.components import *
+from src.plotting import pyplot
+
+# Route and turbines of the worker process, set once by init_worker
+worker = None
+
+
+def init_worker(drone, X):
+    global worker
+    worker = (drone, X)
+
+
+def best_restart(seeds, no_of_neighbors=2, bounds=None, h2_gap=np.inf):
+    drone, X = worker
+    return drone.best_restart(X, seeds, no_of_neighbors, bounds, h2_gap)
+
+
+class TurbineIndex:
+    # Nearest unvisited turbines from a KD-tree, rebuilt on the unvisited turbines once half of
+    # the turbines in the tree have been visited
+    def __init__(self, X):
+        self.X = X
+        self.visited = np.zeros(len(X), dtype=bool)
+        self.remaining = len(X)
+        self.build()
+
+    def build(self):
+        from scipy.spatial import cKDTree
+
+        self.indices = np.flatnonzero(~self.visited)
+        self.tree = cKDTree(self.X[self.indices])
+        self.stale = 0
+
+    def visit(self, index):
+        self.visited[index] = True
+        self.remaining -= 1
+        self.stale += 1
+        if self.remaining and self.stale > len(self.indices) // 2:
+            self.build()
+
+    def nearest(self, point, n=1):
+        # Unvisited turbines up to the distance of the n-th nearest, by distance and then index.
+        # Distances are recomputed as np.linalg.norm does, so ties break as with a full scan.
+        k = 8 * n
+        while True:
+            k = min(k, len(self.indices))
+            distance, position = self.tree.query(point, k=k)
+            distance, position = np.atleast_1d(distance), np.atleast_1d(position)
+            unvisited = ~self.visited[self.indices[position]]
+            if np.count_nonzero(unvisited) >= n or k == len(self.indices):
+                break
+            k *= 2
+
+        # Turbines tied with the n-th nearest may lie beyond the k queried ones
+        radius = distance[unvisited][n - 1] * (1 + 1e-9)
+        if distance[-1] > radius:
+            candidates = np.sort(self.indices[position[unvisited & (distance <= radius)]])
+        else:
+            candidates = self.indices[np.sort(self.tree.query_ball_point(point, radius))]
+            candidates = candidates[~self.visited[candidates]]
+        distances = np.linalg.norm(self.X[candidates] - point, axis=1)
+        order = np.argsort(distances, kind="stable")
+        return candidates[order], distances[order]
 
 
 class DroneRoute(SpeedRange):
@@ -26,7 +92,7 @@ class DroneRoute(SpeedRange):
 
         self.max_dist = (self.E_tot - self.E_ins) / self.E_cr / 2
 
-    def find_route(self, X, rand=False, n=2, return_dist=False):
+    def find_route(self, X, rand=False, n=2, return_dist=False, rng=None):
         # Calculate distances from origin
         distances = np.linalg.norm(X, axis=1)
 
@@ -35,53 +101,48 @@ class DroneRoute(SpeedRange):
             X = np.delete(X, np.where(distances > self.max_dist), axis=0)
             distances = np.delete(distances, np.where(distances > self.max_dist))
 
-        visited = []
-        left = X.copy()
-        distancesleft = distances.copy()
+        index = TurbineIndex(X)
+        # Trips start at the closest turbine left, ties to the lowest index as np.argmin
+        closest_first = iter(np.argsort(distances, kind="stable"))
         route = []
 
-        # Define the dynamic cluster size threshold
-        while len(left) > 0:
+        while index.remaining:
             E = 0
             t = 0
             dist = 0
-            start = (0, 0)
-            return_back = False
-            closestindex = np.argmin(distancesleft)
-            trip = [start]
-            dest_dist = distancesleft[closestindex]
-            distancesleft = np.delete(distancesleft, closestindex)
-            while not return_back:
-                dest = left[closestindex]
-                left = np.delete(left, closestindex, axis=0)
+            closestindex = next(i for i in closest_first if not index.visited[i])
+            trip = [(0, 0)]
+            dest_dist = distances[closestindex]
+            while True:
+                dest = X[closestindex]
+                index.visit(closestindex)
                 E += dest_dist * self.E_cr
                 t += dest_dist / self.speed / 3600
                 dist += dest_dist
-                visited.append(dest)
                 trip.append(dest.tolist())
-                start = dest
                 E += self.E_ins
                 t += self.inspection_time
-                if len(left) == 0:
+                if not index.remaining:
                     E += np.linalg.norm(dest) * self.E_cr
                     t += np.linalg.norm(dest) / self.speed / 3600
                     dist += np.linalg.norm(dest)
                     break
-                new_dist = np.linalg.norm(left - start, axis=1)
-                if rand and len(new_dist) > n-1:
-                    closest = heapq.nsmallest(n, new_dist)[np.random.randint(0, n)]
-                    closestindex = np.where(new_dist == closest)[0][0]
+                if rand and index.remaining > n-1:
+                    candidates, new_dist = index.nearest(dest, n)
+                    pick = np.random.randint(0, n) if rng is None else rng.integers(n)
+                    closest = new_dist[pick]
+                    position = np.argmax(new_dist == closest)
                 else:
-                    closestindex = np.argmin(new_dist)
-                pot_E = E + new_dist[closestindex] * self.E_cr + np.linalg.norm(left[closestindex]) * self.E_cr + self.E_ins
+                    candidates, new_dist = index.nearest(dest)
+                    position = 0
+                closestindex = candidates[position]
+                pot_E = E + new_dist[position] * self.E_cr + np.linalg.norm(X[closestindex]) * self.E_cr + self.E_ins
                 if pot_E > self.E_tot:
                     E += np.linalg.norm(dest) * self.E_cr
                     t += np.linalg.norm(dest) / self.speed / 3600
                     dist += np.linalg.norm(dest)
-                    return_back = True
-                else:
-                    dest_dist = new_dist[closestindex]
-                    distancesleft = np.delete(distancesleft, closestindex)
+                    break
+                dest_dist = new_dist[position]
             if E > self.E_tot:
                 print('Range exceeds maximum', E, self.E_tot)
             trip.append((0, 0))
@@ -92,6 +153,7 @@ class DroneRoute(SpeedRange):
         return route
 
     def plot_route(self, route):
+        plt = pyplot()
         plt.figure(figsize=(20, 6))
         for trip, m, t in route:
             x = [i[0]/1000 for i in trip]
@@ -116,23 +178,75 @@ class DroneRoute(SpeedRange):
 
         return props
 
-    def find_best_route(self, X, no_of_iterations=1000, no_of_neighbors=2, best=None):
+    @staticmethod
+    def better(properties, best_properties):
+        # Fewer trips first, then less hydrogen
+        return properties['trips'] < best_properties['trips'] or \
+            (properties['trips'] == best_properties['trips'] and properties['kg H2'] < best_properties['kg H2'])
+
+    def best_restart(self, X, seeds, no_of_neighbors=2, bounds=None, h2_gap=np.inf):
+        # Best randomized route over restarts with their own random streams, the first one on ties.
+        # Stops at the first route that meets the bounds, returns the restarts run as well.
+        best_route, best_properties = None, None
+        for count, seed in enumerate(seeds, 1):
+            random_route = self.find_route(X, rand=True, n=no_of_neighbors, rng=np.random.default_rng(seed))
+            random_properties = self.properties(random_route)
+            if best_route is None or self.better(random_properties, best_properties):
+                best_route = random_route
+                best_properties = random_properties
+            if bounds is not None and meets(random_properties, bounds, h2_gap):
+                break
+        return best_route, best_properties, count
+
+    def find_best_route(self, X, no_of_iterations=1000, no_of_neighbors=2, best=None, seed=None, workers=1,
+                        chunksize=25, stop_at_bound=False, h2_gap=np.inf):
+        # Restart i draws from stream i of the seed, so a seed always gives the same best route.
+        # The properties get the restarts run. With stop_at_bound the search stops at the first
+        # route with the fewest possible trips and hydrogen within h2_gap of its lower bound, and
+        # the properties get the bounds and the gap as well.
         if best is None:
             best_route = self.find_route(X)
             best_properties = self.properties(best_route)
         else:
             best_route = best[0]
             best_properties = best[1]
-        for i in range(no_of_iterations):
-            random_route = self.find_route(X, rand=True, n=no_of_neighbors)
-            random_properties = self.properties(random_route)
-            if random_properties['trips'] < best_properties['trips'] or \
-                    (random_properties['trips'] == best_properties['trips']
-                     and random_properties['kg H2'] < best_properties['kg H2']):
-                best_route = random_route
-                best_properties = random_properties
+        stop = lower_bounds(self, X) if stop_at_bound else None
+
+        seeds = np.random.SeedSequence(seed).spawn(no_of_iterations)
+        chunks = [seeds[start:start + chunksize] for start in range(0, len(seeds), chunksize)]
+        workers = workers or os.cpu_count() or 1
+        restarts = 0
+
+        def reduce(results):
+            nonlocal best_route, best_properties, restarts
+            if stop is not None and meets(best_properties, stop, h2_gap):
+                return
+            for random_route, random_properties, count in results:
+                restarts += count
+                if self.better(random_properties, best_properties):
+                    best_route = random_route
+                    best_properties = random_properties
+                if stop is not None and meets(random_properties, stop, h2_gap):
+                    return
+
+        # Chunks come back in submission order, so the result does not depend on the workers
+        if workers == 1 or len(chunks) <= 1:
+            reduce(self.best_restart(X, chunk, no_of_neighbors, stop, h2_gap) for chunk in chunks)
+        else:
+            with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(self, X)) as executor:
+                restart = partial(best_restart, no_of_neighbors=no_of_neighbors, bounds=stop, h2_gap=h2_gap)
+                reduce(executor.map(restart, chunks))
+                executor.shutdown(cancel_futures=True)
+
+        best_properties = dict(best_properties, restarts=restarts)
+        if stop is not None:
+            best_properties.update(bounds=stop, gap=gap(best_properties, stop))
         return best_route, best_properties
 
+    def improve_route(self, route, neighbours=10, time_limit=None, return_dist=False, cancel=None):
+        # Local search on the trips of a route, see LocalSearch
+        return LocalSearch(self, neighbours).improve(route, time_limit, return_dist, cancel)
+
     def save_and_load(self, load=True, plot=True, no_of_iterations=1000, no_of_neighbors=2):
         if load:
             with open("../datasets/best_route.json", "r") as f:
@@ -155,11 +269,13 @@ class DroneRoute(SpeedRange):
         else:
             timelist = prop['hrs of flight time']
 
+        plt = pyplot()
         plt.hist(timelist, bins=20, rwidth=0.9)
         plt.xlabel('Time per trip [h]')
         plt.show()
 
     def plot_all_hist(self, X):
+        plt = pyplot()
         fig, ax = plt.subplots(figsize=(10, 6))
 
         timelist1 = self.properties(self.find_route(X))['hrs of flight time']
@@ -179,6 +295,7 @@ class DroneRoute(SpeedRange):
         plt.show()
 
     def plot_trip_counter(self, prop=None, vrp=False):
+        plt = pyplot()
         fig, ax = plt.subplots()
 
         if prop is None and vrp is False:
@@ -208,6 +325,7 @@ class DroneRoute(SpeedRange):
             return 0
         barWidth = 0.3
         no_of_columns = 6
+        plt = pyplot()
         fig, ax = plt.subplots(figsize=(10, 6))
         counter1 = self.properties(self.find_route(X))['counter']
         counter1 = defaultdict(def_value, {int(k): int(v) for k, v in counter1.items()})
@@ -0,0 +1,76 @@
+import heapq
+
+import numpy as np
+
+
+def objectives(drone):
+    # All minimised: mass, endurance at hover with the default 0.12 kg of hydrogen, current ratio, hydrogen mass
+    return drone.mass, -drone.compute_endurance(1), drone.I_ratio, drone.hyd.mh2
+
+
+class KeepAll:
+    # Candidates are offered as (combination index, drone), offer returns the ones given up
+    def __init__(self):
+        self.candidates = []
+
+    def offer(self, index, drone):
+        self.candidates.append((index, drone))
+        return []
+
+    def entries(self):
+        return list(self.candidates)
+
+    def drones(self):
+        # Lightest first, equal masses in combination order
+        return [drone for _, drone in sorted(self.entries(), key=lambda entry: (entry[1].mass, entry[0]))]
+
+    def __len__(self):
+        return len(self.candidates)
+
+
+class TopK(KeepAll):
+    # The k lightest drones in a heap with the heaviest on top
+    def __init__(self, k: int):
+        super().__init__()
+        self.k = k
+
+    def offer(self, index, drone):
+        item = (-drone.mass, -index, drone)
+        if len(self.candidates) < self.k:
+            heapq.heappush(self.candidates, item)
+            return []
+        if item[:2] > self.candidates[0][:2]:
+            _, evicted, evicted_drone = heapq.heapreplace(self.candidates, item)
+            return [(-evicted, evicted_drone)]
+        return [(index, drone)]
+
+    def entries(self):
+        return [(-index, drone) for _, index, drone in self.candidates]
+
+
+class ParetoFront(KeepAll):
+    # Candidates that no other candidate beats in all objectives
+    def __init__(self, objectives=objectives):
+        super().__init__()
+        self.objectives = objectives
+        self.points = None
+
+    def offer(self, index, drone):
+        point = np.array(self.objectives(drone), dtype=float)
+        evicted = []
+
+        if self.points is None:
+            self.points = point[None, :]
+        else:
+            if np.any(np.all(self.points <= point, axis=1) & np.any(self.points < point, axis=1)):
+                return [(index, drone)]
+
+            beaten = np.all(point <= self.points, axis=1) & np.any(point < self.points, axis=1)
+            if beaten.any():
+                evicted = [candidate for candidate, out in zip(self.candidates, beaten) if out]
+                self.candidates = [candidate for candidate, out in zip(self.candidates, beaten) if not out]
+                self.points = self.points[~beaten]
+            self.points = np.vstack([self.points, point])
+
+        self.candidates.append((index, drone))
+        return evicted
@@ -1,67 +1,127 @@
 import numpy as np
-from matplotlib import pyplot as plt
+from src.batch_drone import BatchDrone
+from src.derivatives import jacobian
 from src.drone import Drone
-from copy import deepcopy
-import matplotlib as mpl
+from src.esc import ESC
+from src.motor import Motor
+from src.propeller import Propeller
 from src.components import c1, c2, c3, c4, c5
+from src.plotting import pyplot
 
-mpl.rcParams['axes.prop_cycle'] = (mpl.cycler(color=[c3, c4, c5, c1, c2] * 2) +
-                                   mpl.cycler(linestyle=['solid'] * 5 + ['dashed'] * 5))
+cycle = dict(color=[c3, c4, c5, c1, c2] * 2, linestyle=['solid'] * 5 + ['dashed'] * 5)
 
 
-class SensitivityAnalysis:
-    def __init__(self, drone):
-        self.initial_drone = drone
-        self.initial_mass = drone.mass
+# Parameters that are left out of the analysis
+fixed = ("Nm", "Bp", "TW_R", "Immax")
 
-        self.drones = []
+# One row per perturbed parameter value, deltas in percent of the initial value and mass
+rows_dtype = [("type", "U16"), ("parameter", "U16"), ("delta", "f8"), ("mass_delta", "f8")]
 
-        self.range = np.arange(-0.25, 0.26, 0.025) * 100
 
-        self.types = list(self.initial_drone.config.keys())
+def perturbations(config, parameters, factors):
+    # Config columns with the (type, parameter) pairs scaled by the columns of the factors,
+    # one design per row
+    factors = np.asarray(factors, dtype=float)
+    columns = {
+        typ: {parameter: np.full(len(factors), value, dtype=float) for parameter, value in section.items()}
+        for typ, section in config.items()
+    }
+    for k, (typ, parameter) in enumerate(parameters):
+        columns[typ][parameter] *= factors[:, k]
+    return columns
 
-        self.x_values = []
-        self.mass_values = []
-        self.parameters = []
 
-    def generate_drones(self, type, parameter):
-        if parameter in ["Nm", "Bp", "TW_R", "Immax"]:
-            return
+def size_factors(config, parameters, factors, **kwargs):
+    # Sizes all rows of the factors as one BatchDrone
+    columns = perturbations(config, parameters, factors)
+    return BatchDrone(
+        Propeller(*columns["propeller"].values()),
+        Motor(*columns["motor"].values()),
+        ESC(*columns["esc"].values()),
+        columns["mission"],
+        **kwargs
+    )
 
-        mass = []
-        x = []
 
-        for i in self.range:
-            config = deepcopy(self.initial_drone.config)
-            config[type][parameter] *= 1 + i / 100
+def sensitivity(config, parameters, deltas, initial_mass, **kwargs):
+    # One parameter at a time by every delta in percent, parameter major. Designs that
+    # do not converge are left out.
+    if not parameters:
+        return np.zeros(0, dtype=rows_dtype)
 
-            drone = Drone(config)
-            self.drones.append(drone)
+    factors = np.ones((len(parameters) * len(deltas), len(parameters)))
+    for k in range(len(parameters)):
+        factors[k * len(deltas):(k + 1) * len(deltas), k] = 1 + np.asarray(deltas) / 100
+    batch = size_factors(config, parameters, factors, **kwargs)
 
-            if drone.mass:
-                mass.append(drone.mass)
-                x.append(i)
+    rows = np.zeros(len(batch), dtype=rows_dtype)
+    rows["type"] = np.repeat([typ for typ, _ in parameters], len(deltas))
+    rows["parameter"] = np.repeat([parameter for _, parameter in parameters], len(deltas))
+    rows["delta"] = np.tile(deltas, len(parameters))
+    rows["mass_delta"] = (batch.mass - initial_mass) / initial_mass * 100
+    return rows[batch.converged]
 
-        mass = np.array(mass)
-        x = np.array(x)
 
-        mass = (mass - self.initial_mass) / self.initial_mass * 100
+class SensitivityAnalysis:
+    def __init__(self, drone):
+        self.initial_drone = drone
+        self.initial_mass = drone.mass
+
+        self.range = np.arange(-0.25, 0.26, 0.025) * 100
 
-        self.mass_values.append(mass)
-        self.x_values.append(x)
-        self.parameters.append(parameter)
+        self.types = list(self.initial_drone.config.keys())
+
+        self.results = np.zeros(0, dtype=rows_dtype)
+
+    def generate_drones(self, type, parameter):
+        self.evaluate([(type, parameter)])
 
     def perform_analysis(self, typeindex=None):
-        if typeindex is not None:
-            typ = self.types[typeindex]
-            for parameter in self.initial_drone.config[typ]:
-                self.generate_drones(typ, parameter)
-        else:
-            for typ in self.types:
-                for parameter in self.initial_drone.config[typ]:
-                    self.generate_drones(typ, parameter)
+        types = self.types if typeindex is None else [self.types[typeindex]]
+        config = self.initial_drone.config
+        self.evaluate([(typ, parameter) for typ in types for parameter in config[typ]])
+
+    def evaluate(self, parameters):
+        # Appends the rows of the (type, parameter) pairs to the results
+        parameters = [(typ, parameter) for typ, parameter in parameters if parameter not in fixed]
+        rows = sensitivity(self.initial_drone.config, parameters, self.range, self.initial_mass)
+        self.results = np.concatenate([self.results, rows])
+        return rows
+
+    def slopes(self, parameters=None):
+        # Slopes of the sweeps at the initial drone from its Jacobian, in percent of mass per
+        # percent of the parameter, without sizing any perturbation
+        config = self.initial_drone.config
+        if parameters is None:
+            parameters = [(typ, parameter) for typ in self.types for parameter in config[typ]]
+        rows = jacobian(self.initial_drone, [(typ, parameter) for typ, parameter in parameters if parameter not in fixed])
+
+        slopes = np.zeros(len(rows), dtype=[("type", "U16"), ("parameter", "U16"), ("slope", "f8")])
+        slopes["type"], slopes["parameter"] = rows["type"], rows["parameter"]
+        slopes["slope"] = rows["mass"] * rows["value"] / self.initial_mass
+        return slopes
+
+    @property
+    def parameters(self):
+        _, first = np.unique(self.results["parameter"], return_index=True)
+        return self.results["parameter"][np.sort(first)].tolist()
+
+    def curves(self):
+        # (parameter, delta, mass delta) for every parameter in the order it was analysed
+        for parameter in self.parameters:
+            rows = self.results[self.results["parameter"] == parameter]
+            yield parameter, rows["delta"], rows["mass_delta"]
+
+    @property
+    def x_values(self):
+        return [x for _, x, _ in self.curves()]
+
+    @property
+    def mass_values(self):
+        return [y for _, _, y in self.curves()]
 
     def plot(self, refresh=True):
+        plt = pyplot(cycle)
         fig = plt.figure()
 
         legend_names = {
@@ -78,8 +138,8 @@ class SensitivityAnalysis:
             "m_motor": "Motor Mass",
         }
 
-        for parameter, x, y in zip(self.parameters, self.x_values, self.mass_values):
-            legend_name = legend_names[parameter]
+        for parameter, x, y in self.curves():
+            legend_name = legend_names.get(parameter, parameter)
             Drone.plot(
                 fig, x, y, "Parameter Diff [%]", "Mass Diff [%]", label=legend_name
             )
@@ -89,9 +149,7 @@ class SensitivityAnalysis:
         plt.show()
 
         if refresh:
-            self.x_values = []
-            self.mass_values = []
-            self.parameters = []
+            self.results = np.zeros(0, dtype=rows_dtype)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,26 @@
-import json
-
 from src.propeller import Propeller
 from src.motor import Motor
 from src.drone import Drone
 from src.esc import ESC
+from src.catalog import catalog
+
+
+class ShelfComponent:
+    # Components from the catalog in datasets/{kind}.json
+    kind = None
+
+    @classmethod
+    def sources(cls, name):
+        return (catalog.table(cls.kind).get(name),)
 
-import numpy as np
-import pandas as pd
+    @classmethod
+    def shared(cls, name):
+        # One instance per name for the whole process, for read only use
+        return catalog.shared(cls, name)
 
 
-class ShelfPropeller(Propeller):
+class ShelfPropeller(ShelfComponent, Propeller):
+    kind = "propeller"
     propellers = None
 
     def __init__(self, prop_name):
@@ -22,29 +33,23 @@ class ShelfPropeller(Propeller):
         self.name = prop_name
         self.cor_coeff()
 
+    @classmethod
+    def sources(cls, name):
+        return super().sources(name) + (catalog.fit(name),)
+
     def cor_coeff(self):
-        try:
-            data = pd.read_csv(f"../experimental_data/{self.name}.csv")
-            data["Rotation speed (rpm)"] = (
-                data["Rotation speed (rpm)"].replace(0, np.nan).dropna()
-            )
-            N = data["Rotation speed (rpm)"]
-            T = data["Thrust (kgf)"] * 9.80665
-            M = data["Torque (N⋅m)"]
-            Ct = T / (self.rho * (N / 60) ** 2 * self.Dp**4)
-            self.Ct = Ct.mean()
-            Cm = M / (self.rho * (N / 60) ** 2 * self.Dp**5)
-            self.Cm = Cm.mean()
-        except FileNotFoundError:
-            pass
+        fit = catalog.fit(self.name)
+        if fit is not None:
+            self.Ct = fit[0] / (self.rho * self.Dp**4)
+            self.Cm = fit[1] / (self.rho * self.Dp**5)
 
     @classmethod
     def read_prop(cls):
-        with open("../datasets/propeller.json", "r") as file:
-            cls.propellers = json.load(file)
+        cls.propellers = catalog.table(cls.kind)
 
 
-class ShelfMotor(Motor):
+class ShelfMotor(ShelfComponent, Motor):
+    kind = "motor"
     motors = None
 
     def __init__(self, motor_name):
@@ -57,11 +62,11 @@ class ShelfMotor(Motor):
 
     @classmethod
     def read_motor(cls):
-        with open("../datasets/motor.json", "r") as file:
-            cls.motors = json.load(file)
+        cls.motors = catalog.table(cls.kind)
 
 
-class ShelfESC(ESC):
+class ShelfESC(ShelfComponent, ESC):
+    kind = "esc"
     ESCs = None
 
     def __init__(self, esc_name):
@@ -74,8 +79,7 @@ class ShelfESC(ESC):
 
     @classmethod
     def read_esc(cls):
-        with open("../datasets/esc.json", "r") as file:
-            cls.ESCs = json.load(file)
+        cls.ESCs = catalog.table(cls.kind)
 
 
 if __name__ == "__main__":
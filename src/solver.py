@@ -0,0 +1,189 @@
+import numpy as np
+
+
+class ConvergenceResult:
+    def __init__(self, solver, iterations, residual, reason, point=None):
+        self.solver = solver
+        self.iterations = iterations  # Number of evaluations of the update
+        self.residual = residual  # |g(x) - x| of the last evaluation
+        self.reason = reason  # "converged", "max_iter" or "diverged"
+        self.point = point  # Iterate x of the last evaluation
+
+    @property
+    def converged(self):
+        return np.asarray(self.reason) == "converged"
+
+    @classmethod
+    def concatenate(cls, results):
+        return cls(
+            results[0].solver,
+            *(np.concatenate([getattr(result, key) for result in results])
+              for key in ("iterations", "residual", "reason", "point"))
+        )
+
+    def __repr__(self):
+        return f"{self.solver} | {self.reason} | {self.iterations} iterations | residual {self.residual}"
+
+    def __str__(self):
+        return self.__repr__()
+
+
+class FixedPointSolver:
+    name = "fixed-point"
+
+    def __init__(self, tol: float = 0.001, max_iter: int = 1000):
+        self.tol = tol
+        self.max_iter = max_iter
+
+    def step(self, x, gx, state):
+        return gx
+
+    def solve(self, update, x0):
+        # Scalar iteration x -> update(x), the value returned is update(x) of the last step
+        x = np.float64(x0)
+        state = {}
+        residual = np.nan
+
+        with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+            for i in range(1, self.max_iter + 1):
+                gx = update(x)
+                residual = abs(gx - x)
+
+                if not residual > self.tol:
+                    if residual <= self.tol:
+                        return gx, ConvergenceResult(self.name, i, residual, "converged", x)
+                    return None, ConvergenceResult(self.name, i, residual, "diverged", x)
+
+                x = self.step(x, gx, state)
+
+        return None, ConvergenceResult(self.name, self.max_iter, residual, "max_iter", x)
+
+    def solve_batch(self, update, x0, compact=0.75):
+        # Elementwise iteration over an array of problems, update(x, active) evaluates
+        # the rows active of the full problem. Finished rows are kept in the working
+        # arrays until fewer than compact of them are still live, active only changes then.
+        n = len(x0)
+        value = np.full(n, np.nan)
+        point = np.full(n, np.nan)
+        residual = np.full(n, np.nan)
+        iterations = np.full(n, self.max_iter)
+        reason = np.full(n, "max_iter", dtype="<U9")
+
+        active = np.arange(n)
+        live = np.ones(n, dtype=bool)
+        n_live = n
+        x = np.array(x0, dtype=float)
+        state = {}
+
+        with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+            for i in range(1, self.max_iter + 1):
+                gx = update(x, active)
+                r = np.abs(gx - x)
+
+                done = np.flatnonzero(live & ~(r > self.tol))
+                if len(done):
+                    idx = active[done]
+                    converged = r[done] <= self.tol
+                    value[idx] = np.where(converged, gx[done], np.nan)
+                    point[idx] = x[done]
+                    residual[idx] = r[done]
+                    iterations[idx] = i
+                    reason[idx] = np.where(converged, "converged", "diverged")
+                    live[done] = False
+                    n_live -= len(done)
+
+                if n_live == 0:
+                    break
+
+                x = self.step(x, gx, state)
+
+                if n_live < compact * len(live):
+                    active = active[live]
+                    x = x[live]
+                    r = r[live]
+                    state = {key: column[live] for key, column in state.items()}
+                    live = np.ones(n_live, dtype=bool)
+
+        if n_live:
+            residual[active[live]] = r[live]
+            point[active[live]] = x[live]
+
+        return value, ConvergenceResult(self.name, iterations, residual, reason, point)
+
+    @staticmethod
+    def bracket(x, r, state):
+        # Largest iterate below the fixed point and smallest one above it seen so far
+        lower = state.get("lower", -np.inf)
+        upper = state.get("upper", np.inf)
+        if isinstance(x, np.ndarray):
+            state["lower"] = np.where(r > 0, np.maximum(lower, x), lower)
+            state["upper"] = np.where(r < 0, np.minimum(upper, x), upper)
+        else:
+            state["lower"] = max(lower, x) if r > 0 else lower
+            state["upper"] = min(upper, x) if r < 0 else upper
+
+    @staticmethod
+    def accept(x_new, gx, state):
+        # Accelerated steps are only taken strictly inside the bracket
+        inside = (state["lower"] < x_new) & (x_new < state["upper"])
+        if isinstance(inside, np.ndarray):
+            return np.where(inside & np.isfinite(x_new), x_new, gx)
+        return x_new if inside else gx
+
+
+class SecantSolver(FixedPointSolver):
+    # Secant steps on the residual r(x) = g(x) - x, the same iteration as
+    # Anderson acceleration with a memory of one for scalar problems.
+    name = "secant"
+
+    def step(self, x, gx, state):
+        r = gx - x
+        self.bracket(x, r, state)
+
+        x_new = gx
+        if "x" in state:
+            x_new = self.accept(x - r * (x - state["x"]) / (r - state["r"]), gx, state)
+
+        state["x"] = x
+        state["r"] = r
+        return x_new
+
+
+class AitkenSolver(FixedPointSolver):
+    # Aitken's delta-squared extrapolation after every pair of plain steps (Steffensen)
+    name = "aitken"
+
+    def step(self, x, gx, state):
+        self.bracket(x, gx - x, state)
+
+        x_new = gx
+        if isinstance(x, np.ndarray):
+            pending = state.get("pending", np.zeros(len(x), dtype=bool))
+            if pending.any():
+                aitken = gx - (gx - x) ** 2 / ((gx - x) - (x - state["x"]))
+                x_new = np.where(pending, self.accept(aitken, gx, state), gx)
+            # A design only extrapolates again after a plain step taken from a plain step
+            state["pending"] = ~pending | (x_new == gx)
+        else:
+            pending = state.get("pending", False)
+            if pending:
+                x_new = self.accept(gx - (gx - x) ** 2 / ((gx - x) - (x - state["x"])), gx, state)
+            state["pending"] = not pending or x_new == gx
+
+        state["x"] = x
+        return x_new
+
+
+solvers = {
+    solver.name: solver for solver in (FixedPointSolver, SecantSolver, AitkenSolver)
+}
+
+
+def get_solver(solver=None, tol: float = 0.001, max_iter: int = 1000):
+    if solver is None:
+        solver = FixedPointSolver.name
+    if isinstance(solver, str):
+        if solver not in solvers:
+            raise ValueError(f"Unknown solver: {solver}")
+        solver = solvers[solver](tol=tol, max_iter=max_iter)
+    return solver
@@ -1,9 +1,49 @@
 from numpy import arccos, pi, tan, cos, sin
 import numpy as np
 from src.drone import Drone
-from shelf_drone import ShelfMotor, ShelfESC, ShelfPropeller
+from src.shelf_drone import ShelfMotor, ShelfESC, ShelfPropeller
+from src.plotting import pyplot
+
+
+class Envelope:
+    # Labelled grid of SpeedRange performance, every field has one axis per dimension in dims
+    dims = ("pitch", "Cd", "mass", "mh2")
+    fields = ("area", "speed", "endurance", "range")
+
+    def __init__(self, coords, **values):
+        self.coords = coords
+        self.values = values
+
+    def __getitem__(self, field):
+        return self.values[field]
+
+    @property
+    def shape(self):
+        return tuple(len(self.coords[dim]) for dim in self.dims)
+
+    def sel(self, **coords):
+        # Envelope at the grid values nearest to the given coordinates, dimensions kept
+        index = []
+        selected = dict(self.coords)
+        for dim in self.dims:
+            if dim in coords:
+                nearest = np.abs(self.coords[dim] - coords[dim]).argmin()
+                index.append(slice(nearest, nearest + 1))
+                selected[dim] = self.coords[dim][index[-1]]
+            else:
+                index.append(slice(None))
+        return Envelope(selected, **{field: values[tuple(index)] for field, values in self.values.items()})
+
+    def best(self, field="range"):
+        # Pitch maximizing the field and the maximum, over the Cd x mass x mh2 grid
+        index = np.nanargmax(self.values[field], axis=0)
+        return self.coords["pitch"][index], np.take_along_axis(self.values[field], index[None], axis=0)[0]
 
-import matplotlib.pyplot as plt
+    def to_frame(self):
+        import pandas as pd
+
+        index = pd.MultiIndex.from_product([self.coords[dim] for dim in self.dims], names=self.dims)
+        return pd.DataFrame({field: np.ravel(values) for field, values in self.values.items()}, index=index)
 
 
 class SpeedRange(Drone):
@@ -43,16 +83,16 @@ class SpeedRange(Drone):
         ])
 
     def surface_area(self, pitch):
-        new_r_corner = np.abs(np.dot(self.r_corner, self.rotation_matrix(pitch).T))
-        new_l_corner = np.abs(np.dot(self.l_corner, self.rotation_matrix(pitch).T))
-        y = 2 * max(new_r_corner[1], new_l_corner[1])
-
-        area = y * self.a
-        return area
+        # Height of the a-side box rotated by the pitch, max(|u + v|, |u - v|) = |u| + |v| over
+        # the rotated corners. Works on arrays of pitch angles.
+        pitch_rad = pitch * pi / 180
+        return self.a * (self.c * np.abs(sin(pitch_rad)) + self.b * np.abs(cos(pitch_rad)))
 
-    def speed(self, pitch, Cd):
+    def speed(self, pitch, Cd, mass=None):
+        if mass is None:
+            mass = self.mass
         pitch_rad = pitch * pi / 180
-        return (2 * self.mass * 9.80665 * tan(pitch_rad) / (1.225 * self.surface_area(pitch) * Cd)) ** 0.5
+        return (2 * mass * 9.80665 * tan(pitch_rad) / (1.225 * self.surface_area(pitch) * Cd)) ** 0.5
 
     def range(self, pitch, Cd):
         pitch_rad = pitch * pi / 180
@@ -63,10 +103,41 @@ class SpeedRange(Drone):
 
         return endurance * speed * 3600
 
+    def performance_grid(self, pitch=None, Cd=None, mass=None, mh2=None, co_eff=0.9, tw_f=1.2):
+        # Area, speed, endurance and range over every combination of pitch [deg], Cd, drone mass
+        # [kg] as sized with self.hyd.mh2 of hydrogen, and the hydrogen carried mh2 [kg]. When mh2
+        # is given the drone flies at mass - self.hyd.mh2 + mh2, as in compute_endurance. Without
+        # it the speed is taken at mass and the defaults reproduce range().
+        fly_mh2 = mh2 is not None
+        coords = {
+            "pitch": np.arange(0, self.max_pitch(), 0.1) if pitch is None else pitch,
+            "Cd": self.Cd_array if Cd is None else Cd,
+            "mass": [self.mass] if mass is None else mass,
+            "mh2": [0.12] if mh2 is None else mh2,
+        }
+        coords = {dim: np.atleast_1d(np.asarray(values, dtype=float)) for dim, values in coords.items()}
+        pitch, Cd, mass, mh2 = (
+            values.reshape([-1 if axis == idx else 1 for axis in range(len(coords))])
+            for idx, values in enumerate(coords.values())
+        )
+        flight_mass = mass - self.hyd.mh2 + mh2 if fly_mh2 else mass
+
+        area = self.surface_area(pitch)
+        speed = self.speed(pitch, Cd, mass=flight_mass)
+        endurance = self.compute_endurance(1 / cos(pitch * pi / 180), co_eff, tw_f, mh2=mh2, mass=mass)
+
+        shape = tuple(len(values) for values in coords.values())
+        return Envelope(coords, **{
+            field: np.broadcast_to(values, shape)
+            for field, values in (("area", area), ("speed", speed), ("endurance", endurance),
+                                  ("range", endurance * speed * 3600))
+        })
+
     def plot_graph(self, x, y, xlabel, ylabel, legend=False):
         if not isinstance(y[0], np.ndarray):
             y = np.array([y])
 
+        plt = pyplot()
         for idx, values in enumerate(y):
             if legend:
                 label = "Cd = {:.2f}".format(self.Cd_array[idx])
@@ -89,35 +160,37 @@ class SpeedRange(Drone):
 
     def plot_area(self):
         x = np.arange(0, 180, 0.1)
-        y = np.array([self.surface_area(angle) for angle in x])
-        self.plot_graph(x, y, "Pitch angle [deg]", "Cross-section area [m2]")
+        self.plot_graph(x, self.surface_area(x), "Pitch angle [deg]", "Cross-section area [m2]")
 
     def plot_speed(self):
         x = np.arange(0, self.max_pitch(), 0.1)
-        y = np.empty((len(self.Cd_array)), dtype=np.ndarray)
-
-        for idx, cd in enumerate(self.Cd_array):
-            values = np.array([self.speed(angle, cd) for angle in x])
-            y[idx] = values
-
+        y = self.speed(x, self.Cd_array[:, None])
         self.plot_graph(x, y, "Pitch angle [deg]", "Horizontal speed [m/s]", legend=True)
 
     def plot_range(self):
-        x = np.arange(0, self.max_pitch(), 0.1)
-        y = np.empty((len(self.Cd_array)), dtype=np.ndarray)
-
-        for idx, cd in enumerate(self.Cd_array):
-            values = np.array([self.range(angle, cd) for angle in x]) / 1000
-            y[idx] = values
-
-        self.plot_graph(x, y, "Pitch angle [deg]", "Range [km]", legend=True)
-
-    def optimal_range_parameters(self, cd):
-        x = np.arange(0, self.max_pitch(), 0.1)
-        range = np.array([self.range(angle, cd) for angle in x])
-        angle = x[np.argmax(range)]
-        speed = self.speed(angle, cd)
-        return np.max(range), speed, angle
+        x, y = self.range_curve(self.Cd_array[:, None])
+        self.plot_graph(x, y / 1000, "Pitch angle [deg]", "Range [km]", legend=True)
+
+    def range_curve(self, cd, step=0.1):
+        # Range over pitch angles from 0 to max_pitch, in one vectorized evaluation
+        x = np.arange(0, self.max_pitch(), step)
+        return x, self.range(x, cd)
+
+    def optimal_range_parameters(self, cd, tol=1e-3, step=None):
+        # Range is unimodal in the pitch, so bounded Brent finds the best angle to tol degrees.
+        # With a step the best angle of the range_curve grid is taken instead.
+        if step is not None:
+            x, range = self.range_curve(cd, step)
+            angle = x[np.argmax(range)]
+        else:
+            from scipy.optimize import minimize_scalar
+
+            result = minimize_scalar(
+                lambda angle: -self.range(angle, cd), bounds=(0, self.max_pitch()), method="bounded",
+                options={"xatol": tol},
+            )
+            angle = result.x
+        return float(self.range(angle, cd)), float(self.speed(angle, cd)), float(angle)
 
 
 if __name__ == "__main__":
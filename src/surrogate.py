@@ -0,0 +1,152 @@
+import json
+from itertools import product
+
+import numpy as np
+from scipy.stats import qmc
+
+from src.configuration import configuration
+from src.sensitivity_analysis import size_factors
+
+outputs = ("mass", "P_tot", "N", "mh2", "I_ratio")
+# Parameters varied by +-20 % when no bounds are given
+default_parameters = (("mission", "T"), ("propeller", "Dp"), ("propeller", "Hp"), ("motor", "Kv0"), ("motor", "Rm"))
+
+
+def exact(config, parameters, x) -> dict:
+    # Sizing outputs for every row of parameter values, nan where the sizing does not converge
+    x = np.atleast_2d(x)
+    base = np.array([config[typ][parameter] for typ, parameter in parameters], dtype=float)
+    batch = size_factors(config, parameters, x / base)
+    return {"mass": batch.mass, "P_tot": batch.P_tot, "N": batch.N, "mh2": batch.mh2, "I_ratio": batch.I_ratio}
+
+
+class Surrogate:
+    # Polynomial regression of the logarithm of the sizing outputs in a box of parameters, over
+    # the monomials of total degree up to degree. The errors are the relative
+    # errors on a separate validation sample. Queries outside the box, next to a training point
+    # that did not converge, or for outputs less accurate than tol, are sized exactly.
+    def __init__(self, bounds=None, config=None, degree=5):
+        self.config = configuration.copy() if config is None else config
+        if bounds is None:
+            bounds = {(typ, parameter): (0.8 * self.config[typ][parameter], 1.2 * self.config[typ][parameter])
+                      for typ, parameter in default_parameters}
+        self.parameters = list(bounds)
+        self.lower = np.array([bounds[parameter][0] for parameter in self.parameters], dtype=float)
+        self.upper = np.array([bounds[parameter][1] for parameter in self.parameters], dtype=float)
+        self.degree = degree
+        exponents = np.array(
+            [powers for powers in product(range(degree + 1), repeat=len(self.parameters)) if sum(powers) <= degree]
+        )
+        # Position of z_j^e in the flattened (parameter, degree) table of features(), and one row of
+        # positions per parameter for query()
+        self.gather = np.arange(len(self.parameters)) * (degree + 1) + exponents
+        self.columns = np.ascontiguousarray(self.gather.T)
+        self.powers = np.arange(degree + 1, dtype=float)
+        self.scale = 2 / (self.upper - self.lower)
+
+        self.coefficients = None
+        self.errors = {}
+        self.diverged = np.zeros((0, len(self.parameters)))
+        self.spacing = 0.0
+        self.n_exact = 0
+
+    def normalize(self, x):
+        return (np.atleast_2d(x) - self.lower) * self.scale - 1
+
+    def features(self, z):
+        # Products of the powers of every term, z in [-1, 1] keeps the monomials well conditioned
+        powers = z[:, :, None] ** self.powers
+        return powers.reshape(len(z), -1)[:, self.gather].prod(axis=2)
+
+    def fit(self, samples=4096, validation=1024, seed=0):
+        engine = qmc.Sobol(len(self.parameters), seed=seed)
+        x = qmc.scale(engine.random_base2(int(np.log2(samples))), self.lower, self.upper)
+        check = qmc.scale(engine.random(validation), self.lower, self.upper)
+        y, y_check = exact(self.config, self.parameters, x), exact(self.config, self.parameters, check)
+
+        converged = np.all([np.isfinite(y[output]) for output in outputs], axis=0)
+        self.diverged = self.normalize(x[~converged])
+        # Distance between neighbouring training points in the normalized box
+        self.spacing = 2 * len(x) ** (-1 / len(self.parameters))
+
+        targets = np.column_stack([np.log(y[output][converged]) for output in outputs])
+        self.coefficients = np.linalg.lstsq(self.features(self.normalize(x[converged])), targets, rcond=None)[0]
+
+        valid = np.all([np.isfinite(y_check[output]) for output in outputs], axis=0)
+        predicted = self.predict(check[valid])
+        for output in outputs:
+            error = np.abs(predicted[output] / y_check[output][valid] - 1)
+            self.errors[output] = {"rms": float(np.sqrt(np.mean(error**2))), "max": float(np.max(error))}
+        return self
+
+    def predict(self, x) -> dict:
+        # Surrogate outputs for every row of parameter values, without any check
+        values = np.exp(self.features(self.normalize(x)) @ self.coefficients)
+        return dict(zip(outputs, values.T))
+
+    def trusted(self, x):
+        z = self.normalize(x)
+        inside = np.all(np.abs(z) <= 1, axis=1)
+        if len(self.diverged):
+            distance = np.min(np.linalg.norm(z[:, None, :] - self.diverged[None, :, :], axis=2), axis=1)
+            inside &= distance > self.spacing
+        return inside
+
+    def __call__(self, x, tol=None) -> dict:
+        # Predictions with exact sizings where the surrogate is not trusted, tol is on the
+        # largest relative validation error of any output
+        x = np.asarray(x, dtype=float)
+        if x.ndim == 1:
+            result = self.query(x, tol)
+            if result is not None:
+                return result
+        x = np.atleast_2d(x)
+        trusted = self.trusted(x)
+        if tol is not None and max(error["max"] for error in self.errors.values()) > tol:
+            trusted[:] = False
+
+        result = self.predict(x)
+        if not np.all(trusted):
+            sized = exact(self.config, self.parameters, x[~trusted])
+            for output in outputs:
+                result[output][~trusted] = sized[output]
+            self.n_exact += int(np.count_nonzero(~trusted))
+        result["trusted"] = trusted
+        return result
+
+    def query(self, x, tol=None):
+        # One row of parameter values without the batch overhead of __call__, None when the row is
+        # not trusted and needs the checks and exact sizing of __call__
+        z = (x - self.lower) * self.scale - 1
+        if np.abs(z).max() > 1 or (tol is not None and max(error["max"] for error in self.errors.values()) > tol):
+            return None
+        if len(self.diverged) and np.min(np.sum((self.diverged - z) ** 2, axis=1)) <= self.spacing**2:
+            return None
+        values = np.exp(np.power.outer(z, self.powers).ravel().take(self.columns).prod(axis=0) @ self.coefficients)
+        return dict(zip(outputs, values[:, None]), trusted=np.ones(1, dtype=bool))
+
+    def save(self, path):
+        np.savez(
+            path,
+            parameters=np.array(self.parameters), lower=self.lower, upper=self.upper, degree=self.degree,
+            coefficients=self.coefficients, diverged=self.diverged, spacing=self.spacing,
+            config=json.dumps(self.config), errors=json.dumps(self.errors),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            parameters = [tuple(parameter) for parameter in data["parameters"].tolist()]
+            bounds = dict(zip(parameters, zip(data["lower"].tolist(), data["upper"].tolist())))
+            surrogate = cls(bounds, json.loads(str(data["config"])), int(data["degree"]))
+            surrogate.coefficients = data["coefficients"]
+            surrogate.diverged = data["diverged"]
+            surrogate.spacing = float(data["spacing"])
+            surrogate.errors = json.loads(str(data["errors"]))
+        return surrogate
+
+
+if __name__ == "__main__":
+    surrogate = Surrogate().fit()
+    for output, error in surrogate.errors.items():
+        print(f"{output:<8} rms {error['rms']:.1e} max {error['max']:.1e}")
@@ -0,0 +1,99 @@
+import json
+import os
+
+import numpy as np
+
+from src.catalog import catalog
+
+# Metres per degree, as in WindTurbine.transform_coordinate
+metres_per_degree = 111139
+# Longitude and latitude of the origin of generated wind farms, near Hornsea
+origin = (1.6, 53.8)
+arrangements = ("grid", "staggered", "clustered")
+
+
+def synthetic_catalog(kind: str, n: int, seed=0, source=catalog) -> dict:
+    # Parameters drawn from a multivariate lognormal fitted to the json catalog of the source, so
+    # correlations like Kv0 against Rm carry over. Values stay within half the smallest and twice
+    # the largest catalog value, columns that only hold whole numbers are rounded.
+    values = np.array(list(source.table(kind).values()), dtype=float)
+    logs = np.log(values)
+
+    rng = np.random.default_rng(seed)
+    samples = np.exp(rng.multivariate_normal(logs.mean(axis=0), np.cov(logs, rowvar=False), size=n))
+    samples = np.clip(samples, values.min(axis=0) / 2, values.max(axis=0) * 2)
+
+    whole = np.all(values == np.round(values), axis=0)
+    samples[:, whole] = np.round(samples[:, whole])
+
+    return {f"Synthetic {kind} {i:06d}": row for i, row in enumerate(samples.tolist())}
+
+
+def write_catalogs(directory: str, n: int, seed=0, source=catalog):
+    # motor.json, propeller.json and esc.json of n parts each, open them with Catalog(directory)
+    os.makedirs(directory, exist_ok=True)
+    seeds = np.random.SeedSequence(seed).spawn(3)
+    paths = []
+    for kind, kind_seed in zip(("motor", "propeller", "esc"), seeds):
+        path = os.path.join(directory, f"{kind}.json")
+        with open(path, "w") as file:
+            json.dump(synthetic_catalog(kind, n, kind_seed, source), file)
+        paths.append(path)
+    return paths
+
+
+def layout(n: int, arrangement="grid", spacing=1000.0, jitter=0.0, seed=0) -> np.ndarray:
+    # Turbine positions in metres, all positive. Grids are close to square, staggered grids shift
+    # every other row by half the spacing and clustered farms spread the turbines around a
+    # cluster for every 200 turbines.
+    rng = np.random.default_rng(seed)
+
+    if arrangement in ("grid", "staggered"):
+        columns = int(np.ceil(np.sqrt(n)))
+        row, column = np.divmod(np.arange(n), columns)
+        x = column * spacing
+        if arrangement == "staggered":
+            x = x + (row % 2) * spacing / 2
+        xy = np.column_stack((x, row * spacing)).astype(float)
+    elif arrangement == "clustered":
+        clusters = max(1, n // 200)
+        side = spacing * np.sqrt(n) * 1.5
+        centres = rng.uniform(0, side, size=(clusters, 2))
+        xy = centres[rng.integers(clusters, size=n)] + rng.normal(0, spacing * np.sqrt(n / clusters) / 2, size=(n, 2))
+    else:
+        raise ValueError(f"Unknown arrangement: {arrangement}")
+
+    xy = xy + rng.normal(0, jitter, size=xy.shape)
+    return xy - xy.min(axis=0) + spacing
+
+
+def dms(degrees, hemisphere, width):
+    # 001° 37' 57.803" E as in the windfarm csv
+    milliseconds = int(round(degrees * 3600 * 1000))
+    whole, milliseconds = divmod(milliseconds, 3600 * 1000)
+    minutes, milliseconds = divmod(milliseconds, 60 * 1000)
+    return f"{whole:0{width}d}° {minutes:02d}' {milliseconds / 1000:.3f}\" {hemisphere}"
+
+
+def write_windfarm(path: str, n: int, arrangement="grid", spacing=1000.0, jitter=0.0, seed=0) -> np.ndarray:
+    # Wind farm csv in the schema of WindFarm.read_file with the OSS at the centre of the
+    # turbines, returns the turbine positions in metres
+    xy = layout(n, arrangement, spacing, jitter, seed)
+    oss = xy.mean(axis=0)
+
+    with open(path, "w") as file:
+        file.write("ID,Type,Longitude,Latitude\n")
+        for identifier, item, (x, y) in [*((f"WTG-{i:06d}", "WTG", point) for i, point in enumerate(xy)),
+                                         ("OSS-1", "OSS", oss)]:
+            long = dms(origin[0] + x / metres_per_degree, "E", 3)
+            lat = dms(origin[1] + y / metres_per_degree, "N", 2)
+            file.write(f"{identifier},{item},{long},{lat}\n")
+
+    return xy
+
+
+if __name__ == "__main__":
+    directory = "../datasets/synthetic"
+    print(write_catalogs(directory, 1000))
+    for arrangement in arrangements:
+        write_windfarm(os.path.join(directory, f"windfarm_{arrangement}.csv"), 1000, arrangement)
@@ -1,4 +1,5 @@
 import json
+import time
 import numpy as np
 from src.windfarm import WindFarm
 
@@ -45,43 +46,50 @@ class VRPSolver:
         with open("../datasets/vrp_solution.json", "w") as f:
             json.dump((routes, self.drone.properties(routes)), f)
 
+    def vehicle_route(self, data, manager, routing, vehicle_id, next_index):
+        # Nodes and arc cost of a vehicle, next_index gives the index after an index in the solution
+        nodes = []
+        route_distance = 0
+        index = routing.Start(vehicle_id)
+        while not routing.IsEnd(index):
+            nodes.append(manager.IndexToNode(index))
+            previous_index = index
+            index = next_index(index)
+            route_distance += routing.GetArcCostForVehicle(previous_index, index, vehicle_id)
+        nodes.append(manager.IndexToNode(index))
+        return nodes, route_distance
+
+    def routes(self, data, manager, routing, next_index):
+        # Trips as DroneRoute.find_route returns them
+        routes = []
+        for vehicle_id in range(data['num_vehicles']):
+            nodes, route_distance = self.vehicle_route(data, manager, routing, vehicle_id, next_index)
+            trip = [list(self.coordinates[node]) for node in nodes]
+            actual_distance = route_distance - data['distance_spent_turbine'] * (len(trip) - 2)
+            hydro = (actual_distance * self.drone.E_cr + (len(trip) - 2) * self.drone.E_ins) / 34000
+            trip_time = (actual_distance / data['vehicle_cruise_speed'] + (len(trip) - 2) * self.drone.inspection_time * 60 * 60) / 3600
+            routes.append([trip, hydro, trip_time])
+        return routes
+
     def print_solution(self, data, manager, routing, solution):
         """Prints solution on console."""
         # print(f'Objective: {solution.ObjectiveValue()}')
+        def next_index(index):
+            return solution.Value(routing.NextVar(index))
+
         total_distance = 0
         max_route_distance = 0
-        routes = []
-        total_hydro = 0
-        total_hours = 0
         for vehicle_id in range(data['num_vehicles']):
-            trip = []
-
-            index = routing.Start(vehicle_id)
+            nodes, route_distance = self.vehicle_route(data, manager, routing, vehicle_id, next_index)
             plan_output = 'Route for vehicle {}:\n'.format(vehicle_id)
-            route_distance = 0
-            while not routing.IsEnd(index):
-                trip.append(list(self.coordinates[manager.IndexToNode(index)]))
-                plan_output += ' {} -> '.format(manager.IndexToNode(index))
-                previous_index = index
-                index = solution.Value(routing.NextVar(index))
-                route_distance += routing.GetArcCostForVehicle(
-                    previous_index, index, vehicle_id)
-
-            trip.append(list(self.coordinates[manager.IndexToNode(index)]))
-            actual_distance = route_distance - data['distance_spent_turbine'] * (len(trip) - 2)
-            hydro = (actual_distance * self.drone.E_cr + (len(trip) - 2) * self.drone.E_ins) / 34000
-            total_hydro += hydro
-
-            time = (actual_distance / data['vehicle_cruise_speed'] + (len(trip) - 2) * self.drone.inspection_time * 60 * 60) / 3600
-            total_hours += time
-            routes.append([trip, hydro, time])
-            plan_output += '{}\n'.format(manager.IndexToNode(index))
+            plan_output += ''.join(' {} -> '.format(node) for node in nodes[:-1])
+            plan_output += '{}\n'.format(nodes[-1])
             plan_output += 'Distance of the route: {}m\n'.format(route_distance)
             print(plan_output)
             total_distance += route_distance
             max_route_distance = max(route_distance, max_route_distance)
 
-        self.save_as_json(routes)
+        self.save_as_json(self.routes(data, manager, routing, next_index))
 
         total_distance -= len(self.windfarm.turbines) * data['distance_spent_turbine']
         print('Maximum of the route distances: {}m'.format(max_route_distance))
@@ -92,7 +100,9 @@ class VRPSolver:
         total_hydro = total_energy / 34000
         print(f'Total hydrogen consumed: {total_hydro} g')
 
-    def run_model(self, max_runtime=10):
+    def run_model(self, max_runtime=10, callback=None, cancel=None):
+        # callback gets every solution the search finds with its properties and elapsed seconds, as
+        # AnytimeRouter does. The cancel event is checked at each solution and ends the search.
         def distance_callback(from_index, to_index):
             from_node = manager.IndexToNode(from_index)
             to_node = manager.IndexToNode(to_index)
@@ -141,6 +151,18 @@ class VRPSolver:
             routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH)
         search_parameters.time_limit.FromSeconds(max_runtime)
 
+        start = time.perf_counter()
+
+        def on_solution():
+            if callback is not None:
+                routes = self.routes(data, manager, routing, lambda index: routing.NextVar(index).Value())
+                callback(routes, dict(self.drone.properties(routes), elapsed=time.perf_counter() - start))
+            if cancel is not None and cancel.is_set():
+                routing.solver().FinishCurrentSearch()
+
+        if callback is not None or cancel is not None:
+            routing.AddAtSolutionCallback(on_solution)
+
         # Solve problem
         solution = routing.SolveWithParameters(search_parameters)
 
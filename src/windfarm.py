@@ -1,9 +1,9 @@
 import re
-from components import *
+from src.components import *
 import numpy as np
-import matplotlib.pyplot as plt
 from src.shelf_drone import ShelfPropeller, ShelfMotor, ShelfESC
 from src.speed_range import SpeedRange
+from src.plotting import pyplot
 
 
 class WindTurbine:
@@ -47,8 +47,8 @@ class OSS(WindTurbine):
 
 class WindFarm:
 
-    def __init__(self, limit=None):
-        self.file = "../datasets/windfarm.csv"
+    def __init__(self, limit=None, file="../datasets/windfarm.csv"):
+        self.file = file
         self.limit = limit
         self.drone = SpeedRange(
             propeller=ShelfPropeller("T-Motor NS 26x85"),
@@ -94,6 +94,7 @@ class WindFarm:
             turbine.x_n = turbine.x - self.oss.x
 
     def plot_farm(self, normalized=True):
+        plt = pyplot()
         fig, ax = plt.subplots(figsize=(14, 4))
         plt.axis('equal')
         # plt.gca().set_ylim([-15, 9])
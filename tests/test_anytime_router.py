@@ -0,0 +1,98 @@
+import importlib.util
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from src.anytime_router import AnytimeRouter
+from src.routing import DroneRoute
+from src.shelf_drone import ShelfESC, ShelfMotor, ShelfPropeller
+from src.synthetic import layout, write_windfarm
+from src.windfarm import WindFarm
+
+
+class TestAnytimeRouter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.drone = DroneRoute(
+            propeller=ShelfPropeller("T-Motor NS 26x85"),
+            motor=ShelfMotor("T-Motor Antigravity MN6007II KV160"),
+            esc=ShelfESC("T-Motor FLAME 60A"),
+            tank_mass=1.65,
+        )
+        X = layout(300, "clustered", spacing=600.0, jitter=50.0, seed=3)
+        cls.X = X - X.mean(axis=0)
+
+    def test_budget(self):
+        found = []
+        start = time.perf_counter()
+        route, metrics = AnytimeRouter(self.drone, self.X, seed=0).solve(
+            budget=0.2, callback=lambda route, metrics: found.append(metrics)
+        )
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(metrics["stop"], "budget")
+        self.assertEqual(found[0]["stage"], "greedy")
+        for previous, current in zip(found, found[1:]):
+            self.assertTrue(self.drone.better(current, previous))
+        self.assertEqual(self.drone.properties(route)["kg H2"], found[-1]["kg H2"])
+
+    def test_target(self):
+        greedy = self.drone.properties(self.drone.find_route(self.X))
+        route, metrics = AnytimeRouter(self.drone, self.X).solve(budget=10, target=greedy)
+        self.assertEqual((metrics["stop"], metrics["stage"], metrics["restarts"]), ("target", "greedy", 0))
+
+    def test_cancel(self):
+        cancel = threading.Event()
+        threading.Timer(0.1, cancel.set).start()
+        route, metrics = AnytimeRouter(self.drone, self.X).solve(cancel=cancel)
+        self.assertEqual(metrics["stop"], "cancelled")
+        self.assertLess(metrics["elapsed"], 1.0)
+
+    def test_restarts(self):
+        first = AnytimeRouter(self.drone, self.X, seed=5).solve(max_restarts=3)
+        second = AnytimeRouter(self.drone, self.X, seed=5).solve(max_restarts=3)
+        self.assertEqual(first[0], second[0])
+        self.assertEqual((first[1]["stop"], first[1]["restarts"]), ("restarts", 3))
+
+    def test_bound(self):
+        router = AnytimeRouter(self.drone, self.X, seed=0)
+        route, metrics = router.solve(budget=10, stop_at_bound=True, h2_gap=0.05)
+        self.assertEqual(metrics["stop"], "bound")
+        self.assertEqual(metrics["trips"], router.bounds["trips"])
+        self.assertLessEqual(metrics["gap"]["kg H2"], 0.05)
+
+        route, metrics = AnytimeRouter(self.drone, self.X, seed=0).solve(max_restarts=2)
+        self.assertEqual(metrics["stop"], "restarts")
+
+    @unittest.skipUnless(importlib.util.find_spec("ortools"), "ortools is not installed")
+    def test_vrp(self):
+        from src.vrp_solver import VRPSolver
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "windfarm.csv")
+            write_windfarm(path, 20, "staggered", spacing=600.0)
+            farm = WindFarm(file=path)
+        X = farm.coordinates.astype(float)
+
+        found = []
+        route, metrics = AnytimeRouter(self.drone, X).solve_vrp(
+            VRPSolver(farm, self.drone, n_trips=5), budget=1, callback=lambda route, metrics: found.append(metrics)
+        )
+        self.assertTrue(len(found) > 0)
+        self.assertEqual({current["stage"] for current in found}, {"or-tools"})
+        self.assertIn(metrics["stop"], ("budget", "search"))
+
+        route, metrics = AnytimeRouter(self.drone, X).solve_vrp(
+            VRPSolver(farm, self.drone, n_trips=5), budget=10, target={"trips": len(X) + 1}
+        )
+        self.assertEqual(metrics["stop"], "target")
+        self.assertLess(metrics["elapsed"], 10)
+
+    def test_no_stop(self):
+        with self.assertRaises(ValueError):
+            AnytimeRouter(self.drone, self.X).solve()
+
+
+if __name__ == "__main__":
+    unittest.main()
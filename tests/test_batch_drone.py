@@ -0,0 +1,79 @@
+import unittest
+from copy import deepcopy
+
+import numpy as np
+from src.batch_drone import BatchDrone
+from src.catalog import catalog
+from src.configuration import configuration
+from src.drone import Drone
+from src.shelf_drone import ShelfPropeller, ShelfMotor, ShelfESC
+
+
+class BatchDroneTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.configs = []
+        for scale in np.linspace(0.8, 1.2, 5):
+            config = deepcopy(configuration)
+            config["propeller"]["Dp"] *= scale
+            config["motor"]["Kv0"] *= scale
+            self.configs.append(config)
+
+        self.batch = BatchDrone.from_configs(self.configs)
+        self.drones = [Drone(deepcopy(config)) for config in self.configs]
+
+    def test_init(self):
+        self.assertEqual(len(self.batch), len(self.configs))
+        self.assertTrue(self.batch.mass.shape == (len(self.configs),))
+
+    def test_matches_drone(self):
+        for i, drone in enumerate(self.drones):
+            self.assertTrue(self.batch.converged[i])
+            self.assertTrue(np.isclose(self.batch.mass[i], drone.mass, rtol=1e-9))
+            self.assertTrue(np.isclose(self.batch.N[i], drone.N, rtol=1e-9))
+            self.assertTrue(np.isclose(self.batch.P_tot[i], drone.P_tot, rtol=1e-9))
+            self.assertTrue(np.isclose(self.batch.mh2[i], drone.hyd.mh2, rtol=1e-9))
+            self.assertTrue(np.isclose(self.batch.I_ratio[i], drone.I_ratio, rtol=1e-9))
+
+    def test_fixed_hydrogen(self):
+        batch = BatchDrone.from_configs(self.configs, tank_mass=1.65, mh2=0.12)
+        drone = Drone(deepcopy(self.configs[0]), tank_mass=1.65, mh2=0.12)
+
+        self.assertTrue(np.isclose(batch.mass[0], drone.mass))
+        self.assertTrue(np.isclose(batch.P_tot[0], drone.P_tot))
+        self.assertTrue(np.all(batch.iterations == 0))
+
+    def test_not_converged(self):
+        batch = BatchDrone.from_configs(self.configs, max_iter=2)
+
+        self.assertTrue(not batch.converged.any())
+        self.assertTrue(np.isnan(batch.mass).all())
+        self.assertTrue(np.isnan(batch.I_ratio).all())
+
+    def test_shelf_components(self):
+        propellers = [ShelfPropeller("T-Motor NS 26x85"), ShelfPropeller("T-Motor P20x6")]
+        motors = [ShelfMotor("T-Motor Antigravity MN6007II KV160")] * 2
+        escs = [ShelfESC("T-Motor FLAME 60A")] * 2
+        batch = BatchDrone.from_components(propellers, motors, escs)
+
+        for i, propeller in enumerate(propellers):
+            drone = Drone(propeller=propeller, motor=motors[i], esc=escs[i])
+            if drone.mass is None or not np.isfinite(drone.mass):
+                self.assertTrue(not batch.converged[i])
+            else:
+                self.assertTrue(np.isclose(batch.mass[i], drone.mass, rtol=1e-9))
+
+    def test_columns(self):
+        propellers, motors, escs = (catalog.columns(kind) for kind in ("propeller", "motor", "esc"))
+        batch = BatchDrone.from_columns(propellers, motors[:len(propellers)], escs[0])
+        reference = BatchDrone.from_components(
+            [ShelfPropeller(name) for name in propellers["name"]],
+            [ShelfMotor(name) for name in motors["name"][:len(propellers)]],
+            [ShelfESC(escs["name"][0])] * len(propellers),
+        )
+
+        self.assertTrue(np.shares_memory(batch.propeller.Ct, propellers))
+        self.assertTrue(np.array_equal(batch.mass, reference.mass, equal_nan=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
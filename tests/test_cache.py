@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+from copy import deepcopy
+
+import numpy as np
+from src.cache import SizingCache
+from src.configuration import configuration
+from src.drone import Drone
+from src.solver import FixedPointSolver
+
+
+class SizingCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = SizingCache(maxsize=2)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_key(self):
+        config = deepcopy(configuration)
+        config["motor"]["Kv0"] = np.float64(config["motor"]["Kv0"])
+        other = deepcopy(configuration)
+        other["motor"]["Kv0"] += 1
+
+        self.assertEqual(SizingCache.key(configuration), SizingCache.key(config))
+        self.assertNotEqual(SizingCache.key(configuration), SizingCache.key(other))
+        self.assertNotEqual(SizingCache.key(configuration, mh2=None), SizingCache.key(configuration, mh2=0.12))
+
+    def test_lru(self):
+        self.cache.put("a", {"mass": 1})
+        self.cache.put("b", {"mass": 2})
+        self.cache.get("a")
+        self.cache.put("c", {"mass": 3})
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), {"mass": 1})
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+    def test_disk(self):
+        self.cache = SizingCache(maxsize=1, directory=self.directory.name)
+        self.cache.put("a", {"mass": 1.5})
+        self.cache.put("b", {"mass": 2.5})
+
+        other = SizingCache(directory=self.directory.name)
+        self.assertEqual(self.cache.get("a"), {"mass": 1.5})
+        self.assertEqual(other.get("b"), {"mass": 2.5})
+        self.assertEqual(self.cache.disk_hits, 1)
+
+    def test_disk_eviction(self):
+        self.cache = SizingCache(directory=self.directory.name, max_bytes=100)
+        for i in range(10):
+            self.cache.put(str(i), {"mass": float(i)})
+            os.utime(self.cache.path(str(i)), (i, i))
+
+        files = os.listdir(self.directory.name)
+        self.assertTrue(sum(os.path.getsize(self.cache.path(f[:-5])) for f in files) <= 100)
+        self.assertIn("9.json", files)
+        self.assertNotIn("0.json", files)
+
+    def test_drone(self):
+        Drone.cache, default = SizingCache(), Drone.cache
+        try:
+            drone = Drone(deepcopy(configuration))
+            cached = Drone(deepcopy(configuration))
+            self.assertEqual((Drone.cache.hits, Drone.cache.misses), (1, 1))
+
+            self.assertEqual(cached.mass, drone.mass)
+            self.assertEqual(cached.N, drone.N)
+            self.assertEqual(cached.P_tot, drone.P_tot)
+            self.assertEqual(cached.hyd.mh2, drone.hyd.mh2)
+            self.assertEqual(cached.I_ratio, drone.I_ratio)
+            self.assertEqual(cached.convergence.iterations, drone.convergence.iterations)
+            self.assertEqual(cached.compute_endurance(1), drone.compute_endurance(1))
+
+            Drone(deepcopy(configuration), solver=FixedPointSolver(max_iter=2))
+            Drone(deepcopy(configuration), tank_mass=1.65, mh2=0.12)
+            Drone(deepcopy(configuration), cache=False)
+            self.assertEqual((Drone.cache.hits, Drone.cache.misses), (1, 3))
+        finally:
+            Drone.cache = default
+
+    def test_drone_disk(self):
+        cache = SizingCache(directory=self.directory.name)
+        drone = Drone(deepcopy(configuration), cache=cache)
+        cache.clear()
+        cached = Drone(deepcopy(configuration), cache=cache)
+
+        self.assertEqual(cache.disk_hits, 1)
+        self.assertEqual(cached.mass, drone.mass)
+        self.assertEqual(cached.I_ratio, drone.I_ratio)
+        self.assertTrue(cached.convergence.converged)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from src.catalog import Catalog, build, catalog
+from src.shelf_drone import ShelfPropeller, ShelfMotor, ShelfESC
+
+
+class CatalogTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "motor.json")
+        self.write({"Motor": [100, 20, 0.7, 0.2, 24, 0.175]}, 1)
+        self.catalog = Catalog(directory=self.directory.name, experimental=self.directory.name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, table, mtime):
+        with open(self.path, "w") as file:
+            json.dump(table, file)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_load_once(self):
+        table = self.catalog.table("motor")
+
+        self.assertIs(self.catalog.table("motor"), table)
+        self.assertEqual(self.catalog.loads, 1)
+        self.assertIsNone(self.catalog.fit("Motor"))
+
+    def test_invalidation(self):
+        self.catalog.table("motor")
+        self.write({"Motor": [200, 20, 0.7, 0.2, 24, 0.175]}, 2)
+
+        self.assertEqual(self.catalog.table("motor")["Motor"][0], 200)
+        self.assertEqual(self.catalog.loads, 2)
+
+    def test_shared(self):
+        propeller = ShelfPropeller.shared("T-Motor NS 22x66")
+        motor = ShelfMotor.shared("T-Motor Antigravity MN5008 KV340")
+
+        self.assertIs(ShelfPropeller.shared("T-Motor NS 22x66"), propeller)
+        self.assertIs(ShelfMotor.shared("T-Motor Antigravity MN5008 KV340"), motor)
+        self.assertIsNot(ShelfPropeller("T-Motor NS 22x66"), propeller)
+        self.assertEqual(ShelfPropeller("T-Motor NS 22x66").Ct, propeller.Ct)
+        self.assertEqual(ShelfESC.shared("T-Motor FLAME 60A").Iecont, 60)
+
+    def test_no_reads(self):
+        ShelfPropeller("T-Motor NS 22x66")
+        loads = catalog.loads
+        for _ in range(10):
+            ShelfPropeller("T-Motor NS 22x66")
+            ShelfMotor("T-Motor Antigravity MN5008 KV340")
+        ShelfMotor("T-Motor Antigravity MN5008 KV340")
+
+        self.assertTrue(catalog.loads <= loads + 1)
+
+    def test_columns(self):
+        columns = catalog.columns("propeller")
+        rows = catalog.find("propeller", ["T-Motor NS 22x66", "APC 14x55MR"])
+
+        for row, name in zip(rows, ["T-Motor NS 22x66", "APC 14x55MR"]):
+            propeller, shelf = build("propeller", columns[row]), ShelfPropeller(name)
+            self.assertEqual(propeller.name, name)
+            self.assertEqual((propeller.Dp, propeller.Ct, propeller.Cm), (shelf.Dp, shelf.Ct, shelf.Cm))
+        with self.assertRaises(ValueError):
+            catalog.find("propeller", ["No propeller"])
+
+    def test_convert(self):
+        path = self.catalog.convert("motor")
+        columns = self.catalog.columns("motor")
+
+        self.assertTrue(path.endswith("motor.npy"))
+        self.assertIsInstance(columns, np.memmap)
+        self.assertEqual(columns["Kv0"][self.catalog.find("motor", ["Motor"])[0]], 100)
+
+        # A newer json catalog takes over from the converted file
+        self.write({"Motor": [200, 20, 0.7, 0.2, 24, 0.175]}, os.path.getmtime(path) + 10)
+        self.assertEqual(self.catalog.columns("motor")["Kv0"][0], 200)
+
+    def test_missing(self):
+        with self.assertRaises(ValueError):
+            ShelfMotor.shared("No motor")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from copy import deepcopy
+
+import numpy as np
+from src.derivatives import Dual, jacobian, outputs
+from src.drone import Drone
+from src.motor import Motor
+from src.sensitivity_analysis import SensitivityAnalysis
+from src.shelf_drone import ShelfPropeller, ShelfMotor, ShelfESC
+from src.solver import get_solver
+
+
+def sized(drone):
+    return np.array([drone.mass, drone.compute_endurance(1), drone.P_tot, drone.hyd.mh2, drone.I_ratio])
+
+
+class DualTest(unittest.TestCase):
+    def test_functions(self):
+        x, y = Dual.variables([0.3, 2.0])
+
+        result = np.sqrt(x * y) + np.arctan2(x, np.pi * y) - 1 / y**2 + np.float64(2.0) * x**y
+        h = 1e-7
+
+        def f(x, y):
+            return np.sqrt(x * y) + np.arctan2(x, np.pi * y) - 1 / y**2 + 2.0 * x**y
+
+        numeric = [(f(0.3 + h, 2.0) - f(0.3 - h, 2.0)) / (2 * h), (f(0.3, 2.0 + h) - f(0.3, 2.0 - h)) / (2 * h)]
+        self.assertAlmostEqual(result.value, f(0.3, 2.0))
+        np.testing.assert_allclose(result.gradient, numeric, rtol=1e-6)
+
+
+class JacobianTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.solver = get_solver(None, tol=1e-12)
+        self.drone = Drone(solver=self.solver, cache=False)
+
+    def test_central_differences(self):
+        rows = jacobian(self.drone)
+
+        for row in rows:
+            h = 1e-6 * row["value"]
+            changed = []
+            for step in (h, -h):
+                config = deepcopy(self.drone.config)
+                config[row["type"]][row["parameter"]] += step
+                changed.append(sized(Drone(config, solver=self.solver, cache=False)))
+            numeric = (changed[0] - changed[1]) / (2 * h)
+
+            np.testing.assert_allclose([row[output] for output in outputs], numeric, rtol=1e-5, atol=1e-9,
+                                       err_msg=row["parameter"])
+
+    def test_loop_tolerance(self):
+        # The default tolerance of the sizing loop does not change the derivatives
+        coarse = jacobian(Drone(cache=False))
+        fine = jacobian(self.drone)
+
+        for output in outputs:
+            np.testing.assert_allclose(coarse[output], fine[output], rtol=1e-9)
+
+    def test_catalog_parts(self):
+        propeller = ShelfPropeller("T-Motor NS 24x72")
+        motor = ShelfMotor("T-Motor Antigravity MN6007II KV320")
+        esc = ShelfESC("T-Motor FLAME 80A")
+        drone = Drone(propeller=propeller, motor=motor, esc=esc, solver=self.solver, cache=False)
+        rows = jacobian(drone, [("motor", "Rm"), ("propeller", "Hp")])
+
+        h = 1e-6 * motor.Rm
+        masses = []
+        for step in (h, -h):
+            changed = Motor(motor.Kv0, motor.Um0, motor.Im0, motor.Rm + step, motor.Immax, motor.mass)
+            masses.append(Drone(propeller=propeller, motor=changed, esc=esc, solver=self.solver, cache=False).mass)
+
+        self.assertAlmostEqual(rows["mass"][0], (masses[0] - masses[1]) / (2 * h), places=5)
+        # The fitted coefficients of a catalog propeller do not depend on the pitch
+        self.assertEqual(rows["mass"][1], 0)
+
+    def test_slopes(self):
+        analysis = SensitivityAnalysis(self.drone)
+        rows = analysis.slopes()
+        slopes = dict(zip(rows["parameter"], rows["slope"]))
+        analysis.generate_drones("mission", "T")
+        x, y = analysis.x_values[0], analysis.mass_values[0]
+        middle = np.searchsorted(x, 0)
+
+        self.assertNotIn("Nm", slopes)
+        self.assertAlmostEqual(slopes["T"], (y[middle + 1] - y[middle - 1]) / (x[middle + 1] - x[middle - 1]), places=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
 import unittest
+from copy import deepcopy
+from src.components import I_components
 from src.drone import Drone
+from src.solver import FixedPointSolver
 import numpy as np
 
 
@@ -19,6 +22,7 @@ class TestDrone(unittest.TestCase):
             "esc": {"Iemax": 80, "Iecont": 60, "mass": 0.006},
         }
 
+        self.config = config
         self.D = Drone(config=config)
 
     def test_init(self):
@@ -54,6 +58,43 @@ class TestDrone(unittest.TestCase):
         P_tot = P * self.D.Nm
         self.assertTrue(np.allclose(E / P_tot, Time_model))
 
+    def test_convergence(self):
+        self.assertTrue(self.D.convergence.converged)
+        self.assertTrue(self.D.convergence.iterations > 0)
+        self.assertTrue(self.D.convergence.residual <= 0.001)
+
+        for solver in ["secant", "aitken"]:
+            drone = Drone(config=deepcopy(self.config), solver=solver)
+            self.assertTrue(drone.convergence.solver == solver)
+            self.assertTrue(drone.convergence.iterations <= self.D.convergence.iterations)
+            self.assertTrue(np.isclose(drone.mass, self.D.mass, atol=0.01), msg=(solver, drone.mass))
+
+    def test_operating_curve(self):
+        N_arr = np.arange(0, 5000, 50)
+        curve = self.D.operating_curve(N_arr)
+
+        self.assertTrue(len(curve) == len(N_arr))
+        self.assertTrue(np.all(curve["N"] == N_arr))
+
+        for row in curve[::10]:
+            T, M = self.D.propeller.forces(row["N"])
+            V, I = self.D.motor.VandI(M, row["N"])
+            V_fc = self.D.fuelcell.get_current_voltage(self.D.Nm * V * I)[1]
+            I_esc = self.D.esc.inputI(V, I, V_fc)
+
+            self.assertTrue(np.isclose(row["T"], T))
+            self.assertTrue(np.isclose(row["P"], V * I))
+            self.assertTrue(np.isclose(row["V_fc"], V_fc))
+            self.assertTrue(np.isclose(row["throttle"], self.D.esc.throttle(V, I, V_fc)))
+            self.assertTrue(np.isclose(row["I_esc"], I_esc))
+            self.assertTrue(np.isclose(row["P_fc"], V_fc * (I_esc * self.D.Nm + I_components)))
+
+    def test_not_converged(self):
+        drone = Drone(config=deepcopy(self.config), solver=FixedPointSolver(max_iter=2))
+
+        self.assertTrue(drone.mass is None)
+        self.assertTrue(drone.convergence.reason == "max_iter")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,19 +1,20 @@
 import unittest
 from math import inf
-from src.drone_combinator import DroneCombinator
+from src.drone_combinator import DroneCombinator, feasible, ratings
 
 
 class TestCombinator(unittest.TestCase):
     def setUp(self) -> None:
-        self.combinator = DroneCombinator()
+        self.combinator = DroneCombinator(workers=1, prune=True)
 
     def test_init(self):
         self.assertTrue(self.combinator.drones is not None)
         self.assertTrue(self.combinator.motors is not None)
         self.assertTrue(self.combinator.propellers is not None)
+        self.assertTrue(self.combinator.escs is not None)
 
     def test_create_drones(self):
-        n_combinations = len(self.combinator.motors) * len(self.combinator.propellers)
+        n_combinations = len(self.combinator.motors) * len(self.combinator.propellers) * len(self.combinator.escs)
 
         self.assertTrue(len(self.combinator.drones) <= n_combinations)
 
@@ -21,6 +22,57 @@ class TestCombinator(unittest.TestCase):
             self.assertTrue(drone.mass > 0)
             self.assertTrue(drone.propeller.name is not None)
             self.assertTrue(drone.motor.name is not None)
+            self.assertTrue(drone.esc.name in self.combinator.escs["name"])
+            self.assertTrue(feasible(drone))
+
+    def test_parallel(self):
+        parallel = DroneCombinator(workers=2, chunksize=1000, prune=True)
+
+        self.assertEqual(len(parallel.drones), len(self.combinator.drones))
+        for drone, serial in zip(parallel.drones, self.combinator.drones):
+            self.assertEqual(
+                (drone.propeller.name, drone.motor.name, drone.esc.name, drone.mass),
+                (serial.propeller.name, serial.motor.name, serial.esc.name, serial.mass),
+            )
+
+    def test_pruning(self):
+        full = DroneCombinator(workers=1)
+        n_combinations = len(full.motors) * len(full.propellers) * len(full.escs)
+        pruned = self.combinator.pruned
+
+        self.assertEqual(full.n_sized, n_combinations)
+        self.assertTrue(self.combinator.n_sized < n_combinations)
+        self.assertEqual(pruned["dominated"] + pruned["bound"] + self.combinator.n_sized, n_combinations)
+        self.assertEqual(self.combinator.n_sized - pruned["not converged"] - pruned["current"],
+                         len(self.combinator.drones))
+
+        # Pruning is opt-in, without it the drones above the current rating are kept
+        self.assertFalse(full.prune)
+        self.assertEqual(full.pruned["current"], 0)
+        self.assertTrue(any(not feasible(drone) for drone in full.drones))
+
+        # The bound never removes a feasible design, only dominated components make a difference
+        expected = [
+            drone for drone in full.drones
+            if feasible(drone)
+            and not {drone.propeller.name, drone.motor.name, drone.esc.name} & set(self.combinator.dominated)
+        ]
+        self.assertEqual([drone.mass for drone in expected], [drone.mass for drone in self.combinator.drones])
+
+    def test_dominance(self):
+        # The shipped catalogs have dominated motors and ESCs, each one has a lighter or higher
+        # rated part left in the catalog
+        self.assertTrue(self.combinator.pruned["dominated"] > 0)
+        for kind, columns in (("motor", self.combinator.motors), ("esc", self.combinator.escs)):
+            dominated = [row for row in columns if row["name"] in self.combinator.dominated]
+            self.assertTrue(len(dominated) > 0, msg=kind)
+            for row in dominated:
+                self.assertTrue(any(
+                    other["mass"] <= row["mass"] and all(other[rating] >= row[rating] for rating in ratings[kind])
+                    and other["name"] not in self.combinator.dominated
+                    for other in columns
+                ), msg=row["name"])
+        self.assertFalse(set(self.combinator.propellers["name"]) & set(self.combinator.dominated))
 
     def test_sorted_drones(self):
         current_weight = 0
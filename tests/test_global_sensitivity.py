@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+from scipy.stats import qmc
+from src.drone import Drone
+from src.global_sensitivity import GlobalSensitivity, sobol_indices
+from src.shelf_drone import ShelfPropeller, ShelfMotor, ShelfESC
+
+
+class GlobalSensitivityTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.drone = Drone(
+            propeller=ShelfPropeller("T-Motor NS 24x72"),
+            motor=ShelfMotor("T-Motor Antigravity MN6007II KV320"),
+            esc=ShelfESC("T-Motor FLAME 80A"),
+        )
+
+    def test_ishigami(self):
+        def ishigami(x):
+            return np.sin(x[:, 0]) + 7 * np.sin(x[:, 1]) ** 2 + 0.1 * x[:, 2] ** 4 * np.sin(x[:, 0])
+
+        sample = qmc.scale(qmc.Sobol(6, seed=1).random_base2(14), [-np.pi] * 6, [np.pi] * 6)
+        A, B = sample[:, :3], sample[:, 3:]
+        fAB = np.column_stack([ishigami(np.where(np.arange(3) == i, B, A)) for i in range(3)])
+        S1, ST = sobol_indices(ishigami(A), ishigami(B), fAB)
+
+        np.testing.assert_allclose(S1, [0.3139, 0.4424, 0.0], atol=0.02)
+        np.testing.assert_allclose(ST, [0.5576, 0.4424, 0.2437], atol=0.02)
+
+    def test_morris(self):
+        analysis = GlobalSensitivity(self.drone)
+        rows = analysis.morris()
+        mu_star = dict(zip(rows["parameter"], rows["mu_star"]))
+
+        self.assertTrue(analysis.converged)
+        self.assertEqual(rows["parameter"][np.argmax(rows["mu_star"])], "T")
+        self.assertEqual(mu_star["Iecont"], 0)
+        self.assertTrue(mu_star["Hp"] > mu_star["Um0"])
+
+    def test_sobol(self):
+        analysis = GlobalSensitivity(self.drone, parameters=[("mission", "T"), ("propeller", "Hp"), ("esc", "Iemax")])
+        rows = analysis.sobol()
+
+        self.assertTrue(analysis.converged)
+        self.assertTrue(np.all(rows["ST"] >= rows["S1"] - rows["S1_ci"]))
+        self.assertTrue(rows["S1"][0] > rows["S1"][1] > 0.05)
+        self.assertTrue(abs(rows["ST"][2]) < 1e-9)
+        self.assertTrue(np.sum(rows["S1"]) <= 1 + np.sum(rows["S1_ci"]))
+
+    def test_parallel(self):
+        serial = GlobalSensitivity(self.drone, seed=3).sobol(max_samples=512)
+        parallel = GlobalSensitivity(self.drone, seed=3, workers=2, chunksize=1000).sobol(max_samples=512)
+
+        np.testing.assert_allclose(parallel["S1"], serial["S1"])
+        np.testing.assert_allclose(parallel["ST"], serial["ST"])
+
+
+if __name__ == "__main__":
+    unittest.main()
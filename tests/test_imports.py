@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+import unittest
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ImportTest(unittest.TestCase):
+    def loaded(self, module):
+        script = f"import sys, {module}; print(*sorted(sys.modules))"
+        out = subprocess.run(
+            [sys.executable, "-c", script],
+            env=dict(os.environ, PYTHONPATH=root), capture_output=True, text=True, check=True,
+        ).stdout.split()
+        return {name.split(".")[0] for name in out}
+
+    def test_headless(self):
+        for module in ("src.drone", "src.batch_drone", "src.shelf_drone", "src.sensitivity_analysis",
+                       "src.speed_range", "src.routing", "src.drone_combinator"):
+            loaded = self.loaded(module)
+            for heavy in ("matplotlib", "pandas", "sklearn", "prettytable", "scipy"):
+                self.assertNotIn(heavy, loaded, f"{module} imports {heavy}")
+
+
+if __name__ == "__main__":
+    unittest.main()
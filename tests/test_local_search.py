@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+from src.local_search import LocalSearch
+from src.routing import DroneRoute
+from src.shelf_drone import ShelfESC, ShelfMotor, ShelfPropeller
+from src.synthetic import layout
+
+
+def trip_length(trip):
+    return np.sum(np.linalg.norm(np.diff(np.array(trip, dtype=float), axis=0), axis=1))
+
+
+class TestLocalSearch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.drone = DroneRoute(
+            propeller=ShelfPropeller("T-Motor NS 26x85"),
+            motor=ShelfMotor("T-Motor Antigravity MN6007II KV160"),
+            esc=ShelfESC("T-Motor FLAME 60A"),
+            tank_mass=1.65,
+        )
+        X = layout(300, "clustered", spacing=600.0, jitter=50.0, seed=3)
+        cls.X = X - X.mean(axis=0)
+        cls.route = cls.drone.find_route(cls.X)
+
+    def test_improve_route(self):
+        improved = self.drone.improve_route(self.route, return_dist=True)
+        before, after = self.drone.properties(self.route), self.drone.properties([trip[:3] for trip in improved])
+        self.assertLessEqual(after["trips"], before["trips"])
+        self.assertLess(after["kg H2"], before["kg H2"])
+
+        visited = sorted(tuple(point) for trip, _, _, _ in improved for point in trip[1:-1])
+        self.assertEqual(visited, sorted(map(tuple, self.X.tolist())))
+        for trip, mh2, t, dist in improved:
+            self.assertEqual((tuple(trip[0]), tuple(trip[-1])), ((0, 0), (0, 0)))
+            self.assertAlmostEqual(trip_length(trip), dist, delta=1e-6 * dist)
+            E = dist * self.drone.E_cr + (len(trip) - 2) * self.drone.E_ins
+            self.assertAlmostEqual(mh2 * 34000, E)
+            self.assertLessEqual(E, self.drone.E_tot)
+            self.assertAlmostEqual(t, dist / self.drone.speed / 3600 + (len(trip) - 2) * self.drone.inspection_time)
+
+    def test_cached_lengths(self):
+        search = LocalSearch(self.drone)
+        search.improve(self.route)
+        self.assertGreater(sum(search.moves.values()), 0)
+        for r, trip in enumerate(search.trips):
+            if trip:
+                points = [search.points[node] for node in [0] + trip + [0]]
+                self.assertAlmostEqual(search.length[r], trip_length(points))
+                for i, node in enumerate(trip):
+                    self.assertEqual((search.trip_of[node], search.position[node]), (r, i))
+                    self.assertAlmostEqual(search.prefix[r][i], trip_length(points[:i + 2]))
+
+    def test_merge_trips(self):
+        # Every turbine on a trip of its own, far below E_tot
+        X = layout(40, "grid", spacing=300.0)
+        X = X - X.mean(axis=0)
+        route = [([(0, 0), point, (0, 0)], 0, 0) for point in X.tolist()]
+        search = LocalSearch(self.drone)
+        improved = search.improve(route)
+        self.assertLess(len(improved), len(route) / 3)
+        self.assertGreater(search.moves["relocate"] + search.moves["cross"] + search.moves["merge"], 0)
+        for trip, mh2, _ in improved:
+            self.assertLessEqual(mh2 * 34000, self.drone.E_tot)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+from src.optimizer import DesignOptimizer
+
+
+class OptimizerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.optimizer = DesignOptimizer()
+        self.result = self.optimizer.optimize(starts=2, samples=256)
+
+    def test_constraints(self):
+        result = self.result
+
+        self.assertTrue(result.success)
+        self.assertTrue(result.I_ratio <= 1 + 1e-6)
+        self.assertTrue(result.endurance >= self.optimizer.mission_time * (1 - 1e-6))
+        for name, value in result.x.items():
+            lower, upper = self.optimizer.bounds[name]
+            self.assertTrue(lower <= value <= upper, msg=name)
+
+    def test_better_than_screening(self):
+        sample = self.optimizer.design(self.optimizer.screen(256))
+        screened = self.optimizer.evaluate(sample)
+        feasible = np.all(screened["margins"] >= 0, axis=1)
+
+        self.assertTrue(self.result.mass <= screened["mass"][feasible].min())
+
+    def test_endurance(self):
+        optimizer = DesignOptimizer(objective="endurance", max_mass=self.result.mass * 1.2)
+        result = optimizer.optimize(starts=2, samples=256)
+
+        self.assertTrue(result.success)
+        self.assertTrue(result.endurance > self.result.endurance)
+        self.assertTrue(result.mass <= self.result.mass * 1.2 * (1 + 1e-6))
+
+    def test_parallel(self):
+        parallel = DesignOptimizer(workers=2).optimize(starts=2, samples=256)
+
+        self.assertAlmostEqual(parallel.mass, self.result.mass)
+
+    def test_snap(self):
+        drones = self.optimizer.snap(self.result.x, neighbours=5)
+
+        self.assertTrue(len(drones) > 0)
+        self.assertEqual([drone.mass for drone in drones], sorted(drone.mass for drone in drones))
+        self.assertTrue(all(drone.I_ratio <= 1 for drone in drones))
+        for drone in drones:
+            self.assertAlmostEqual(drone.hyd.mh2, self.result.x["mh2"])
+            self.assertAlmostEqual(drone.hyd.tank_mass(), self.result.x["tank_mass"])
+            self.assertTrue(drone.esc.Iecont >= drone.motor.Immax)
+
+    def test_objective(self):
+        with self.assertRaises(ValueError):
+            DesignOptimizer(objective="range")
+
+
+if __name__ == "__main__":
+    unittest.main()
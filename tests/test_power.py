@@ -1,4 +1,5 @@
 import unittest
+import numpy as np
 from numpy import isclose
 from src.power import HydrogenTank, FuelCell
 
@@ -54,6 +55,29 @@ class FuelCellTest(unittest.TestCase):
         self.assertTrue(not isclose(current * voltage, high_power, rtol=1e-3, atol=1e-3), msg=(current * voltage, high_power))
         self.assertTrue(current <= self.fc.Imax)
 
+    def test_current_array(self):
+        power = np.linspace(0, 2400, 101)
+        current, voltage = self.fc.get_current_voltage(power)
+
+        self.assertTrue(np.allclose(current * voltage, power, rtol=1e-9, atol=1e-9))
+        self.assertTrue(np.allclose(voltage, self.fc.get_voltage(current)))
+        self.assertTrue(np.all(np.diff(current) > 0))
+
+        for p, I in zip(power[::10], current[::10]):
+            self.assertTrue(isclose(self.fc.get_current_voltage(p)[0], I))
+
+        current, voltage = self.fc.get_current_voltage(np.array([3000, 8000]))
+        self.assertTrue(np.all(current == self.fc.Imax))
+
+    def test_current_error(self):
+        with self.assertRaises(ValueError) as context:
+            self.fc.get_current_voltage(-10)
+
+        self.assertTrue("Cannot get voltage from current" in str(context.exception))
+
+        with self.assertRaises(ValueError):
+            self.fc.get_current_voltage(np.array([10, -10]))
+
 
 if __name__ == "__main__":
     unittest.main()
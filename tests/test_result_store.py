@@ -0,0 +1,88 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from src.drone_combinator import DroneCombinator
+from src.result_store import ResultStore
+
+
+class FewerMotors(DroneCombinator):
+    def read_motor_prop(self):
+        super().read_motor_prop()
+        self.motors = self.motors[:-1]
+
+
+class ResultStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "combinator.sqlite")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_incremental(self):
+        full = DroneCombinator(workers=1)
+        first = FewerMotors(workers=1, store=self.path)
+        second = DroneCombinator(workers=1, store=self.path)
+
+        # Only the combinations with the added motor are sized on the second run
+        self.assertEqual(first.n_stored, 0)
+        self.assertEqual(second.n_stored, first.n_sized)
+        self.assertEqual(second.n_sized + second.n_stored, full.n_sized)
+        self.assertEqual(
+            [(drone.motor.name, drone.propeller.name, drone.esc.name, drone.mass) for drone in second.drones],
+            [(drone.motor.name, drone.propeller.name, drone.esc.name, drone.mass) for drone in full.drones],
+        )
+        self.assertEqual(second.pruned, full.pruned)
+
+        third = DroneCombinator(workers=1, store=self.path)
+        self.assertEqual(third.n_sized, 0)
+
+    def test_csv(self):
+        combinator = DroneCombinator(workers=1, store=self.path)
+        path = os.path.join(self.directory.name, "combinator.csv")
+        combinator.get_csv(path)
+        with open(path) as file:
+            rows = list(csv.reader(file))[1:]
+
+        self.assertEqual(len(rows), len(combinator.drones))
+        self.assertEqual([float(row[3]) for row in rows], [drone.mass for drone in combinator.drones])
+
+    def test_unpruned(self):
+        # Drones above the current rating stored by a pruned run are kept by an unpruned one
+        DroneCombinator(workers=1, prune=True, store=self.path)
+        full = DroneCombinator(workers=1)
+        restored = DroneCombinator(workers=1, store=self.path)
+        self.assertEqual([drone.mass for drone in restored.drones], [drone.mass for drone in full.drones])
+
+        path = os.path.join(self.directory.name, "combinator.csv")
+        restored.get_csv(path)
+        with open(path) as file:
+            self.assertEqual(len(list(csv.reader(file))) - 1, len(restored.drones))
+
+    def test_lookup(self):
+        combinator = DroneCombinator(workers=1, store=self.path)
+        keys = [combinator.combination(index) for index in range(3)]
+        found = combinator.store.lookup(keys + [("motor", "propeller", "esc")])
+
+        self.assertEqual(len(found), 4)
+        self.assertIsNone(found[-1])
+        for status, sizing in found[:-1]:
+            self.assertIn(status, ("feasible", "current", "not converged"))
+            if sizing is not None:
+                self.assertTrue(sizing["mass"] > 0)
+
+    def test_context(self):
+        store = DroneCombinator(workers=1, store=self.path).store
+        n_results = len(store)
+        store.close()
+
+        self.assertTrue(n_results > 0)
+        self.assertEqual(len(ResultStore(self.path, store.context)), n_results)
+        # Another mission or solver drops the stored results
+        self.assertEqual(len(ResultStore(self.path, "other")), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
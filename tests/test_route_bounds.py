@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+from scipy.sparse.csgraph import minimum_spanning_tree
+from scipy.spatial.distance import pdist, squareform
+
+from src.route_bounds import gap, leaders, lower_bounds, meets, spanning_tree_length, trip_capacity
+from src.routing import DroneRoute
+from src.shelf_drone import ShelfESC, ShelfMotor, ShelfPropeller
+from src.synthetic import arrangements, layout
+
+
+class TestRouteBounds(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.drone = DroneRoute(
+            propeller=ShelfPropeller("T-Motor NS 26x85"),
+            motor=ShelfMotor("T-Motor Antigravity MN6007II KV160"),
+            esc=ShelfESC("T-Motor FLAME 60A"),
+            tank_mass=1.65,
+        )
+
+    def test_trip_capacity(self):
+        r = np.linspace(0, self.drone.max_dist, 50)
+        capacity = trip_capacity(self.drone, r)
+        self.assertTrue(np.all(capacity >= 1))
+        self.assertTrue(np.all(np.diff(capacity) <= 0))
+        energy = 2 * r * self.drone.E_cr + capacity * self.drone.E_ins
+        self.assertTrue(np.all(energy <= self.drone.E_tot + 1e-6))
+        self.assertTrue(np.all(energy + self.drone.E_ins > self.drone.E_tot))
+
+    def test_spanning_tree(self):
+        rng = np.random.default_rng(0)
+        for points in (rng.uniform(0, 1000, size=(200, 2)), layout(64, "grid"),
+                       np.column_stack([np.arange(5.0), np.zeros(5)]), np.zeros((1, 2))):
+            dense = minimum_spanning_tree(squareform(pdist(points))).sum() if len(points) > 1 else 0.0
+            self.assertAlmostEqual(spanning_tree_length(points), dense)
+
+    def test_bounds_hold(self):
+        for seed, arrangement in enumerate(arrangements):
+            X = layout(200, arrangement, spacing=700.0, jitter=50.0, seed=seed)
+            X = X - X.mean(axis=0)
+            bounds = lower_bounds(self.drone, X)
+            for route in (self.drone.find_route(X), self.drone.improve_route(self.drone.find_route(X))):
+                properties = self.drone.properties(route)
+                route_gap = gap(properties, bounds)
+                self.assertGreaterEqual(route_gap["trips"], 0)
+                self.assertGreaterEqual(route_gap["kg H2"], 0)
+                self.assertLess(route_gap["kg H2"], 0.2)
+                # Farthest turbine of the j-th farthest trip against leader j
+                farthest = sorted((max(np.hypot(*point) for point in trip[1:-1]) for trip, _, _ in route),
+                                  reverse=True)
+                out = leaders(self.drone, np.linalg.norm(X, axis=1))
+                self.assertTrue(np.all(np.array(farthest[:len(out)]) >= out - 1e-6))
+
+    def test_tight_ring(self):
+        # Near the range of the drone every trip inspects one turbine
+        angles = np.linspace(0, 2 * np.pi, 20, endpoint=False)
+        X = 0.98 * self.drone.max_dist * np.column_stack([np.cos(angles), np.sin(angles)])
+        bounds = lower_bounds(self.drone, X)
+        properties = self.drone.properties(self.drone.find_route(X))
+        self.assertEqual(bounds["trips"], 20)
+        self.assertAlmostEqual(properties["kg H2"], bounds["kg H2"])
+        self.assertTrue(meets(properties, bounds, h2_gap=1e-9))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+
+import numpy as np
+
+from src.routing import DroneRoute, TurbineIndex
+from src.shelf_drone import ShelfESC, ShelfMotor, ShelfPropeller
+from src.synthetic import layout
+
+
+class TestTurbineIndex(unittest.TestCase):
+    def test_nearest(self):
+        # A grid without jitter has exact ties, broken to the lowest index as with np.argmin
+        X = layout(400, "grid", spacing=100.0)
+        index = TurbineIndex(X)
+        rng = np.random.default_rng(0)
+        for visit in rng.permutation(len(X))[:300]:
+            point = X[visit]
+            index.visit(visit)
+            left = np.flatnonzero(~index.visited)
+            distances = np.linalg.norm(X[left] - point, axis=1)
+
+            candidates, new_dist = index.nearest(point)
+            self.assertEqual(candidates[0], left[np.argmin(distances)])
+            self.assertEqual(new_dist[0], np.min(distances))
+
+            candidates, new_dist = index.nearest(point, 3)
+            np.testing.assert_array_equal(new_dist[:3], np.sort(distances)[:3])
+            self.assertTrue(np.all(new_dist <= np.sort(distances)[2] * (1 + 1e-9)))
+        self.assertEqual(index.remaining, 100)
+
+
+class TestDroneRoute(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.drone = DroneRoute(
+            propeller=ShelfPropeller("T-Motor NS 26x85"),
+            motor=ShelfMotor("T-Motor Antigravity MN6007II KV160"),
+            esc=ShelfESC("T-Motor FLAME 60A"),
+            tank_mass=1.65,
+        )
+        X = layout(500, "staggered", spacing=800.0, jitter=30.0)
+        cls.X = X - X.mean(axis=0)
+
+    def test_find_route(self):
+        route = self.drone.find_route(self.X, return_dist=True)
+        visited = [tuple(point) for trip, _, _, _ in route for point in trip[1:-1]]
+        self.assertEqual(sorted(visited), sorted(map(tuple, self.X.tolist())))
+        for trip, mh2, t, dist in route:
+            self.assertLessEqual(mh2 * 34000, self.drone.E_tot)
+            legs = np.linalg.norm(np.diff(np.array(trip, dtype=float), axis=0), axis=1)
+            self.assertAlmostEqual(np.sum(legs), dist, delta=1e-6 * dist)
+
+    def test_greedy_hops(self):
+        # Every hop goes to the nearest turbine not visited yet
+        route = self.drone.find_route(self.X)
+        left = {tuple(point) for point in self.X.tolist()}
+        for trip, _, _ in route:
+            for dest, next_dest in zip(trip[1:-2], trip[2:-1]):
+                left.discard(tuple(dest))
+                distances = [np.hypot(x - dest[0], y - dest[1]) for x, y in left]
+                self.assertAlmostEqual(np.hypot(next_dest[0] - dest[0], next_dest[1] - dest[1]), min(distances))
+            left.discard(tuple(trip[-2]))
+
+    def test_random_route(self):
+        np.random.seed(1)
+        first = self.drone.find_route(self.X, rand=True, n=3)
+        np.random.seed(1)
+        self.assertEqual(self.drone.find_route(self.X, rand=True, n=3), first)
+
+    def test_find_best_route(self):
+        route, properties = self.drone.find_best_route(self.X, no_of_iterations=12, no_of_neighbors=3, seed=7,
+                                                       chunksize=5)
+        greedy = self.drone.properties(self.drone.find_route(self.X))
+        self.assertFalse(self.drone.better(greedy, properties))
+        self.assertEqual(dict(self.drone.properties(route), restarts=12), properties)
+
+        # Same seed, same best route, whatever the chunks and workers
+        for chunksize, workers in ((12, 1), (3, 2)):
+            self.assertEqual(
+                self.drone.find_best_route(self.X, no_of_iterations=12, no_of_neighbors=3, seed=7,
+                                           chunksize=chunksize, workers=workers),
+                (route, properties),
+            )
+
+    def test_stop_at_bound(self):
+        # A ring near the range of the drone leaves room for one turbine per trip
+        angles = np.linspace(0, 2 * np.pi, 20, endpoint=False)
+        X = 0.98 * self.drone.max_dist * np.column_stack([np.cos(angles), np.sin(angles)])
+        route, properties = self.drone.find_best_route(X, no_of_iterations=50, seed=0, stop_at_bound=True)
+        self.assertEqual(properties['gap']['trips'], 0)
+        self.assertEqual(properties['restarts'], 0)
+        self.assertEqual(
+            self.drone.find_best_route(X, no_of_iterations=50, seed=0)[1]['restarts'], 50
+        )
+
+        # Stops at the first restart within the hydrogen gap, on any chunks and workers
+        route, properties = self.drone.find_best_route(self.X, no_of_iterations=40, seed=0, stop_at_bound=True,
+                                                       h2_gap=0.5)
+        for chunksize, workers in ((7, 1), (3, 2)):
+            self.assertEqual(
+                self.drone.find_best_route(self.X, no_of_iterations=40, seed=0, stop_at_bound=True, h2_gap=0.5,
+                                           chunksize=chunksize, workers=workers),
+                (route, properties),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import csv
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+from src.drone_combinator import DroneCombinator
+from src.selection import KeepAll, TopK, ParetoFront
+
+
+class SelectionTest(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.drones = [SimpleNamespace(mass=mass, point=point)
+                       for mass, point in zip(rng.integers(0, 50, 300).astype(float), rng.random((300, 3)))]
+
+    def offer_all(self, selection):
+        evicted = []
+        for index, drone in enumerate(self.drones):
+            evicted += selection.offer(index, drone)
+        return evicted
+
+    def test_top_k(self):
+        selection = TopK(20)
+        evicted = self.offer_all(selection)
+        full = KeepAll()
+        self.offer_all(full)
+
+        self.assertEqual(selection.drones(), full.drones()[:20])
+        self.assertEqual(len(evicted), len(self.drones) - 20)
+
+    def test_pareto(self):
+        selection = ParetoFront(objectives=lambda drone: drone.point)
+        evicted = self.offer_all(selection)
+        points = np.array([drone.point for drone in self.drones])
+
+        front = [
+            index for index, point in enumerate(points)
+            if not np.any(np.all(points <= point, axis=1) & np.any(points < point, axis=1))
+        ]
+        self.assertEqual(sorted(index for index, _ in selection.entries()), front)
+        self.assertEqual(len(evicted) + len(selection), len(self.drones))
+
+
+class CombinatorSelectionTest(unittest.TestCase):
+    def test_top_k(self):
+        full = DroneCombinator(workers=1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "spill.csv")
+            top = DroneCombinator(workers=1, chunksize=100, top_k=10, spill=path)
+            with open(path) as file:
+                rows = list(csv.reader(file))
+
+        self.assertEqual([drone.mass for drone in top.drones], [drone.mass for drone in full.drones[:10]])
+        self.assertEqual(len(rows) - 1, len(full.drones) - 10)
+        self.assertEqual(top.n_spilled, len(full.drones) - 10)
+
+    def test_pareto(self):
+        full = DroneCombinator(workers=1)
+        pareto = DroneCombinator(workers=1, pareto=True)
+        points = np.array([ParetoFront().objectives(drone) for drone in pareto.drones])
+
+        self.assertTrue(0 < len(pareto.drones) < len(full.drones))
+        for point in points:
+            self.assertFalse(np.any(np.all(points <= point, axis=1) & np.any(points < point, axis=1)))
+
+    def test_exclusive(self):
+        with self.assertRaises(ValueError):
+            DroneCombinator(top_k=10, pareto=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
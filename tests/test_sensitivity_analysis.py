@@ -1,4 +1,5 @@
 import unittest
+from copy import deepcopy
 
 import numpy as np
 from src.drone import Drone
@@ -44,12 +45,15 @@ class SensitivityTest(unittest.TestCase):
             "Bp" not in self.sa.parameters and "Nm" not in self.sa.parameters
         )
 
-    def test_different_drones(self):
-        configs = []
-        for drone in self.sa.drones:
-            self.assertTrue(drone.config not in configs)
+    def test_matches_drone(self):
+        rows = self.sa.evaluate([("propeller", "Hp"), ("motor", "Kv0"), ("mission", "T")])
 
-            configs.append(drone.config)
+        self.assertEqual(len(np.unique(rows[["parameter", "delta"]])), len(rows))
+        for row in rows[::7]:
+            config = deepcopy(self.drone.config)
+            config[row["type"]][row["parameter"]] *= 1 + row["delta"] / 100
+            mass = (Drone(config).mass - self.sa.initial_mass) / self.sa.initial_mass * 100
+            self.assertTrue(np.isclose(row["mass_delta"], mass, rtol=1e-9), msg=(row, mass))
 
 
 if __name__ == "__main__":
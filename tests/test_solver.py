@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+from src.solver import FixedPointSolver, SecantSolver, AitkenSolver, get_solver
+
+
+class SolverTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Slow contraction towards x = 20, the fixed point loop needs many steps here
+        self.update = lambda x: 0.95 * x + 1
+        self.solvers = [FixedPointSolver(tol=1e-6), SecantSolver(tol=1e-6), AitkenSolver(tol=1e-6)]
+
+    def test_converged(self):
+        for solver in self.solvers:
+            value, result = solver.solve(self.update, 0.0)
+
+            self.assertTrue(np.isclose(value, 20, atol=1e-3), msg=(solver.name, value))
+            self.assertTrue(result.converged)
+            self.assertTrue(result.reason == "converged")
+            self.assertTrue(result.residual <= 1e-6)
+            self.assertTrue(result.solver == solver.name)
+
+    def test_acceleration(self):
+        iterations = {solver.name: solver.solve(self.update, 0.0)[1].iterations for solver in self.solvers}
+
+        self.assertTrue(iterations["secant"] < iterations["fixed-point"] / 10, msg=iterations)
+        self.assertTrue(iterations["aitken"] < iterations["fixed-point"] / 10, msg=iterations)
+
+    def test_failure_reasons(self):
+        for solver in self.solvers:
+            value, result = solver.solve(lambda x: x**2 + 1, 0.0)
+            self.assertTrue(value is None)
+            self.assertTrue(result.reason == "diverged", msg=(solver.name, result))
+
+        value, result = FixedPointSolver(tol=1e-6, max_iter=5).solve(self.update, 0.0)
+        self.assertTrue(value is None)
+        self.assertTrue(result.reason == "max_iter")
+        self.assertTrue(result.iterations == 5)
+        self.assertTrue(result.residual > 1e-6)
+
+    def test_batch(self):
+        x0 = np.array([0.0, 10.0, 30.0, 0.0])
+        offset = np.array([1.0, 1.0, 1.0, 100.0])
+
+        for solver in self.solvers:
+            def update(x, active):
+                return 0.95 * x + offset[active] * (1 + (x > 1e3) * x)
+
+            values, result = solver.solve_batch(update, x0)
+
+            self.assertTrue(np.allclose(values[:3], 20, atol=1e-3), msg=(solver.name, values))
+            self.assertTrue(np.all(result.converged[:3]))
+            self.assertTrue(np.isnan(values[3]))
+            self.assertTrue(result.reason[3] == "diverged")
+
+            for i in range(3):
+                value, single = solver.solve(lambda x: update(np.array([x]), [i])[0], x0[i])
+                self.assertTrue(np.isclose(value, values[i]))
+                self.assertTrue(single.iterations == result.iterations[i])
+
+    def test_get_solver(self):
+        self.assertTrue(isinstance(get_solver(), FixedPointSolver))
+        self.assertTrue(isinstance(get_solver("secant", tol=1e-4), SecantSolver))
+        self.assertTrue(get_solver("aitken", tol=1e-4).tol == 1e-4)
+
+        with self.assertRaises(ValueError):
+            get_solver("newton")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+from src.shelf_drone import ShelfESC, ShelfMotor, ShelfPropeller
+from src.speed_range import SpeedRange
+
+
+class TestSpeedRange(unittest.TestCase):
+    def setUp(self) -> None:
+        self.drone = SpeedRange(
+            propeller=ShelfPropeller("T-Motor NS 26x85"),
+            motor=ShelfMotor("T-Motor Antigravity MN6007II KV160"),
+            esc=ShelfESC("T-Motor FLAME 60A"),
+            tank_mass=1.65,
+            mh2=0.12,
+        )
+
+    def test_surface_area(self):
+        angles = np.array([0.0, 15.0, 29.0, 75.0, 120.0])
+        areas = self.drone.surface_area(angles)
+        for angle, area in zip(angles, areas):
+            self.assertAlmostEqual(self.drone.surface_area(angle), area)
+        self.assertAlmostEqual(areas[0], self.drone.S_x)
+
+    def test_closed_form_area(self):
+        for angle in np.arange(-90.0, 270.0, 7.0):
+            rotation = self.drone.rotation_matrix(angle)
+            r_corner = np.abs(np.dot(self.drone.r_corner, rotation.T))
+            l_corner = np.abs(np.dot(self.drone.l_corner, rotation.T))
+            area = 2 * max(r_corner[1], l_corner[1]) * self.drone.a
+            self.assertAlmostEqual(self.drone.surface_area(angle), area)
+
+    def test_range_curve(self):
+        x, values = self.drone.range_curve(0.8, step=1)
+        self.assertEqual(len(x), len(values))
+        for angle, value in zip(x[::10], values[::10]):
+            self.assertAlmostEqual(self.drone.range(angle, 0.8), value)
+
+    def test_optimal_range_parameters(self):
+        for cd in (0.6, 0.8, 1.0):
+            grid = self.drone.optimal_range_parameters(cd, step=0.1)
+            best = self.drone.optimal_range_parameters(cd)
+            self.assertAlmostEqual(best[2], grid[2], delta=0.1)
+            self.assertGreaterEqual(best[0], grid[0] - 1e-6)
+            self.assertAlmostEqual(best[1], self.drone.speed(best[2], cd))
+
+    def test_performance_grid(self):
+        masses = np.array([10.0, 12.0])
+        grid = self.drone.performance_grid(pitch=np.arange(0, 50, 5.0), mass=masses, mh2=[0.08, 0.12])
+        self.assertEqual(grid.shape, (10, 5, 2, 2))
+        for field in grid.fields:
+            self.assertEqual(grid[field].shape, grid.shape)
+
+        # The sized mass with the hydrogen of the drone is the scalar path
+        default = self.drone.performance_grid()
+        x, values = self.drone.range_curve(0.8)
+        np.testing.assert_allclose(default.sel(Cd=0.8)["range"][:, 0, 0, 0], values)
+
+        endurance = self.drone.compute_endurance(1 / np.cos(np.radians(25)), mh2=0.08, mass=12.0)
+        self.assertAlmostEqual(grid.sel(pitch=25, mass=12, mh2=0.08)["endurance"][0, 0, 0, 0], endurance)
+
+        # The defaults reproduce range() for a drone sized with other hydrogen as well
+        drone = SpeedRange(
+            propeller=ShelfPropeller("T-Motor NS 26x85"),
+            motor=ShelfMotor("T-Motor Antigravity MN6007II KV160"),
+            esc=ShelfESC("T-Motor FLAME 60A"),
+            tank_mass=1.65,
+            mh2=0.1,
+        )
+        np.testing.assert_allclose(drone.performance_grid(pitch=[10.0, 20.0], Cd=[0.8])["range"][:, 0, 0, 0],
+                                   [drone.range(10.0, 0.8), drone.range(20.0, 0.8)])
+
+        pitch, best = default.best()
+        self.assertAlmostEqual(pitch[2, 0, 0], self.drone.optimal_range_parameters(0.8, step=0.1)[2])
+        self.assertEqual(len(grid.to_frame()), np.prod(grid.shape))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from copy import deepcopy
+
+import numpy as np
+from src.configuration import configuration
+from src.drone import Drone
+from src.surrogate import Surrogate, outputs
+
+
+def sized(surrogate, x):
+    config = deepcopy(configuration)
+    for (typ, parameter), value in zip(surrogate.parameters, x):
+        config[typ][parameter] = value
+    return Drone(config, cache=False)
+
+
+class SurrogateTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.surrogate = Surrogate().fit(samples=1024, validation=256)
+
+    def test_accuracy(self):
+        x = self.surrogate.lower + 0.37 * (self.surrogate.upper - self.surrogate.lower)
+        result = self.surrogate(x)
+        drone = sized(self.surrogate, x)
+
+        self.assertTrue(result["trusted"][0])
+        for output, value in zip(outputs, (drone.mass, drone.P_tot, drone.N, drone.hyd.mh2, drone.I_ratio)):
+            self.assertTrue(self.surrogate.errors[output]["max"] < 0.02)
+            self.assertAlmostEqual(result[output][0] / value, 1, delta=self.surrogate.errors[output]["max"])
+
+    def test_single(self):
+        x = self.surrogate.lower + np.linspace(0.1, 0.9, len(self.surrogate.parameters)) * (
+            self.surrogate.upper - self.surrogate.lower
+        )
+        single, batch = self.surrogate(x), self.surrogate(np.array([x, x]))
+        self.assertEqual(single["trusted"].tolist(), [True])
+        for output in outputs:
+            self.assertEqual(single[output].shape, (1,))
+            self.assertAlmostEqual(single[output][0] / batch[output][1], 1, delta=1e-12)
+
+        outside = self.surrogate.upper * 1.1
+        self.assertIsNone(self.surrogate.query(outside))
+        self.assertEqual(self.surrogate(outside)["trusted"].tolist(), [False])
+
+    def test_fallback(self):
+        middle = self.surrogate.lower + 0.5 * (self.surrogate.upper - self.surrogate.lower)
+        x = np.array([middle, middle])
+        x[0, 0] = self.surrogate.lower[0] * 0.9
+        result = self.surrogate(x)
+
+        self.assertEqual(result["trusted"].tolist(), [False, True])
+        self.assertAlmostEqual(result["mass"][0], sized(self.surrogate, x[0]).mass, delta=0.01)
+        self.assertEqual(self.surrogate(x, tol=1e-9)["trusted"].tolist(), [False, False])
+
+    def test_diverged(self):
+        surrogate = Surrogate({("mission", "T"): (1, 12), ("propeller", "Hp"): (0.1, 0.3)}).fit(samples=256)
+        result = surrogate([[11.9, 0.1], [2, 0.2]])
+
+        self.assertTrue(len(surrogate.diverged) > 0)
+        self.assertEqual(result["trusted"].tolist(), [False, True])
+        self.assertIsNone(sized(surrogate, [11.9, 0.1]).mass)
+        self.assertTrue(np.isnan(result["mass"][0]))
+
+    def test_save(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "surrogate.npz")
+            self.surrogate.save(path)
+            loaded = Surrogate.load(path)
+
+        x = self.surrogate.lower + 0.6 * (self.surrogate.upper - self.surrogate.lower)
+        self.assertEqual(loaded.parameters, self.surrogate.parameters)
+        self.assertEqual(loaded.errors, self.surrogate.errors)
+        self.assertEqual(loaded(x)["mass"][0], self.surrogate(x)["mass"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
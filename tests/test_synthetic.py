@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from src.catalog import Catalog, catalog
+from src.drone_combinator import DroneCombinator
+from src.synthetic import arrangements, layout, synthetic_catalog, write_catalogs, write_windfarm
+from src.windfarm import WindFarm
+
+
+class SyntheticTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_catalog(self):
+        motors = synthetic_catalog("motor", 500, seed=1)
+        values = np.array(list(motors.values()))
+        source = np.array(list(catalog.table("motor").values()))
+
+        self.assertEqual(motors, synthetic_catalog("motor", 500, seed=1))
+        self.assertNotEqual(motors, synthetic_catalog("motor", 500, seed=2))
+        self.assertTrue(np.all(values >= source.min(axis=0) / 2) and np.all(values <= source.max(axis=0) * 2))
+        # Motors with a higher Kv are lighter, in the catalog and the synthetic parts
+        self.assertTrue(np.corrcoef(np.log(values[:, 0]), np.log(values[:, 5]))[0, 1] < -0.5)
+
+    def test_write_catalogs(self):
+        write_catalogs(self.directory.name, 12)
+        synthetic = Catalog(self.directory.name, self.directory.name)
+
+        for kind in ("motor", "propeller", "esc"):
+            self.assertEqual(len(synthetic.columns(kind)), 12)
+        self.assertTrue(np.all(synthetic.columns("propeller")["Bp"] == 2))
+
+        combinator = DroneCombinator(workers=1, registry=synthetic)
+        self.assertTrue(len(combinator.drones) > 0)
+        self.assertTrue(combinator.drones[0].motor.name.startswith("Synthetic motor"))
+
+    def test_windfarm(self):
+        for arrangement in arrangements:
+            path = os.path.join(self.directory.name, f"{arrangement}.csv")
+            xy = write_windfarm(path, 250, arrangement, seed=3)
+            farm = WindFarm(file=path)
+            turbines = np.array([turbine.get_xy() for turbine in farm.turbines], dtype=float)
+
+            self.assertEqual(len(farm.turbines), 250)
+            np.testing.assert_allclose(turbines, xy - xy.mean(axis=0), atol=0.1)
+
+    def test_layout(self):
+        grid = layout(100, "grid", spacing=500)
+        staggered = layout(100, "staggered", spacing=500)
+
+        self.assertEqual(len(np.unique(grid, axis=0)), 100)
+        self.assertEqual(np.ptp(grid[:, 0]), 9 * 500)
+        self.assertEqual(np.ptp(staggered[:, 0]), 9.5 * 500)
+        with self.assertRaises(ValueError):
+            layout(100, "ring")
+
+
+if __name__ == "__main__":
+    unittest.main()